@@ -19,11 +19,16 @@ Examples:
   python build_mdc_contraindication.py evaluate \
     "diabetes" "hypertension" "chronic kidney disease" \
     --top 50
+
+  # Match the diagnoses through the disease_names full-text index; only
+  # matches at word starts, e.g. "myopathy" no longer finds "cardiomyopathy"
+  python build_mdc_contraindication.py evaluate "heart failure" --fulltext
 """
 
 from __future__ import annotations
 
 import argparse
+import sys
 import os
 from typing import List
 
@@ -31,6 +36,13 @@ import pandas as pd
 from neo4j import GraphDatabase
 from tabulate import tabulate
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# The index name and the Lucene query builder of the enrichment queries, so
+# this script follows scripts/init_database.py if either changes
+from src.enrichment.diagnosis_tokens import fulltext_query
+from src.enrichment.queries import DISEASE_FULLTEXT_INDEX
+
 QUERY_CONTRA = """
 MATCH (d)-[r]->(drug:Drug)
 WHERE type(r) = "CONTRAINDICATION"
@@ -41,14 +53,33 @@ RETURN
 
 QUERY_MATCH_DISEASES = """
 UNWIND $diagnoses AS dx
-MATCH (d)
-WHERE toLower(coalesce(d.name, d.display_name, d.label, "")) CONTAINS toLower(dx)
+MATCH (d:Disease)
+WHERE coalesce(d.name_lower, toLower(coalesce(d.name, d.display_name, d.label, ""))) CONTAINS toLower(dx)
 RETURN DISTINCT
   dx AS input_diagnosis,
   coalesce(d.name, d.display_name, d.label) AS matched_disease
 ORDER BY input_diagnosis, matched_disease
 """
 
+QUERY_INDEX_STATE = """
+SHOW INDEXES YIELD name, state WHERE name = $name RETURN state
+"""
+
+# Index-backed variant of QUERY_MATCH_DISEASES: the full-text index returns
+# the diseases containing every word of the diagnosis as a word prefix, then
+# the same CONTAINS test keeps the exact matches. Substrings inside a word
+# (e.g. "myopathy" in "cardiomyopathy") are not found, so it is opt-in
+QUERY_MATCH_DISEASES_FULLTEXT = f"""
+UNWIND $diagnoses AS dx
+CALL db.index.fulltext.queryNodes('{DISEASE_FULLTEXT_INDEX}', dx.query) YIELD node AS d
+WITH dx, d
+WHERE coalesce(d.name_lower, toLower(coalesce(d.name, d.display_name, d.label, ""))) CONTAINS toLower(dx.text)
+RETURN DISTINCT
+  dx.text AS input_diagnosis,
+  coalesce(d.name, d.display_name, d.label) AS matched_disease
+ORDER BY input_diagnosis, matched_disease
+"""
+
 
 def get_driver():
     uri = os.getenv("NEO4J_URI", "bolt://localhost:7687")
@@ -59,19 +90,36 @@ def get_driver():
     return GraphDatabase.driver(uri, auth=(user, password))
 
 
-def load_contra_pairs() -> pd.DataFrame:
+def _dedup_pairs(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    df = pd.concat(frames, ignore_index=True).drop_duplicates()
+    # Names repeat across thousands of edges; categoricals store each once
+    return df.astype({"disease": "category", "drug": "category"})
+
+
+def load_contra_pairs(fetch_size: int = 10000) -> pd.DataFrame:
+    """Stream CONTRAINDICATION edges in ``fetch_size`` batches, keeping only distinct pairs."""
     driver = get_driver()
+    frames: List[pd.DataFrame] = []
     try:
-        with driver.session() as session:
-            rows = [r.data() for r in session.run(QUERY_CONTRA)]
+        with driver.session(fetch_size=fetch_size) as session:
+            result = session.run(QUERY_CONTRA)
+            while True:
+                values = [record.values() for record in result.fetch(fetch_size)]
+                if not values:
+                    break
+                frames.append(
+                    pd.DataFrame(values, columns=["disease", "drug"]).dropna().drop_duplicates()
+                )
+                # Compact periodically so memory follows distinct pairs, not edges
+                if len(frames) >= 16:
+                    frames = [_dedup_pairs(frames)]
     finally:
         driver.close()
 
-    if not rows:
+    if not frames:
         return pd.DataFrame(columns=["disease", "drug"])
 
-    df = pd.DataFrame(rows).dropna(subset=["disease", "drug"]).drop_duplicates()
-    return df
+    return _dedup_pairs(frames)
 
 
 def build_matrix(df: pd.DataFrame) -> pd.DataFrame:
@@ -91,11 +139,22 @@ def build_matrix(df: pd.DataFrame) -> pd.DataFrame:
     return matrix
 
 
-def match_input_diseases(diagnoses: List[str]) -> pd.DataFrame:
+def match_input_diseases(diagnoses: List[str], fulltext: bool = False) -> pd.DataFrame:
     driver = get_driver()
     try:
         with driver.session() as session:
-            rows = [r.data() for r in session.run(QUERY_MATCH_DISEASES, diagnoses=diagnoses)]
+            if fulltext:
+                state = session.run(QUERY_INDEX_STATE, name=DISEASE_FULLTEXT_INDEX).single()
+                fulltext = state is not None and state["state"] == "ONLINE"
+                if not fulltext:
+                    print(f"Full-text index {DISEASE_FULLTEXT_INDEX!r} is not online; scanning Disease names")
+            if fulltext:
+                specs = [{"text": dx, "query": fulltext_query([dx])} for dx in diagnoses]
+                specs = [spec for spec in specs if spec["query"]]
+                result = session.run(QUERY_MATCH_DISEASES_FULLTEXT, diagnoses=specs)
+            else:
+                result = session.run(QUERY_MATCH_DISEASES, diagnoses=diagnoses)
+            rows = [r.data() for r in result]
     finally:
         driver.close()
     return pd.DataFrame(rows)
@@ -118,7 +177,7 @@ def evaluate_patient_profile(matrix: pd.DataFrame, matched_diseases: List[str])
 
 
 def cmd_build(args):
-    df = load_contra_pairs()
+    df = load_contra_pairs(fetch_size=args.fetch_size)
     matrix = build_matrix(df)
 
     if matrix.empty:
@@ -132,14 +191,14 @@ def cmd_build(args):
 
 
 def cmd_evaluate(args):
-    df = load_contra_pairs()
+    df = load_contra_pairs(fetch_size=args.fetch_size)
     matrix = build_matrix(df)
 
     if matrix.empty:
         print("No CONTRAINDICATION edges found.")
         return
 
-    matched_df = match_input_diseases(args.diagnoses)
+    matched_df = match_input_diseases(args.diagnoses, fulltext=args.fulltext)
     if matched_df.empty:
         print("No disease nodes matched your input diagnoses.")
         return
@@ -170,6 +229,9 @@ def main():
     parser = argparse.ArgumentParser(
         description="Build/evaluate MDC contraindication matrix from PrimeKG (Neo4j)."
     )
+    parser.add_argument(
+        "--fetch-size", type=int, default=10000, help="Records pulled from Neo4j per round trip"
+    )
     sub = parser.add_subparsers(dest="command", required=True)
 
     p_build = sub.add_parser("build", help="Build and save full disease-drug contraindication matrix")
@@ -180,6 +242,10 @@ def main():
     p_eval.add_argument("diagnoses", nargs="+", help="List of diagnosis terms")
     p_eval.add_argument("--top", type=int, default=50, help="Show top N drugs (default: 50)")
     p_eval.add_argument("--out", default="", help="Optional CSV output for flagged drugs")
+    p_eval.add_argument(
+        "--fulltext", action="store_true",
+        help=f"Match diagnoses through the {DISEASE_FULLTEXT_INDEX!r} full-text index (word-prefix matches only)"
+    )
     p_eval.set_defaults(func=cmd_evaluate)
 
     args = parser.parse_args()
@@ -11,6 +11,22 @@ load_dotenv()
 NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
 NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "Aq123456")
+# Seconds the driver keeps retrying a transaction function after transient failures
+NEO4J_MAX_TRANSACTION_RETRY_TIME = float(os.getenv("NEO4J_MAX_TRANSACTION_RETRY_TIME", "30"))
+# Connection pool of the async driver (one pooled connection per in-flight query)
+NEO4J_MAX_CONNECTION_POOL_SIZE = int(os.getenv("NEO4J_MAX_CONNECTION_POOL_SIZE", "100"))
+NEO4J_CONNECTION_ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_CONNECTION_ACQUISITION_TIMEOUT", "60"))
+
+# Enrichment result cache, off unless given a size (e.g. 100000 entries); the path adds a shared on-disk tier
+ENRICHER_CACHE_SIZE = int(os.getenv("ENRICHER_CACHE_SIZE", "0"))
+ENRICHER_CACHE_TTL = float(os.getenv("ENRICHER_CACHE_TTL", "3600"))
+ENRICHER_CACHE_PATH = os.getenv("ENRICHER_CACHE_PATH") or None
+# Seconds between checks of the graph version stamp (PrimeKGRelease node)
+ENRICHER_CACHE_VERSION_CHECK = float(os.getenv("ENRICHER_CACHE_VERSION_CHECK", "60"))
+# Attempts at building the API's in-process indexes at startup before it fails (Neo4j may still be starting)
+ENRICHER_INDEX_BUILD_ATTEMPTS = int(os.getenv("ENRICHER_INDEX_BUILD_ATTEMPTS", "5"))
+# Enrichment snapshot (scripts/build_enrichment_snapshot.py) the API serves from instead of Neo4j
+ENRICHER_SNAPSHOT_PATH = os.getenv("ENRICHER_SNAPSHOT_PATH") or None
 
 # PrimeKG data configuration
 PRIMEKG_DATA_URL = "https://dataverse.harvard.edu/api/access/datafile/6180620"
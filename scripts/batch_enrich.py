@@ -7,37 +7,165 @@ Usage:
 
 Each output line is a JSON object with all original CSV fields plus
 `medical_knowledge_context` containing the enriched PrimeKG blob.
+
+With --two-phase the distinct diagnoses and drug pairs of the whole input
+are resolved once first; the rows are then assembled from those results
+without further queries. With --workers the deduplication is per shard:
+each worker prefetches the distinct inputs of its own shard into its own
+in-process cache, so an input recurring across shards is resolved once per
+shard. Build an enrichment snapshot and pass --snapshot to resolve every
+input exactly once for a sharded run.
+
+With --workers N the input is split into shards of --shard-rows rows that N
+worker processes enrich into part files under <output>.parts, tracked by a
+manifest.json there. Failed shards are retried (--shard-retries); rerunning
+the same command redoes only the shards that did not finish. The parts are
+then merged into --output in input order, unless --keep-parts is given.
+
+With --stream the CSV is read --chunk-rows rows at a time, so memory stays
+flat whatever its size. A first pass counts the rows and fixes every
+column's dtype over the whole file (--two-phase adds one more pass). Lines
+are written as compact JSON (with orjson if installed) through a buffered
+writer, gzip- or zstd-compressed when --output ends in .gz or .zst.
 """
 from __future__ import annotations
 
-import ast
 import json
 import argparse
 import sys
 import os
+import shutil
 from pathlib import Path
+from typing import Iterable
 
 import pandas as pd
 from tqdm import tqdm
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.enrichment import EnricherOrchestrator
+from src.db.neo4j_connector import get_connector
+from src.enrichment import DDIIndex, DiseaseNameIndex, EnricherOrchestrator, EnrichmentSnapshot
+from src.enrichment.cache import EnrichmentCache
+from src.enrichment.queries import DISEASE_FULLTEXT_INDEX
+from src.enrichment.sharding import merge_parts, run_shards
+from src.enrichment.streaming import (
+    chunk_records,
+    compression_for,
+    open_jsonl,
+    parse_list_cell,
+    parse_list_column,
+    read_csv_chunks,
+    scan_csv,
+    write_records,
+)
+
+
+def _distinct_inputs(frames: Iterable[pd.DataFrame]) -> tuple[list[str], set[tuple[str, str]]]:
+    """Distinct diagnoses and DrugBank id pairs over all rows."""
+    diagnoses: dict[str, None] = {}
+    pairs: set[tuple[str, str]] = set()
+    for df in frames:
+        for parsed in parse_list_column(df, "diagnose"):
+            diagnoses.update(dict.fromkeys(parsed))
+        for drugbank_ids in parse_list_column(df, "drugbank_id"):
+            pairs.update((a, b) for a in drugbank_ids for b in drugbank_ids if a < b)
+    return list(diagnoses), pairs
+
+
+def _build_enricher(args: argparse.Namespace) -> EnricherOrchestrator:
+    fulltext = args.fulltext and not args.snapshot and get_connector().index_exists(DISEASE_FULLTEXT_INDEX)
+    if args.fulltext and not fulltext:
+        print(f"Full-text index {DISEASE_FULLTEXT_INDEX!r} not found; falling back to CONTAINS matching")
+    return EnricherOrchestrator(
+        limit_phenotypes=args.limit_phenotypes,
+        limit_comorbid=args.limit_comorbid,
+        limit_indications=args.limit_indications,
+        limit_contraindications=args.limit_contraindications,
+        concurrent=not args.sequential,
+        combined_query=args.combined_query,
+        disease_index=DiseaseNameIndex() if args.disease_index else None,
+        fulltext=fulltext,
+        snapshot=EnrichmentSnapshot(args.snapshot) if args.snapshot else None,
+        ddi_index=DDIIndex() if args.ddi_index else None,
+        # Phase 2 must find every phase 1 result, so nothing may be evicted or expire
+        cache=EnrichmentCache(max_entries=sys.maxsize, ttl=0) if args.two_phase else None,
+    )
+
+
+def _prefetch(enricher: EnricherOrchestrator, frames: Iterable[pd.DataFrame], args: argparse.Namespace) -> None:
+    diagnoses, pairs = _distinct_inputs(frames)
+    counts = enricher.prefetch(diagnoses, pairs, chunk_size=max(args.rows_per_query, 1000))
+    print(f"Resolved {counts['diagnoses']} distinct diagnoses ({counts['specs']} after normalization) "
+          f"and {counts['drug_pairs']} drug pairs")
+
+
+def _enrich_batch(enricher: EnricherOrchestrator, batch: list[tuple[list[str], list[str]]],
+                  rows_per_query: int) -> list:
+    if rows_per_query == 1:
+        return [enricher.enrich(diagnoses=batch[0][0], drugbank_ids=batch[0][1])]
+    return enricher.enrich_many(batch)
+
+
+def _enrich_frame(enricher: EnricherOrchestrator, df: pd.DataFrame, fout, args: argparse.Namespace,
+                  progress: tqdm | None = None) -> None:
+    """Write the enriched rows of ``df`` to ``fout`` as JSON lines, in input order."""
+    if args.two_phase and not args.snapshot:
+        _prefetch(enricher, [df], args)
+
+    rows_per_query = max(1, args.rows_per_query)
+    for start in range(0, len(df), rows_per_query):
+        records = [row.to_dict() for _, row in df.iloc[start:start + rows_per_query].iterrows()]
+        batch = [
+            (parse_list_cell(record.get("diagnose", "")), parse_list_cell(record.get("drugbank_id", "")))
+            for record in records
+        ]
+        contexts = _enrich_batch(enricher, batch, rows_per_query)
+
+        for record, ctx in zip(records, contexts):
+            record["medical_knowledge_context"] = ctx.to_dict()
+            fout.write(json.dumps(record, ensure_ascii=False) + "\n")
+        if progress is not None:
+            progress.update(len(records))
+
+
+def _enrich_chunk(enricher: EnricherOrchestrator, chunk: pd.DataFrame, out, args: argparse.Namespace,
+                  progress: tqdm | None = None) -> int:
+    """Write the enriched rows of a chunk to the binary writer ``out``, in input order; returns the row count."""
+    records = chunk_records(chunk)
+    batch = list(zip(parse_list_column(chunk, "diagnose"), parse_list_column(chunk, "drugbank_id")))
+
+    rows_per_query = max(1, args.rows_per_query)
+    for start in range(0, len(records), rows_per_query):
+        contexts = _enrich_batch(enricher, batch[start:start + rows_per_query], rows_per_query)
+        write_records(out, (
+            {**record, "medical_knowledge_context": ctx.to_dict()}
+            for record, ctx in zip(records[start:start + rows_per_query], contexts)
+        ))
+        if progress is not None:
+            progress.update(len(contexts))
+    return len(records)
+
+
+# Per worker process: the parsed arguments and the orchestrator built from them
+_worker: dict = {}
+
+
+def _init_worker(args: argparse.Namespace) -> None:
+    _worker["args"] = args
+    _worker["enricher"] = _build_enricher(args)
 
 
-def _parse_list_col(value: object) -> list[str]:
-    """Parse CSV column that may be a Python list repr or a plain string."""
-    if isinstance(value, list):
-        return [str(v) for v in value]
-    if not isinstance(value, str) or not value.strip():
-        return []
-    try:
-        parsed = ast.literal_eval(value)
-        if isinstance(parsed, list):
-            return [str(v) for v in parsed]
-    except (ValueError, SyntaxError):
-        pass
-    return [value.strip()]
+def _enrich_shard(df: pd.DataFrame, part_path: str) -> None:
+    enricher, args = _worker["enricher"], _worker["args"]
+    if not args.stream:
+        with open(part_path, "w", encoding="utf-8") as fout:
+            _enrich_frame(enricher, df, fout, args)
+        return
+    if args.two_phase and not args.snapshot:
+        _prefetch(enricher, [df], args)
+    # Compressed parts concatenate into a valid compressed output
+    with open_jsonl(part_path, compression_for(args.output)) as out:
+        _enrich_chunk(enricher, df, out, args)
 
 
 def main() -> None:
@@ -60,32 +188,146 @@ def main() -> None:
         "--limit-contraindications", type=int, default=10,
         help="Max contraindicated drugs per disease (default: 10)"
     )
-    args = parser.parse_args()
-
-    df = pd.read_csv(args.input)
-    enricher = EnricherOrchestrator(
-        limit_phenotypes=args.limit_phenotypes,
-        limit_comorbid=args.limit_comorbid,
-        limit_indications=args.limit_indications,
-        limit_contraindications=args.limit_contraindications,
+    parser.add_argument(
+        "--sequential", action="store_true",
+        help="Run the aspect queries of a row one after another instead of concurrently"
+    )
+    parser.add_argument(
+        "--combined-query", action="store_true",
+        help="Fetch the four diagnosis aspects with one query per row"
+    )
+    parser.add_argument(
+        "--disease-index", action="store_true",
+        help="Resolve diagnoses to Disease ids with an in-process name index instead of CONTAINS scans"
+    )
+    parser.add_argument(
+        "--fulltext", action="store_true",
+        help="Match diagnoses through the disease_names full-text index (falls back to CONTAINS if missing)"
+    )
+    parser.add_argument(
+        "--ddi-index", action="store_true",
+        help="Check drug pairs against an in-memory copy of the adverse DDI edges instead of querying them"
+    )
+    parser.add_argument(
+        "--rows-per-query", type=int, default=1,
+        help="Rows whose diagnoses and drugs are packed into each query (default: 1, one enrichment per row)"
+    )
+    parser.add_argument(
+        "--two-phase", action="store_true",
+        help="Resolve each distinct diagnosis and drug pair of the input once, then assemble the rows "
+             "(once per shard with --workers)"
+    )
+    parser.add_argument(
+        "--snapshot",
+        help="Answer from an enrichment snapshot (scripts/build_enrichment_snapshot.py) instead of Neo4j"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Worker processes, each enriching shards of the input with its own Neo4j driver (default: 1)"
+    )
+    parser.add_argument(
+        "--shard-rows", type=int, default=10000,
+        help="Rows per shard with --workers (default: 10000)"
+    )
+    parser.add_argument(
+        "--shard-retries", type=int, default=2,
+        help="Extra attempts for a failed shard (default: 2)"
     )
+    parser.add_argument(
+        "--keep-parts", action="store_true",
+        help="With --workers, leave the part files and their manifest instead of merging them into --output"
+    )
+    parser.add_argument(
+        "--stream", action="store_true",
+        help="Read the input in chunks and write compact, buffered (optionally .gz/.zst compressed) JSON lines"
+    )
+    parser.add_argument(
+        "--chunk-rows", type=int, default=50000,
+        help="Rows read at a time with --stream (default: 50000; --shard-rows with --workers)"
+    )
+    args = parser.parse_args()
+    if compression_for(args.output) and not args.stream:
+        parser.error("compressed --output (.gz/.zst) needs --stream")
 
     out_path = Path(args.output)
     out_path.parent.mkdir(parents=True, exist_ok=True)
+    if args.stream:
+        sys.exit(_run_streaming(args, out_path))
 
-    with out_path.open("w", encoding="utf-8") as fout:
-        for _, row in tqdm(df.iterrows(), total=len(df), desc="Enriching rows"):
-            diagnoses = _parse_list_col(row.get("diagnose", ""))
-            drugbank_ids = _parse_list_col(row.get("drugbank_id", ""))
+    df = pd.read_csv(args.input)
+    if args.workers > 1:
+        sys.exit(_run_workers(args, df, len(df), out_path))
 
-            ctx = enricher.enrich(diagnoses=diagnoses, drugbank_ids=drugbank_ids)
-
-            record = row.to_dict()
-            record["medical_knowledge_context"] = ctx.to_dict()
-            fout.write(json.dumps(record, ensure_ascii=False) + "\n")
+    enricher = _build_enricher(args)
+    with out_path.open("w", encoding="utf-8") as fout, tqdm(total=len(df), desc="Enriching rows") as progress:
+        _enrich_frame(enricher, df, fout, args, progress)
 
+    enricher.close()
+    stats = enricher.cache_stats()
+    if stats:
+        print(f"Cache: {stats['hit_rate']:.1%} hit rate ({stats['memory_hits']} memory, "
+              f"{stats['disk_hits']} disk, {stats['misses']} misses)")
     print(f"Done. Wrote {len(df)} enriched rows to {out_path}")
 
 
+def _run_streaming(args: argparse.Namespace, out_path: Path) -> int:
+    """Enrich the input chunk by chunk; returns the exit code."""
+    # Fix every column's dtype over the whole file, so no row's output depends on its chunk
+    total_rows, dtype = scan_csv(args.input)
+    if args.workers > 1:
+        shard_rows = max(1, args.shard_rows)
+        return _run_workers(args, read_csv_chunks(args.input, shard_rows, dtype), total_rows, out_path)
+
+    chunk_rows = max(1, args.chunk_rows)
+    enricher = _build_enricher(args)
+    if args.two_phase and not args.snapshot:
+        _prefetch(enricher, read_csv_chunks(args.input, chunk_rows, dtype), args)
+
+    rows = 0
+    with open_jsonl(str(out_path), compression_for(args.output)) as out, \
+            tqdm(total=total_rows, desc="Enriching rows", unit=" rows") as progress:
+        for chunk in read_csv_chunks(args.input, chunk_rows, dtype):
+            rows += _enrich_chunk(enricher, chunk, out, args, progress)
+
+    enricher.close()
+    stats = enricher.cache_stats()
+    if stats:
+        print(f"Cache: {stats['hit_rate']:.1%} hit rate ({stats['memory_hits']} memory, "
+              f"{stats['disk_hits']} disk, {stats['misses']} misses)")
+    print(f"Done. Wrote {rows} enriched rows to {out_path}")
+    return 0
+
+
+def _run_workers(args: argparse.Namespace, rows: pd.DataFrame | Iterable[pd.DataFrame], total_rows: int,
+                 out_path: Path) -> int:
+    """Enrich the input in sharded worker processes; returns the exit code."""
+    parts_dir = f"{out_path}.parts"
+    compression = compression_for(args.output) if args.stream else None
+    with tqdm(total=total_rows, desc=f"Enriching rows ({args.workers} workers)") as progress:
+        manifest = run_shards(
+            rows, args.input, parts_dir, _enrich_shard,
+            workers=args.workers,
+            shard_rows=max(1, args.shard_rows),
+            retries=args.shard_retries,
+            initializer=_init_worker,
+            initargs=(args,),
+            on_shard_done=lambda shard: progress.update(shard["end"] - shard["start"]),
+            total_rows=total_rows,
+            part_suffix=".jsonl" + (os.path.splitext(args.output)[1] if compression else ""),
+        )
+
+    failed = [shard["shard"] for shard in manifest.pending()]
+    if failed:
+        print(f"Shards {failed} failed (see {manifest.path}); rerun the same command to retry only those")
+        return 1
+    if args.keep_parts:
+        print(f"Done. Wrote {total_rows} enriched rows as {len(manifest.shards)} parts, listed in {manifest.path}")
+        return 0
+    rows_written = merge_parts(manifest, str(out_path))
+    shutil.rmtree(parts_dir)
+    print(f"Done. Wrote {rows_written} enriched rows to {out_path}")
+    return 0
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,152 @@
+"""
+End-to-end ETL benchmark of the PrimeKG loader modes.
+
+Generates seeded synthetic PrimeKG-shaped CSVs at the requested sizes, loads
+each into the local Neo4j with every loader mode and records nodes/sec,
+relationships/sec, p99 transaction latency and peak RSS; parallel modes also
+report their relationship throughput relative to the same mode with one
+writer (``speedup_vs_one_worker``). Every run happens in
+a fresh process so peak RSS is per mode, and the database is emptied before
+each run, so only point this at a scratch database.
+
+Usage:
+    python scripts/benchmark_loader.py --edges 10000 100000 1000000 --wipe-database
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.db.neo4j_connector import get_connector
+from src.utils.synthetic_kg import write_synthetic_primekg
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+# Mode name -> load_primekg_data options (``workers`` None = --workers)
+MODES = {
+    "two-pass": {"single_pass": False, "workers": 1},
+    "two-pass-parallel": {"single_pass": False, "workers": None},
+    "single-pass": {"single_pass": True, "workers": 1},
+    "single-pass-parallel": {"single_pass": True, "workers": None},
+}
+
+# Parallel mode -> the same mode with one writer
+ONE_WORKER_MODES = {"two-pass-parallel": "two-pass", "single-pass-parallel": "single-pass"}
+
+WIPE_QUERY = "MATCH (n) CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS"
+
+
+def _run_mode(csv_file, single_pass, batch_size, workers, report_file, results):
+    """Load ``csv_file`` in a child process and report throughput and peak RSS."""
+    from src.etl.primekg_loader import PrimeKGLoader
+
+    loader = PrimeKGLoader(batch_size=batch_size, workers=workers)
+    result = loader.load_primekg_data(csv_file, single_pass=single_pass, report_file=report_file)
+    loader.db.close()
+    results.put({
+        "nodes_loaded": result["nodes_loaded"],
+        "relationships_loaded": result["relationships_loaded"],
+        "rows": result["total_rows_processed"],
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    })
+
+
+def run_benchmark(csv_file, mode, batch_size, workers, report_file):
+    """
+    Load one file with one loader mode in a fresh process.
+
+    Args:
+        csv_file (str): Synthetic edges CSV
+        mode (str): Key of ``MODES``
+        batch_size (int): Rows per transaction
+        workers (int): Relationship writers of the parallel mode
+        report_file (str): Where the loader writes its run report
+
+    Returns:
+        dict: Benchmark record
+    """
+    options = MODES[mode]
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_run_mode, args=(
+        csv_file, options["single_pass"], batch_size, options["workers"] or workers, report_file, results,
+    ))
+    process.start()
+    process.join()
+    if process.exitcode != 0:
+        raise RuntimeError(f"{mode} load of {csv_file} failed with exit code {process.exitcode}")
+    record = results.get()
+
+    with open(report_file, encoding="utf-8") as handle:
+        report = json.load(handle)
+    seconds = report["elapsed_seconds"]
+    record.update({
+        "mode": mode,
+        "seconds": seconds,
+        "nodes_per_second": round(record["nodes_loaded"] / seconds, 1) if seconds else 0.0,
+        "relationships_per_second": round(record["relationships_loaded"] / seconds, 1) if seconds else 0.0,
+        "transaction_p99_ms": report["transaction_latency_ms"]["p99"],
+        "report": report,
+    })
+    return record
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PrimeKG loader modes against a local Neo4j")
+    parser.add_argument("--edges", type=int, nargs="+", default=[10_000, 100_000], help="Synthetic edge counts")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES), help="Loader modes to run")
+    parser.add_argument("--seed", type=int, default=0, help="Generator seed")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per transaction")
+    parser.add_argument("--workers", type=int, default=4, help="Writers of the parallel mode")
+    parser.add_argument("--work-dir", help="Directory for CSVs and run reports (default: temporary)")
+    parser.add_argument("--output", default="benchmark_loader.json", help="Where to write the results")
+    parser.add_argument("--wipe-database", action="store_true", help="Allow deleting all data before each run")
+    args = parser.parse_args()
+
+    db = get_connector()
+    existing = db.execute_query("MATCH (n) RETURN count(n) AS count")
+    if existing and existing[0]["count"] and not args.wipe_database:
+        logger.error(f"Database holds {existing[0]['count']:,} nodes; rerun with --wipe-database to empty it")
+        sys.exit(1)
+
+    records = []
+    with tempfile.TemporaryDirectory(dir=args.work_dir) as work_dir:
+        for n_edges in args.edges:
+            csv_file = os.path.join(work_dir, f"synthetic_{n_edges}.csv")
+            write_synthetic_primekg(csv_file, n_edges, seed=args.seed)
+            by_mode = {}
+            for mode in args.modes:
+                db.execute_write_query(WIPE_QUERY)
+                report_file = os.path.join(work_dir, f"synthetic_{n_edges}.{mode}.report.json")
+                record = run_benchmark(csv_file, mode, args.batch_size, args.workers, report_file)
+                record["edges"] = n_edges
+                records.append(record)
+                by_mode[mode] = record
+                logger.info(
+                    f"{n_edges:>10,} edges {mode:>22}: {record['nodes_per_second']:>10,.0f} nodes/s "
+                    f"{record['relationships_per_second']:>10,.0f} rels/s  peak RSS {record['peak_rss_mb']:,.0f} MB"
+                )
+            for mode, one_worker_mode in ONE_WORKER_MODES.items():
+                if mode in by_mode and by_mode.get(one_worker_mode, {}).get("relationships_per_second"):
+                    speedup = (by_mode[mode]["relationships_per_second"]
+                               / by_mode[one_worker_mode]["relationships_per_second"])
+                    by_mode[mode]["speedup_vs_one_worker"] = round(speedup, 2)
+                    logger.info(f"{n_edges:>10,} edges {mode:>22}: {speedup:.2f}x the relationships/s "
+                                f"of {one_worker_mode} with {args.workers} workers")
+    db.close()
+
+    with open(args.output, "w", encoding="utf-8") as handle:
+        json.dump(records, handle, indent=2)
+    logger.info(f"Wrote {len(records)} benchmark records to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
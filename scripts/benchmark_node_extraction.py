@@ -0,0 +1,118 @@
+"""
+Benchmark node extraction from a PrimeKG-shaped edges file.
+
+Compares the legacy ``iterrows`` + string-key set extraction with the
+vectorized ``PrimeKGLoader._extract_chunk_nodes``. Only extraction is timed:
+both variants consume the same pre-parsed chunks and nothing is written to
+Neo4j.
+
+Usage:
+    python scripts/benchmark_node_extraction.py --rows 8000000
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.etl.primekg_loader import NodeKeySet, PrimeKGLoader
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+NODE_TYPES = ["gene/protein", "drug", "effect/phenotype", "disease", "biological_process", "anatomy"]
+
+
+def write_synthetic_edges(path, rows, unique_nodes, seed=0):
+    """Write a PrimeKG-shaped CSV with ``rows`` edges over ``unique_nodes`` nodes."""
+    rng = np.random.default_rng(seed)
+    block = 1_000_000
+    for start in range(0, rows, block):
+        n = min(block, rows - start)
+        x_idx = rng.integers(0, unique_nodes, n)
+        y_idx = rng.integers(0, unique_nodes, n)
+        x_type = np.array(NODE_TYPES, dtype=object)[x_idx % len(NODE_TYPES)]
+        y_type = np.array(NODE_TYPES, dtype=object)[y_idx % len(NODE_TYPES)]
+        pd.DataFrame({
+            "relation": "protein_protein",
+            "display_relation": "ppi",
+            "x_index": x_idx,
+            "x_id": x_idx,
+            "x_type": x_type,
+            "x_name": pd.Series(x_idx).map("node{}".format),
+            "x_source": "NCBI",
+            "y_index": y_idx,
+            "y_id": y_idx,
+            "y_type": y_type,
+            "y_name": pd.Series(y_idx).map("node{}".format),
+            "y_source": "NCBI",
+        }).to_csv(path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+
+
+def legacy_extract_chunk_nodes(chunk, processed_nodes):
+    """Node extraction as implemented before vectorization (iterrows + string keys)."""
+    nodes = []
+    for side in ("x", "y"):
+        for _, row in chunk.iterrows():
+            node_id = f"{row[f'{side}_type']}_{row[f'{side}_id']}"
+            if node_id not in processed_nodes:
+                processed_nodes.add(node_id)
+                nodes.append({
+                    "id": str(row[f"{side}_id"]),
+                    "name": row[f"{side}_name"],
+                    "type": row[f"{side}_type"],
+                    "source": row[f"{side}_source"],
+                })
+    return nodes
+
+
+def time_extraction(csv_file, chunk_size, extract, seen):
+    """Return (rows, nodes, seconds) spent inside ``extract`` over all chunks."""
+    rows = 0
+    nodes = 0
+    seconds = 0.0
+    for chunk in pd.read_csv(csv_file, chunksize=chunk_size):
+        started = time.perf_counter()
+        nodes += len(extract(chunk, seen))
+        seconds += time.perf_counter() - started
+        rows += len(chunk)
+    return rows, nodes, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PrimeKG node extraction")
+    parser.add_argument("--rows", type=int, default=8_000_000, help="Synthetic edges to generate")
+    parser.add_argument("--unique-nodes", type=int, default=130_000, help="Distinct node ids")
+    parser.add_argument("--chunk-size", type=int, default=10_000, help="Rows per chunk")
+    parser.add_argument("--csv", help="Existing edges CSV to use instead of generating one")
+    parser.add_argument("--skip-legacy", action="store_true", help="Only time the vectorized extractor")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_file = args.csv
+        if csv_file is None:
+            csv_file = os.path.join(tmp_dir, "synthetic_kg.csv")
+            logger.info(f"Writing {args.rows:,} synthetic rows to {csv_file}")
+            write_synthetic_edges(csv_file, args.rows, args.unique_nodes)
+
+        loader = PrimeKGLoader.__new__(PrimeKGLoader)
+        variants = [("vectorized", loader._extract_chunk_nodes, NodeKeySet)]
+        if not args.skip_legacy:
+            variants.insert(0, ("legacy", legacy_extract_chunk_nodes, set))
+
+        for name, extract, seen_factory in variants:
+            rows, nodes, seconds = time_extraction(csv_file, args.chunk_size, extract, seen_factory())
+            logger.info(
+                f"{name:>10}: {rows:,} rows, {nodes:,} nodes in {seconds:.1f}s "
+                f"({rows / seconds:,.0f} rows/s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Precompute the enrichment payloads of every PrimeKG disease into a snapshot.
+
+Usage:
+    python scripts/build_enrichment_snapshot.py --output data/enrichment_snapshot.sqlite
+
+The snapshot holds, per Disease, its phenotypes, comorbid diseases,
+indicated and contraindicated drugs (truncated to the limits below), the
+Disease names and the adverse DDI pairs. Serve from it with
+ENRICHER_SNAPSHOT_PATH or `batch_enrich.py --snapshot`; rebuild it after
+every load.
+"""
+import argparse
+import sys
+import os
+import logging
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.db.neo4j_connector import get_connector
+from src.enrichment.snapshot import DEFAULT_LIMITS, build_snapshot
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the enrichment snapshot from Neo4j")
+    parser.add_argument("--output", required=True, help="Snapshot file to write")
+    parser.add_argument(
+        "--limit-phenotypes", type=int, default=DEFAULT_LIMITS["causal_pathway"],
+        help=f"Phenotypes kept per disease (default: {DEFAULT_LIMITS['causal_pathway']})"
+    )
+    parser.add_argument(
+        "--limit-comorbid", type=int, default=DEFAULT_LIMITS["comorbid_diseases"],
+        help=f"Comorbid diseases kept per disease (default: {DEFAULT_LIMITS['comorbid_diseases']})"
+    )
+    parser.add_argument(
+        "--limit-indications", type=int, default=DEFAULT_LIMITS["indications"],
+        help=f"Indicated drugs kept per disease (default: {DEFAULT_LIMITS['indications']})"
+    )
+    parser.add_argument(
+        "--limit-contraindications", type=int, default=DEFAULT_LIMITS["contraindications"],
+        help=f"Contraindicated drugs kept per disease (default: {DEFAULT_LIMITS['contraindications']})"
+    )
+    parser.add_argument("--fetch-size", type=int, default=5000, help="Records pulled per round trip")
+    args = parser.parse_args()
+
+    connector = get_connector()
+    if not connector.connect():
+        logger.error("Failed to connect to Neo4j database")
+        return 1
+
+    summary = build_snapshot(
+        args.output,
+        connector=connector,
+        limits={
+            "causal_pathway": args.limit_phenotypes,
+            "comorbid_diseases": args.limit_comorbid,
+            "indications": args.limit_indications,
+            "contraindications": args.limit_contraindications,
+        },
+        fetch_size=args.fetch_size,
+    )
+    print(f"Wrote {args.output}: {summary['diseases']:,} diseases, {summary['payloads']:,} payloads, "
+          f"{summary['ddi_pairs']:,} DDI pairs (graph {summary['graph_version']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
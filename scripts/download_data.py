@@ -12,6 +12,7 @@ import pandas as pd
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.config import DATA_DIR, PRIMEKG_DATA_URL
+from src.utils.columnar import convert_csv_to_parquet, parquet_available, read_schema
 
 def ensure_data_dir():
     """Ensure the data directory exists."""
@@ -94,6 +95,14 @@ def download_primekg_data(output_dir=None):
         file_size = os.path.getsize(csv_path) / (1024 * 1024)  # Size in MB
         print(f"\nDownloaded file: primekg_data.csv ({file_size:.2f} MB)")
         
+        # Build the columnar cache used by the loader and helpers
+        if parquet_available():
+            convert_csv_to_parquet(csv_path)
+            schema = read_schema(csv_path)
+            print(f"Parquet cache: {schema['total_rows']:,} rows")
+        else:
+            print("pyarrow not installed, skipping Parquet cache")
+
         # Print a preview of the file structure
         try:
             df = pd.read_csv(csv_path, nrows=5)
@@ -108,7 +108,7 @@ def _read_batches(csv_path: str, batch_size: int) -> Iterable[List[Dict[str, str
     )
 
 
-def import_ddi(csv_path: str, batch_size: int, clear_existing: bool) -> None:
+def import_ddi(csv_path: str, batch_size: int, clear_existing: bool, commit_size: Optional[int] = None) -> None:
     db = get_connector()
     if not db.connect():
         raise RuntimeError("Failed to connect to Neo4j database")
@@ -125,20 +125,31 @@ def import_ddi(csv_path: str, batch_size: int, clear_existing: bool) -> None:
         if not result.get("success", False):
             raise RuntimeError(f"Failed to clear existing relationships: {result.get('error')}")
 
-    total_rows = 0
-    total_batches = 0
-    for batch in _read_batches(csv_path=csv_path, batch_size=batch_size):
-        result = db.execute_write_query(
-            INSERT_BATCH_QUERY,
-            {"rows": batch, "display_relation": FLAME_DRUG_DRUG_DISPLAY},
+    def log_progress(totals):
+        logger.info("Imported batch %s (%s rows total)", totals["batches_committed"], totals["rows"])
+
+    # One session for the whole file; the driver retries transient failures per transaction
+    result = db.execute_write_batches(
+        INSERT_BATCH_QUERY,
+        (
+            {"rows": batch, "display_relation": FLAME_DRUG_DRUG_DISPLAY}
+            for batch in _read_batches(csv_path=csv_path, batch_size=batch_size)
+        ),
+        commit_size=commit_size,
+        on_commit=log_progress,
+    )
+    if not result.get("success", False):
+        raise RuntimeError(
+            f"Batch insert failed after {result['rows']} committed rows: {result.get('error')}"
         )
-        if not result.get("success", False):
-            raise RuntimeError(f"Batch insert failed: {result.get('error')}")
-        total_rows += len(batch)
-        total_batches += 1
-        logger.info("Imported batch %s (%s rows total)", total_batches, total_rows)
 
-    logger.info("DDI import completed. Total rows processed: %s", total_rows)
+    logger.info(
+        "DDI import completed. Total rows processed: %s in %s transactions (%s relationships created, %s retries)",
+        result["rows"],
+        result["transactions"],
+        result["relationships_created"],
+        result["retries"],
+    )
     db.close()
 
 
@@ -154,6 +165,12 @@ def main() -> None:
         help="Path to ddi_data_all.csv (default: Flame/data/data_process/input/ddi_data_all.csv)",
     )
     parser.add_argument("--batch-size", type=int, default=2000, help="Rows per batch write to Neo4j")
+    parser.add_argument(
+        "--commit-size",
+        type=int,
+        default=None,
+        help="Rows per transaction (default: one batch per transaction)",
+    )
     parser.add_argument(
         "--clear-existing",
         action="store_true",
@@ -166,7 +183,12 @@ def main() -> None:
     if args.batch_size <= 0:
         raise ValueError("--batch-size must be > 0")
 
-    import_ddi(csv_path=args.csv_path, batch_size=args.batch_size, clear_existing=args.clear_existing)
+    import_ddi(
+        csv_path=args.csv_path,
+        batch_size=args.batch_size,
+        clear_existing=args.clear_existing,
+        commit_size=args.commit_size,
+    )
 
 
 if __name__ == "__main__":
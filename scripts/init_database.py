@@ -8,6 +8,7 @@ import logging
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.db.neo4j_connector import get_connector
+from src.etl.primekg_loader import NAME_INDEXES
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -44,6 +45,8 @@ def init_database():
         "CREATE INDEX IF NOT EXISTS FOR (n:Protein) ON (n.name)",
         "CREATE INDEX IF NOT EXISTS FOR (n:Drug) ON (n.name)"
     ]
+    # Full-text indexes used to match diagnoses to diseases
+    indexes += NAME_INDEXES
     
     # Execute constraint queries
     for constraint in constraints:
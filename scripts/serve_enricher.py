@@ -10,11 +10,34 @@ Start:
 POST /enrich
     Body: { "diagnoses": ["Heart Failure"], "drugbank_ids": ["DB00390", "DB00695"] }
     Returns: { "medical_knowledge_context": { ... } }
+
+The handler is async: queries run on the event loop through the async Neo4j
+driver (pool size NEO4J_MAX_CONNECTION_POOL_SIZE), so one worker keeps many
+requests in flight without a thread per request.
+
+Diagnoses are resolved to Disease ids with an in-process ``DiseaseNameIndex``
+built at startup and rebuilt when the graph version changes; POST
+/disease-index/refresh rebuilds it at once. A build that cannot read the
+graph is retried (ENRICHER_INDEX_BUILD_ATTEMPTS) and then fails startup,
+rather than serving an empty index.
+Drug pairs are checked against an in-process ``DDIIndex`` of the adverse
+interactions, also built at startup (with the same retries) and rebuilt
+when the graph version changes.
+Results are cached when ENRICHER_CACHE_SIZE enables the cache (off by
+default, see the other ENRICHER_CACHE_* settings); GET /cache/stats reports
+hit rates and POST /cache/invalidate drops the cached results.
+
+With ENRICHER_SNAPSHOT_PATH set, requests are answered from that enrichment
+snapshot (see scripts/build_enrichment_snapshot.py) and never reach Neo4j;
+POST /snapshot/reload loads a rebuilt file.
 """
 from __future__ import annotations
 
 import sys
 import os
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from typing import List
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -22,20 +45,57 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from fastapi import FastAPI
 from pydantic import BaseModel
 
-from src.enrichment import EnricherOrchestrator
+from config.config import ENRICHER_INDEX_BUILD_ATTEMPTS, ENRICHER_SNAPSHOT_PATH
+from src.enrichment import AsyncEnricherOrchestrator, DDIIndex, DiseaseNameIndex, EnrichmentSnapshot
 
-app = FastAPI(title="PrimeKG Enricher", version="0.1.0")
+logger = logging.getLogger(__name__)
 
-_enricher: EnricherOrchestrator | None = None
+_disease_index = DiseaseNameIndex()
+_ddi_index = DDIIndex()
+_snapshot: EnrichmentSnapshot | None = None
+_enricher: AsyncEnricherOrchestrator | None = None
 
 
-def _get_enricher() -> EnricherOrchestrator:
+def _get_enricher() -> AsyncEnricherOrchestrator:
     global _enricher
     if _enricher is None:
-        _enricher = EnricherOrchestrator()
+        _enricher = AsyncEnricherOrchestrator(
+            disease_index=_disease_index, ddi_index=_ddi_index, snapshot=_snapshot
+        )
     return _enricher
 
 
+async def _build_index(index) -> None:
+    """Build an in-process index, retrying while Neo4j is unreachable; re-raises after the last attempt."""
+    for attempt in range(1, ENRICHER_INDEX_BUILD_ATTEMPTS + 1):
+        try:
+            await asyncio.to_thread(index.refresh)
+            return
+        except Exception as e:
+            if attempt >= ENRICHER_INDEX_BUILD_ATTEMPTS:
+                raise
+            delay = min(2 ** attempt, 30)
+            logger.warning(f"Building {type(index).__name__} failed ({e}), "
+                           f"retrying in {delay}s ({attempt}/{ENRICHER_INDEX_BUILD_ATTEMPTS})")
+            await asyncio.sleep(delay)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _snapshot
+    if ENRICHER_SNAPSHOT_PATH:
+        _snapshot = await asyncio.to_thread(EnrichmentSnapshot, ENRICHER_SNAPSHOT_PATH)
+    else:
+        await _build_index(_disease_index)
+        await _build_index(_ddi_index)
+    yield
+    if _enricher is not None:
+        await _enricher.close()
+
+
+app = FastAPI(title="PrimeKG Enricher", version="0.1.0", lifespan=lifespan)
+
+
 class EnrichRequest(BaseModel):
     diagnoses: List[str]
     drugbank_ids: List[str] = []
@@ -46,14 +106,43 @@ class EnrichResponse(BaseModel):
 
 
 @app.post("/enrich", response_model=EnrichResponse)
-def enrich(request: EnrichRequest) -> EnrichResponse:
-    ctx = _get_enricher().enrich(
+async def enrich(request: EnrichRequest) -> EnrichResponse:
+    ctx = await _get_enricher().enrich(
         diagnoses=request.diagnoses,
         drugbank_ids=request.drugbank_ids,
     )
     return EnrichResponse(medical_knowledge_context=ctx.to_dict())
 
 
+@app.post("/disease-index/refresh")
+async def refresh_disease_index() -> dict:
+    diseases = await asyncio.to_thread(_disease_index.refresh)
+    return {"diseases": diseases}
+
+
+@app.post("/snapshot/reload")
+async def reload_snapshot() -> dict:
+    global _snapshot, _enricher
+    if not ENRICHER_SNAPSHOT_PATH:
+        return {"status": "disabled"}
+    _snapshot = await asyncio.to_thread(EnrichmentSnapshot, ENRICHER_SNAPSHOT_PATH)
+    # In-flight requests finish on the previous enricher and snapshot
+    _enricher = None
+    return {"diseases": len(_snapshot), "graph_version": _snapshot.graph_version}
+
+
+@app.get("/cache/stats")
+async def cache_stats() -> dict:
+    return _get_enricher().cache_stats()
+
+
+@app.post("/cache/invalidate")
+async def invalidate_cache() -> dict:
+    # Clearing the on-disk tier is blocking I/O
+    await asyncio.to_thread(_get_enricher().invalidate_cache)
+    return {"status": "ok"}
+
+
 @app.get("/health")
 def health() -> dict:
     return {"status": "ok"}
@@ -1,20 +1,44 @@
 """
 Neo4j database connector for the PrimeKG project.
 """
+import time
+import asyncio
 import logging
-from neo4j import GraphDatabase
-from neo4j.exceptions import ServiceUnavailable, AuthError
+import threading
+import pandas as pd
+from neo4j import AsyncGraphDatabase, GraphDatabase
+from neo4j.exceptions import ServiceUnavailable, SessionExpired, AuthError, TransientError
 
 # Import configuration
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-from config.config import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD
+from config.config import (
+    NEO4J_URI,
+    NEO4J_USER,
+    NEO4J_PASSWORD,
+    NEO4J_MAX_TRANSACTION_RETRY_TIME,
+    NEO4J_MAX_CONNECTION_POOL_SIZE,
+    NEO4J_CONNECTION_ACQUISITION_TIMEOUT,
+)
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Summary counters returned by the write methods
+WRITE_COUNTERS = [
+    "nodes_created",
+    "relationships_created",
+    "properties_set",
+    "labels_added",
+    "nodes_deleted",
+    "relationships_deleted",
+]
+
+# Failures the driver retries inside transaction functions
+RETRYABLE_ERRORS = (TransientError, ServiceUnavailable, SessionExpired)
+
 class Neo4jConnector:
     """
     A connector class for Neo4j database operations.
@@ -33,20 +57,38 @@ class Neo4jConnector:
         self.user = user
         self.password = password
         self.driver = None
+        self._connect_lock = threading.Lock()
         
     def connect(self):
         """
         Establish a connection to the Neo4j database.
+
+        Safe to call from several threads: only the first call creates the driver.
         
         Returns:
             bool: True if connection successful, False otherwise
         """
+        with self._connect_lock:
+            if self.driver is not None:
+                return True
+            return self._connect()
+
+    def _connect(self):
+        driver = None
         try:
-            self.driver = GraphDatabase.driver(self.uri, auth=(self.user, self.password))
+            driver = GraphDatabase.driver(
+                self.uri,
+                auth=(self.user, self.password),
+                max_transaction_retry_time=NEO4J_MAX_TRANSACTION_RETRY_TIME,
+                max_connection_pool_size=NEO4J_MAX_CONNECTION_POOL_SIZE,
+                connection_acquisition_timeout=NEO4J_CONNECTION_ACQUISITION_TIMEOUT,
+            )
             # Verify connection by running a simple query
-            with self.driver.session() as session:
+            with driver.session() as session:
                 result = session.run("RETURN 1 AS test")
                 result.single()
+            self.driver = driver
+            driver = None
             logger.info(f"Connected to Neo4j database at {self.uri}")
             return True
         except ServiceUnavailable as e:
@@ -58,20 +100,25 @@ class Neo4jConnector:
         except Exception as e:
             logger.error(f"Unexpected error: {e}")
             return False
+        finally:
+            if driver is not None:
+                driver.close()
     
     def close(self):
         """Close the Neo4j connection."""
         if self.driver:
             self.driver.close()
+            self.driver = None
             logger.info("Neo4j connection closed")
     
-    def execute_query(self, query, parameters=None):
+    def execute_query(self, query, parameters=None, raise_errors=False):
         """
         Execute a Cypher query.
         
         Args:
             query (str): Cypher query to execute
             parameters (dict): Query parameters
+            raise_errors (bool): Re-raise errors after logging them instead of returning []
             
         Returns:
             list: Query results
@@ -79,6 +126,8 @@ class Neo4jConnector:
         if not self.driver:
             if not self.connect():
                 logger.error("Cannot execute query: Not connected to Neo4j")
+                if raise_errors:
+                    raise ConnectionError("Not connected to Neo4j")
                 return []
         
         try:
@@ -89,8 +138,64 @@ class Neo4jConnector:
             logger.error(f"Query execution error: {e}")
             logger.error(f"Query: {query}")
             logger.error(f"Parameters: {parameters}")
+            if raise_errors:
+                raise
             return []
     
+    def stream_query(self, query, parameters=None, fetch_size=1000):
+        """
+        Execute a Cypher query and yield its records lazily.
+
+        Records are pulled from the server ``fetch_size`` at a time, so memory
+        stays constant however many rows the query returns. The session stays
+        open until iteration finishes or the generator is closed.
+
+        Args:
+            query (str): Cypher query to execute
+            parameters (dict): Query parameters
+            fetch_size (int): Records fetched per round trip
+
+        Yields:
+            dict: One record
+
+        Raises:
+            RuntimeError: If no connection can be established
+        """
+        if not self.driver:
+            if not self.connect():
+                raise RuntimeError("Cannot execute query: Not connected to Neo4j")
+
+        try:
+            with self.driver.session(fetch_size=fetch_size) as session:
+                for record in session.run(query, parameters or {}):
+                    yield record.data()
+        except Exception as e:
+            logger.error(f"Streaming query error: {e}")
+            logger.error(f"Query: {query}")
+            raise
+
+    def stream_dataframes(self, query, parameters=None, batch_size=10000, fetch_size=1000):
+        """
+        Execute a Cypher query and yield its records as pandas DataFrame batches.
+
+        Args:
+            query (str): Cypher query to execute
+            parameters (dict): Query parameters
+            batch_size (int): Rows per DataFrame
+            fetch_size (int): Records fetched per round trip
+
+        Yields:
+            pd.DataFrame: Up to ``batch_size`` records, one column per returned key
+        """
+        batch = []
+        for record in self.stream_query(query, parameters, fetch_size=fetch_size):
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield pd.DataFrame.from_records(batch)
+                batch = []
+        if batch:
+            yield pd.DataFrame.from_records(batch)
+
     def execute_write_query(self, query, parameters=None):
         """
         Execute a write query (CREATE, MERGE, DELETE, etc.).
@@ -100,7 +205,7 @@ class Neo4jConnector:
             parameters (dict): Query parameters
             
         Returns:
-            dict: Summary statistics
+            dict: Summary statistics (``transient`` is set when the failure can be retried)
         """
         if not self.driver:
             if not self.connect():
@@ -120,12 +225,224 @@ class Neo4jConnector:
                     "nodes_deleted": summary.counters.nodes_deleted,
                     "relationships_deleted": summary.counters.relationships_deleted
                 }
+        except TransientError as e:
+            # Deadlocks, lock timeouts, etc. - the caller may retry
+            logger.warning(f"Transient write query error: {e}")
+            return {"success": False, "error": str(e), "transient": True}
         except Exception as e:
             logger.error(f"Write query execution error: {e}")
             logger.error(f"Query: {query}")
             logger.error(f"Parameters: {parameters}")
             return {"success": False, "error": str(e)}
 
+    def execute_write_batches(self, query, batches, commit_size=None, on_commit=None):
+        """
+        Execute a write query once per parameter batch in managed transactions.
+
+        All batches run in one session. Consecutive batches share a transaction
+        until it holds ``commit_size`` rows (the length of each batch's
+        ``rows`` parameter). Every transaction is a transaction function run
+        through ``session.execute_write``, so the driver retries deadlocks, lock
+        timeouts and leader switches with exponential backoff for up to
+        ``NEO4J_MAX_TRANSACTION_RETRY_TIME`` seconds.
+
+        Args:
+            query (str): Cypher query to execute
+            batches (iterable): Parameter dicts, one query execution each
+            commit_size (int): Rows per transaction (None = one transaction per batch)
+            on_commit (callable): Called with the running totals after every committed transaction,
+                e.g. to log progress
+
+        Returns:
+            dict: Counters summed over the committed transactions, plus ``rows``,
+            ``transactions``, ``batches_committed``, ``retries`` and
+            ``transaction_seconds``. On failure ``success`` is False with
+            ``error``, and ``transient`` is set if the retries ran out.
+        """
+        totals = {
+            "success": True,
+            "rows": 0,
+            "transactions": 0,
+            "batches_committed": 0,
+            "retries": 0,
+            "transaction_seconds": [],
+        }
+        totals.update(dict.fromkeys(WRITE_COUNTERS, 0))
+
+        if not self.driver:
+            if not self.connect():
+                logger.error("Cannot execute query: Not connected to Neo4j")
+                totals.update({"success": False, "error": "Not connected to Neo4j"})
+                return totals
+
+        attempts = []
+
+        def run_group(tx, group):
+            attempts.append(1)
+            counters = dict.fromkeys(WRITE_COUNTERS, 0)
+            for parameters in group:
+                summary = tx.run(query, parameters).consume()
+                for key in WRITE_COUNTERS:
+                    counters[key] += getattr(summary.counters, key)
+            return counters
+
+        def commit(session, group):
+            started = time.perf_counter()
+            del attempts[:]
+            counters = session.execute_write(run_group, group)
+            totals["transaction_seconds"].append(time.perf_counter() - started)
+            totals["retries"] += len(attempts) - 1
+            totals["transactions"] += 1
+            totals["batches_committed"] += len(group)
+            totals["rows"] += sum(len(parameters.get("rows", ())) for parameters in group)
+            for key in WRITE_COUNTERS:
+                totals[key] += counters[key]
+            if on_commit is not None:
+                on_commit(totals)
+
+        try:
+            with self.driver.session() as session:
+                group = []
+                group_rows = 0
+                for parameters in batches:
+                    group.append(parameters)
+                    group_rows += len(parameters.get("rows", ()))
+                    if commit_size is None or group_rows >= commit_size:
+                        commit(session, group)
+                        group = []
+                        group_rows = 0
+                if group:
+                    commit(session, group)
+        except RETRYABLE_ERRORS as e:
+            totals["retries"] += max(len(attempts) - 1, 0)
+            logger.warning(f"Write transaction failed after retries: {e}")
+            totals.update({"success": False, "error": str(e), "transient": True})
+        except Exception as e:
+            logger.error(f"Write transaction error: {e}")
+            logger.error(f"Query: {query}")
+            totals.update({"success": False, "error": str(e)})
+        return totals
+
+    def index_exists(self, name):
+        """
+        Check whether an index (of any type) with the given name exists and is online.
+
+        Args:
+            name (str): Index name
+
+        Returns:
+            bool: True if the index exists and is online
+        """
+        result = self.execute_query(
+            "SHOW INDEXES YIELD name, state WHERE name = $name RETURN state",
+            {"name": name},
+        )
+        return bool(result) and result[0].get("state") == "ONLINE"
+
+class AsyncNeo4jConnector:
+    """
+    An asyncio connector for Neo4j read queries.
+
+    Built on ``AsyncGraphDatabase``: a query waiting on the server holds a
+    pooled connection but no thread, so one event loop can keep many requests
+    in flight. The pool size and acquisition timeout come from the config.
+    """
+
+    def __init__(self, uri=NEO4J_URI, user=NEO4J_USER, password=NEO4J_PASSWORD,
+                 max_connection_pool_size=NEO4J_MAX_CONNECTION_POOL_SIZE,
+                 connection_acquisition_timeout=NEO4J_CONNECTION_ACQUISITION_TIMEOUT):
+        """
+        Initialize the async Neo4j connector.
+
+        Args:
+            uri (str): Neo4j connection URI
+            user (str): Neo4j username
+            password (str): Neo4j password
+            max_connection_pool_size (int): Maximum pooled connections (concurrent queries)
+            connection_acquisition_timeout (float): Seconds to wait for a free pooled connection
+        """
+        self.uri = uri
+        self.user = user
+        self.password = password
+        self.max_connection_pool_size = max_connection_pool_size
+        self.connection_acquisition_timeout = connection_acquisition_timeout
+        self.driver = None
+        self._connect_lock = None
+
+    async def connect(self):
+        """
+        Establish a connection to the Neo4j database.
+
+        Returns:
+            bool: True if connection successful, False otherwise
+        """
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self.driver:
+                return True
+            driver = AsyncGraphDatabase.driver(
+                self.uri,
+                auth=(self.user, self.password),
+                max_connection_pool_size=self.max_connection_pool_size,
+                connection_acquisition_timeout=self.connection_acquisition_timeout,
+            )
+            try:
+                await driver.verify_connectivity()
+            except ServiceUnavailable as e:
+                logger.error(f"Failed to connect to Neo4j: {e}")
+                await driver.close()
+                return False
+            except AuthError as e:
+                logger.error(f"Authentication error: {e}")
+                await driver.close()
+                return False
+            except Exception as e:
+                logger.error(f"Unexpected error: {e}")
+                await driver.close()
+                return False
+            self.driver = driver
+            logger.info(f"Connected to Neo4j database at {self.uri} (async, pool size {self.max_connection_pool_size})")
+            return True
+
+    async def close(self):
+        """Close the Neo4j connection."""
+        if self.driver:
+            await self.driver.close()
+            self.driver = None
+            logger.info("Async Neo4j connection closed")
+
+    async def execute_query(self, query, parameters=None, raise_errors=False):
+        """
+        Execute a Cypher query.
+
+        Args:
+            query (str): Cypher query to execute
+            parameters (dict): Query parameters
+            raise_errors (bool): Re-raise errors after logging them instead of returning []
+
+        Returns:
+            list: Query results
+        """
+        if not self.driver:
+            if not await self.connect():
+                logger.error("Cannot execute query: Not connected to Neo4j")
+                if raise_errors:
+                    raise ConnectionError("Not connected to Neo4j")
+                return []
+
+        try:
+            async with self.driver.session() as session:
+                result = await session.run(query, parameters or {})
+                return [record.data() async for record in result]
+        except Exception as e:
+            logger.error(f"Query execution error: {e}")
+            logger.error(f"Query: {query}")
+            logger.error(f"Parameters: {parameters}")
+            if raise_errors:
+                raise
+            return []
+
 # Singleton instance
 _connector = None
 
@@ -1,4 +1,16 @@
+from .async_enricher import AsyncEnricherOrchestrator
+from .ddi_index import DDIIndex
+from .disease_index import DiseaseNameIndex
 from .enricher import EnricherOrchestrator
 from .schema import MedicalKnowledgeContext
+from .snapshot import EnrichmentSnapshot, build_snapshot
 
-__all__ = ["EnricherOrchestrator", "MedicalKnowledgeContext"]
+__all__ = [
+    "AsyncEnricherOrchestrator",
+    "DDIIndex",
+    "DiseaseNameIndex",
+    "EnricherOrchestrator",
+    "EnrichmentSnapshot",
+    "MedicalKnowledgeContext",
+    "build_snapshot",
+]
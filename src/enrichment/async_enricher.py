@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import sys
+import os
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.db.neo4j_connector import AsyncNeo4jConnector
+from src.enrichment.cache import EnrichmentCache
+from src.enrichment.ddi_index import DDIIndex
+from src.enrichment.disease_index import DiseaseNameIndex
+from src.enrichment.enricher import ASPECTS, Prepared, _OrchestratorBase
+from src.enrichment.queries import GRAPH_VERSION_QUERY
+from src.enrichment.snapshot import EnrichmentSnapshot
+from src.enrichment.schema import (
+    CausalPathwayEntry,
+    ComorbidDiseaseEntry,
+    IndicationEntry,
+    ContraindicationEntry,
+    DDIAlert,
+    MedicalKnowledgeContext,
+)
+
+
+class AsyncEnricherOrchestrator(_OrchestratorBase):
+    """
+    asyncio variant of ``EnricherOrchestrator``.
+
+    Runs the same queries through an ``AsyncNeo4jConnector``; ``enrich``
+    awaits the five aspect queries concurrently, or the combined diagnosis
+    query and the DDI query with ``combined_query=True``. A ``disease_index``
+    is queried synchronously; build it before serving so the first request
+    does not block the event loop. Results are cached like in
+    ``EnricherOrchestrator``; lookups in the optional on-disk tier are short
+    blocking SQLite reads. With a ``snapshot`` the aspects are answered from
+    memory and no connector is opened. The ``ddi_index`` and a graph-built
+    ``disease_index`` are rebuilt in a worker thread when the graph version
+    changes; build them before serving too.
+    """
+
+    def __init__(
+        self,
+        connector: Optional[AsyncNeo4jConnector] = None,
+        limit_phenotypes: int = 10,
+        limit_comorbid: int = 5,
+        limit_indications: int = 10,
+        limit_contraindications: int = 10,
+        combined_query: bool = False,
+        disease_index: Optional[DiseaseNameIndex] = None,
+        fulltext: bool = False,
+        cache: Optional[EnrichmentCache] = None,
+        use_cache: bool = True,
+        snapshot: Optional[EnrichmentSnapshot] = None,
+        ddi_index: Optional[DDIIndex] = None,
+    ):
+        if connector is None and snapshot is None:
+            connector = AsyncNeo4jConnector()
+        super().__init__(
+            connector,
+            limit_phenotypes=limit_phenotypes,
+            limit_comorbid=limit_comorbid,
+            limit_indications=limit_indications,
+            limit_contraindications=limit_contraindications,
+            combined_query=combined_query,
+            disease_index=disease_index,
+            fulltext=fulltext,
+            cache=cache,
+            use_cache=use_cache,
+            snapshot=snapshot,
+            ddi_index=ddi_index,
+        )
+        # One version check (and index rebuild) at a time, like the sync orchestrator's lock
+        self._version_lock = asyncio.Lock()
+
+    async def _check_graph_version(self) -> None:
+        if self._version_due():
+            async with self._version_lock:
+                if self._version_due():
+                    self._set_graph_version(await self._connector.execute_query(GRAPH_VERSION_QUERY))
+                if self._ddi_index_stale():
+                    await asyncio.to_thread(self._ddi_index.refresh)
+                if self._disease_index_stale():
+                    await asyncio.to_thread(self._disease_index.refresh)
+
+    async def _fetch(self, request: Optional[Tuple[str, dict]]) -> Optional[List[dict]]:
+        if request is None:
+            return []
+        if self._cache is None:
+            return await self._connector.execute_query(*request)
+        try:
+            return await self._connector.execute_query(*request, raise_errors=True)
+        except Exception:
+            # Already logged by the connector; answer from the cache without storing the failure
+            return None
+
+    async def _run(self, prepared: Prepared) -> Any:
+        request, finish = prepared
+        return finish(await self._fetch(request))
+
+    async def _run_aspect(self, aspect: str, inputs: List[str]) -> list:
+        if self._snapshot is not None:
+            return self._snapshot_aspect(aspect, inputs)
+        await self._check_graph_version()
+        if aspect == "ddi_alerts" and self._ddi_index is not None:
+            return self._build_aspect(aspect, self._ddi_index.rows(inputs))
+        return await self._run(self._prepare_aspect(aspect, inputs))
+
+    async def _run_combined(self, diagnoses: List[str]) -> Dict[str, list]:
+        await self._check_graph_version()
+        return await self._run(self._prepare_combined(diagnoses))
+
+    async def causal_pathway(self, diagnoses: List[str]) -> List[CausalPathwayEntry]:
+        return await self._run_aspect("causal_pathway", diagnoses)
+
+    async def comorbid_diseases(self, diagnoses: List[str]) -> List[ComorbidDiseaseEntry]:
+        return await self._run_aspect("comorbid_diseases", diagnoses)
+
+    async def indications(self, diagnoses: List[str]) -> List[IndicationEntry]:
+        return await self._run_aspect("indications", diagnoses)
+
+    async def contraindications(self, diagnoses: List[str]) -> List[ContraindicationEntry]:
+        return await self._run_aspect("contraindications", diagnoses)
+
+    async def ddi_alerts(self, drugbank_ids: List[str]) -> List[DDIAlert]:
+        return await self._run_aspect("ddi_alerts", drugbank_ids)
+
+    async def enrich(self, diagnoses: List[str], drugbank_ids: List[str]) -> MedicalKnowledgeContext:
+        if self._snapshot is not None:
+            return self._snapshot_context(diagnoses, drugbank_ids)
+        await self._check_graph_version()
+        if self._combined_query:
+            aspects, ddi_alerts = await asyncio.gather(
+                self._run_combined(diagnoses), self._run_aspect("ddi_alerts", drugbank_ids)
+            )
+            return MedicalKnowledgeContext(**aspects, ddi_alerts=ddi_alerts)
+        inputs = self._aspect_inputs(diagnoses, drugbank_ids)
+        results = await asyncio.gather(*(self._run_aspect(aspect, inputs[aspect]) for aspect in ASPECTS))
+        return MedicalKnowledgeContext(**dict(zip(ASPECTS, results)))
+
+    async def enrich_many(self, batch: List[Tuple[List[str], List[str]]]) -> List[MedicalKnowledgeContext]:
+        """Enrich many rows at once, see ``EnricherOrchestrator.enrich_many``."""
+        if self._snapshot is not None:
+            return [self._snapshot_context(diagnoses, drugbank_ids) for diagnoses, drugbank_ids in batch]
+        await self._check_graph_version()
+        requests, finish = self._prepare_many(batch)
+        rows = await asyncio.gather(*(self._fetch(request) for request in requests.values()))
+        return finish(dict(zip(requests, rows)))
+
+    async def close(self) -> None:
+        if self._connector is not None:
+            await self._connector.close()
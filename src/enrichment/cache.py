@@ -0,0 +1,169 @@
+"""
+Two-tier cache of enrichment query results.
+
+Entries are the raw rows of one diagnosis aspect for one diagnosis, or of
+the DDI query for one drug pair, keyed by what determines them (normalized
+tokens or drug ids, limit, matching mode and the graph version stamp). The
+first tier is an in-process LRU with a TTL; the optional second tier is a
+SQLite file that several processes (batch workers, server replicas) share.
+"""
+from __future__ import annotations
+
+import sys
+import os
+import json
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config.config import ENRICHER_CACHE_PATH, ENRICHER_CACHE_SIZE, ENRICHER_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+# Marker for "not cached"; an empty result list is a valid cached value
+MISS = object()
+
+
+def cache_key(*parts: Any) -> str:
+    """Stable key of JSON-serializable ``parts``."""
+    encoded = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+def graph_version_stamp(rows: list) -> str:
+    """Version stamp from the rows of ``GRAPH_VERSION_QUERY``."""
+    row = rows[0] if rows else {}
+    return f"{row['version']}@{row.get('applied_at')}" if row.get("version") else "unversioned"
+
+
+class EnrichmentCache:
+    """
+    In-process LRU + TTL cache with an optional shared on-disk tier.
+
+    ``get`` looks in memory first, then on disk (promoting disk hits into
+    memory); ``set`` writes both tiers. Values must be JSON-serializable.
+    Hits and misses are counted per tier, see ``stats``. All methods are
+    thread-safe.
+    """
+
+    def __init__(self, max_entries: int = 100_000, ttl: float = 3600.0, path: Optional[str] = None):
+        """
+        Args:
+            max_entries: Entries kept in memory before the least recently used are evicted
+            ttl: Seconds an entry stays valid in either tier (0 = no expiry)
+            path: SQLite file of the shared tier (None = memory only)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._counts = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0, "evictions": 0}
+        if path:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            with self._db() as db:
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT, expires_at REAL)"
+                )
+                db.execute("DELETE FROM entries WHERE expires_at < ?", (time.time(),))
+
+    def _db(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def _expires_at(self) -> float:
+        return time.time() + self.ttl if self.ttl else float("inf")
+
+    def get(self, key: str) -> Any:
+        """Cached value of ``key``, or ``MISS``."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] >= now:
+                    self._entries.move_to_end(key)
+                    self._counts["memory_hits"] += 1
+                    return entry[1]
+                del self._entries[key]
+
+        if self.path:
+            row = self._db().execute(
+                "SELECT value, expires_at FROM entries WHERE key = ? AND expires_at >= ?", (key, now)
+            ).fetchone()
+            if row is not None:
+                value = json.loads(row[0])
+                with self._lock:
+                    self._counts["disk_hits"] += 1
+                    self._remember(key, value, row[1])
+                return value
+
+        with self._lock:
+            self._counts["misses"] += 1
+        return MISS
+
+    def set(self, key: str, value: Any) -> None:
+        """Store ``value`` under ``key`` in both tiers."""
+        expires_at = self._expires_at()
+        with self._lock:
+            self._counts["sets"] += 1
+            self._remember(key, value, expires_at)
+        if self.path:
+            with self._db() as db:
+                db.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value, default=str), expires_at),
+                )
+
+    def _remember(self, key: str, value: Any, expires_at: float) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counts["evictions"] += 1
+
+    def clear(self, memory_only: bool = False) -> None:
+        """
+        Drop all entries, e.g. after the graph was reloaded.
+
+        Args:
+            memory_only: Keep the shared on-disk tier
+        """
+        with self._lock:
+            self._entries.clear()
+        if self.path and not memory_only:
+            with self._db() as db:
+                db.execute("DELETE FROM entries")
+        logger.info("Enrichment cache cleared" + (" (memory tier)" if memory_only else ""))
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters, hit rate and the number of entries in memory."""
+        with self._lock:
+            stats = dict(self._counts)
+            stats["entries"] = len(self._entries)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+def default_cache() -> Optional[EnrichmentCache]:
+    """
+    Cache configured by ``ENRICHER_CACHE_SIZE``, ``ENRICHER_CACHE_TTL`` and
+    ``ENRICHER_CACHE_PATH``; None when ``ENRICHER_CACHE_SIZE`` is 0.
+    """
+    if ENRICHER_CACHE_SIZE <= 0:
+        return None
+    return EnrichmentCache(max_entries=ENRICHER_CACHE_SIZE, ttl=ENRICHER_CACHE_TTL, path=ENRICHER_CACHE_PATH)
@@ -0,0 +1,141 @@
+"""
+In-process index of the adverse drug-drug interactions.
+
+``DDI_QUERY`` unwinds every pair of the input drugs and matches each pair
+in the graph, so a 20-drug regimen costs 190 pattern matches per request.
+``DDIIndex`` loads the adverse ``DRUG_DRUG`` edges once and answers the same
+pairwise checks with a binary search over sorted integer pair keys.
+"""
+from __future__ import annotations
+
+import sys
+import os
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.db.neo4j_connector import get_connector
+from src.enrichment.cache import graph_version_stamp
+from src.enrichment.queries import ADVERSE_DDI_EDGES_QUERY, GRAPH_VERSION_QUERY
+
+logger = logging.getLogger(__name__)
+
+# Per-edge fields besides the drugs; few distinct values, so stored once each
+_PAYLOAD_COLUMNS = ("interaction", "ddi_type", "pattern")
+
+
+class DDIIndex:
+    """
+    Adverse DDI edges over an interned DrugBank id vocabulary.
+
+    Drug ids are numbered in sorted order, so the pair ``(i, j)`` with
+    ``i < j`` is the pair ``id1 < id2`` of ``DDI_QUERY``. Each edge is the
+    int64 key ``i * n + j`` in one sorted array, next to the index of its
+    ``(interaction, ddi_type, pattern)`` payload; several edges of a pair
+    (e.g. one per direction) are adjacent. ``rows(drug_ids)`` searches the
+    keys of all pairs of a regimen at once and returns the rows
+    ``DDI_QUERY`` would.
+
+    The index is built on first use and rebuilt by ``refresh()``; it records
+    the graph version it was built from (``graph_version``) so the
+    orchestrators can rebuild it when the graph changes. Rebuilding swaps
+    the whole index at once, so concurrent lookups see either the old or
+    the new one.
+    """
+
+    def __init__(self, connector: Optional[Any] = None):
+        self._connector = connector
+        self._refresh_lock = threading.Lock()
+        self._index: Optional[tuple] = None
+        self.graph_version: Optional[str] = None
+
+    def refresh(self) -> int:
+        """
+        Reload the adverse DDI edges from the graph and rebuild the index.
+
+        Returns:
+            Number of indexed edges
+
+        Raises:
+            Exception: If the graph cannot be read; the previous index (if any) is kept
+        """
+        with self._refresh_lock:
+            return self._build()
+
+    def _build(self) -> int:
+        connector = self._connector or get_connector()
+        # Read first: edges loaded after it are picked up by the next refresh.
+        # A failed read must not pass for "no interactions".
+        version = graph_version_stamp(connector.execute_query(GRAPH_VERSION_QUERY, raise_errors=True))
+        rows = [
+            row for row in connector.execute_query(ADVERSE_DDI_EDGES_QUERY, raise_errors=True)
+            if row.get("id1") is not None and row.get("id2") is not None
+        ]
+
+        names: Dict[Any, str] = {}
+        for row in rows:
+            names.setdefault(row["id1"], row.get("drug1"))
+            names.setdefault(row["id2"], row.get("drug2"))
+        ids = sorted(names)
+        positions = {drug_id: position for position, drug_id in enumerate(ids)}
+
+        payloads: List[tuple] = []
+        payload_positions: Dict[tuple, int] = {}
+        keys = np.empty(len(rows), dtype=np.int64)
+        payload_of = np.empty(len(rows), dtype=np.int32)
+        for k, row in enumerate(rows):
+            i, j = sorted((positions[row["id1"]], positions[row["id2"]]))
+            payload = tuple(row.get(column) for column in _PAYLOAD_COLUMNS)
+            position = payload_positions.get(payload)
+            if position is None:
+                position = payload_positions[payload] = len(payloads)
+                payloads.append(payload)
+            keys[k] = i * len(ids) + j
+            payload_of[k] = position
+        order = np.argsort(keys, kind="stable")
+
+        self._index = (
+            ids, positions, [names[drug_id] for drug_id in ids], keys[order], payload_of[order], payloads
+        )
+        self.graph_version = version
+        logger.info(f"Indexed {len(rows):,} adverse DDI edges over {len(ids):,} drugs (graph {version})")
+        return len(rows)
+
+    def _get_index(self) -> tuple:
+        if self._index is None:
+            with self._refresh_lock:
+                if self._index is None:
+                    self._build()
+        return self._index
+
+    def __len__(self) -> int:
+        return len(self._get_index()[3])
+
+    def rows(self, drug_ids: List[str]) -> List[dict]:
+        """Rows of ``DDI_QUERY`` for the adverse interactions among ``drug_ids``, in pair order."""
+        ids, positions, names, keys, payload_of, payloads = self._get_index()
+        known = np.array(sorted({positions[drug_id] for drug_id in drug_ids if drug_id in positions}), dtype=np.int64)
+        if len(known) < 2:
+            return []
+        first, second = np.triu_indices(len(known), k=1)
+        i, j = known[first], known[second]
+        pair_keys = i * len(ids) + j
+        starts = np.searchsorted(keys, pair_keys, side="left")
+        ends = np.searchsorted(keys, pair_keys, side="right")
+
+        rows = []
+        for pair in np.flatnonzero(ends > starts):
+            id1, id2 = ids[i[pair]], ids[j[pair]]
+            for edge in range(starts[pair], ends[pair]):
+                rows.append({
+                    "id1": id1,
+                    "id2": id2,
+                    "drug1": names[i[pair]],
+                    "drug2": names[j[pair]],
+                    **dict(zip(_PAYLOAD_COLUMNS, payloads[payload_of[edge]])),
+                })
+        return rows
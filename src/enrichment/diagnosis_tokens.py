@@ -94,6 +94,23 @@ def tokenize_diagnosis(text: str) -> List[str]:
     return []
 
 
+def fulltext_query(tokens: List[str]) -> str:
+    """
+    Lucene query for ``db.index.fulltext.queryNodes`` matching any of ``tokens``.
+
+    Every word of a token becomes a prefix query and the words of one token
+    must all match, e.g. ``["heart failure", "renal"]`` ->
+    ``"(heart* AND failure*) OR (renal*)"``. Words are alphanumeric, so no
+    Lucene syntax needs escaping.
+    """
+    clauses = []
+    for token in tokens:
+        words = [word for word in re.split(r"[^a-z0-9]+", token.lower()) if word]
+        if words:
+            clauses.append("(" + " AND ".join(f"{word}*" for word in words) + ")")
+    return " OR ".join(clauses)
+
+
 def build_diagnosis_specs(diagnoses: List[str]) -> List[Dict[str, object]]:
     """Build Neo4j parameter rows: ``{input_dx, tokens}`` per non-empty diagnosis."""
     specs: List[Dict[str, object]] = []
@@ -0,0 +1,149 @@
+"""
+In-process index from diagnosis tokens to PrimeKG Disease node ids.
+
+The enrichment queries match a diagnosis to diseases by testing every token
+with ``CONTAINS`` against every Disease name. ``DiseaseNameIndex`` loads the
+Disease names once and answers the same substring test from a trigram
+inverted index, so the queries can start from the resolved ids instead.
+"""
+from __future__ import annotations
+
+import sys
+import os
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.db.neo4j_connector import get_connector
+from src.enrichment.cache import graph_version_stamp
+from src.enrichment.diagnosis_tokens import build_diagnosis_specs
+from src.enrichment.queries import GRAPH_VERSION_QUERY
+
+logger = logging.getLogger(__name__)
+
+# Lowercased like toLower(coalesce(...)) in the name-matching queries
+DISEASE_NAMES_QUERY = """
+MATCH (d:Disease)
+RETURN d.id AS id, coalesce(d.name, d.display_name, d.label, "") AS name
+"""
+
+_GRAM = 3
+
+
+def _grams(text: str) -> Set[str]:
+    return {text[i:i + _GRAM] for i in range(len(text) - _GRAM + 1)}
+
+
+class DiseaseNameIndex:
+    """
+    Trigram inverted index over Disease names.
+
+    ``lookup(token)`` returns the ids of the diseases whose lowercased name
+    contains ``token``, exactly like ``toLower(name) CONTAINS token``:
+    candidates are the intersection of the posting lists of the token's
+    trigrams, then confirmed with a substring test. Tokens shorter than a
+    trigram fall back to a scan of the names.
+
+    The index is built on first use and rebuilt by ``refresh()``, e.g. after
+    a load. Built from the graph, it records the graph version it was built
+    from (``graph_version``) so the orchestrators can rebuild it when the
+    graph changes. Given ``rows`` (``id``/``name`` dicts, e.g. from an
+    enrichment snapshot) it indexes those instead of querying the graph,
+    and ``graph_version`` stays None. Rebuilding swaps the whole index at
+    once, so lookups running concurrently see either the old or the new one.
+    """
+
+    def __init__(self, connector: Optional[Any] = None, rows: Optional[List[dict]] = None):
+        self._connector = connector
+        self._rows = rows
+        self._refresh_lock = threading.Lock()
+        self._index: Optional[tuple] = None
+        self.graph_version: Optional[str] = None
+
+    def refresh(self) -> int:
+        """
+        Reload the Disease names and rebuild the index.
+
+        Returns:
+            Number of indexed diseases
+
+        Raises:
+            Exception: If the graph cannot be read; the previous index (if any) is kept
+        """
+        with self._refresh_lock:
+            return self._build()
+
+    def _build(self) -> int:
+        version = None
+        if self._rows is not None:
+            rows = self._rows
+        else:
+            connector = self._connector or get_connector()
+            # Read first: diseases loaded after it are picked up by the next refresh.
+            # A failed read must not pass for a graph without diseases.
+            version = graph_version_stamp(connector.execute_query(GRAPH_VERSION_QUERY, raise_errors=True))
+            rows = connector.execute_query(DISEASE_NAMES_QUERY, raise_errors=True)
+        # Ids keep their stored type so the resolved queries can seek on them
+        ids: List[Any] = []
+        names: List[str] = []
+        postings: Dict[str, Set[int]] = defaultdict(set)
+        for row in rows:
+            if row.get("id") is None:
+                continue
+            name = (row.get("name") or "").lower()
+            position = len(ids)
+            ids.append(row["id"])
+            names.append(name)
+            for gram in _grams(name):
+                postings[gram].add(position)
+
+        self._index = (ids, names, {gram: frozenset(positions) for gram, positions in postings.items()})
+        self.graph_version = version
+        logger.info(f"Indexed {len(ids):,} disease names ({len(postings):,} trigrams)"
+                    + (f" (graph {version})" if version is not None else ""))
+        return len(ids)
+
+    def _get_index(self) -> tuple:
+        if self._index is None:
+            with self._refresh_lock:
+                if self._index is None:
+                    self._build()
+        return self._index
+
+    def __len__(self) -> int:
+        return len(self._get_index()[0])
+
+    def lookup(self, token: str) -> Set[str]:
+        """Ids of the diseases whose lowercased name contains ``token``."""
+        ids, names, postings = self._get_index()
+        token = token.lower()
+        if len(token) < _GRAM:
+            candidates = range(len(names))
+        else:
+            lists = sorted((postings.get(gram, frozenset()) for gram in _grams(token)), key=len)
+            candidates = set(lists[0]).intersection(*lists[1:])
+        return {ids[position] for position in candidates if token in names[position]}
+
+    def resolve(self, tokens: List[str]) -> List[str]:
+        """Sorted ids of the diseases matching any of ``tokens``."""
+        matched: Set[str] = set()
+        for token in tokens:
+            matched |= self.lookup(token)
+        return sorted(matched)
+
+    def resolve_specs(self, diagnoses: List[str]) -> List[Dict[str, object]]:
+        """
+        Build diagnosis specs with pre-resolved ``disease_ids``.
+
+        Diagnoses that match no disease are dropped, since none of their
+        queries could return rows.
+        """
+        specs = []
+        for spec in build_diagnosis_specs(diagnoses):
+            disease_ids = self.resolve(spec["tokens"])
+            if disease_ids:
+                specs.append({**spec, "disease_ids": disease_ids})
+        return specs
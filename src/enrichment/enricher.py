@@ -2,19 +2,35 @@ from __future__ import annotations
 
 import sys
 import os
+import time
+import logging
+import threading
 from collections import defaultdict
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+from config.config import ENRICHER_CACHE_VERSION_CHECK
 from src.db.neo4j_connector import Neo4jConnector, get_connector
-from src.enrichment.diagnosis_tokens import build_diagnosis_specs
+from src.enrichment.cache import MISS, EnrichmentCache, cache_key, default_cache, graph_version_stamp
+from src.enrichment.diagnosis_tokens import build_diagnosis_specs, fulltext_query
+from src.enrichment.ddi_index import DDIIndex
+from src.enrichment.disease_index import DiseaseNameIndex
+from src.enrichment.snapshot import EnrichmentSnapshot
 from src.enrichment.queries import (
     CAUSAL_PATHWAY_QUERY,
     COMORBID_DISEASES_QUERY,
     INDICATIONS_QUERY,
     CONTRAINDICATIONS_QUERY,
+    COMBINED_DIAGNOSIS_QUERY,
+    FULLTEXT_ASPECT_QUERIES,
+    FULLTEXT_COMBINED_DIAGNOSIS_QUERY,
+    RESOLVED_ASPECT_QUERIES,
+    RESOLVED_COMBINED_DIAGNOSIS_QUERY,
     DDI_QUERY,
+    DDI_PAIRS_QUERY,
+    GRAPH_VERSION_QUERY,
 )
 from src.enrichment.schema import (
     CausalPathwayEntry,
@@ -25,105 +41,695 @@ from src.enrichment.schema import (
     MedicalKnowledgeContext,
 )
 
+logger = logging.getLogger(__name__)
+
+# Aspects of a MedicalKnowledgeContext, in field order
+ASPECTS = ("causal_pathway", "comorbid_diseases", "indications", "contraindications", "ddi_alerts")
+
+# Diagnosis aspect -> (query, value column, entry factory)
+_DIAGNOSIS_ASPECTS = {
+    "causal_pathway": (
+        CAUSAL_PATHWAY_QUERY, "phenotype",
+        lambda disease, values: CausalPathwayEntry(disease=disease, phenotypes=values),
+    ),
+    "comorbid_diseases": (
+        COMORBID_DISEASES_QUERY, "related",
+        lambda disease, values: ComorbidDiseaseEntry(disease=disease, related=values),
+    ),
+    "indications": (
+        INDICATIONS_QUERY, "drug_name",
+        lambda disease, values: IndicationEntry(disease=disease, indicated_drugs=values),
+    ),
+    "contraindications": (
+        CONTRAINDICATIONS_QUERY, "drug_name",
+        lambda disease, values: ContraindicationEntry(disease=disease, contraindicated_drugs=values),
+    ),
+}
+
+# How diagnoses are matched to diseases -> (aspect queries, combined query)
+_MATCH_QUERIES = {
+    "contains": ({aspect: query for aspect, (query, _, _) in _DIAGNOSIS_ASPECTS.items()}, COMBINED_DIAGNOSIS_QUERY),
+    "fulltext": (FULLTEXT_ASPECT_QUERIES, FULLTEXT_COMBINED_DIAGNOSIS_QUERY),
+    "resolved": (RESOLVED_ASPECT_QUERIES, RESOLVED_COMBINED_DIAGNOSIS_QUERY),
+}
+
+# Query and cache work of one aspect: the query for the uncached inputs (None
+# when everything was cached or nothing can match) and the function turning
+# its rows into the aspect result (rows are None when the query failed)
+Prepared = Tuple[Optional[Tuple[str, dict]], Callable[[List[dict]], Any]]
+
+# Like Prepared for several queries at once: the queries by name and the
+# function turning their rows (by the same names) into the results
+PreparedMany = Tuple[Dict[str, Optional[Tuple[str, dict]]], Callable[[Dict[str, Optional[List[dict]]]], Any]]
+
+
+def _order_key(value: Any) -> tuple:
+    # Cypher ORDER BY puts nulls last
+    return (value is None, "" if value is None else value)
+
+
+class _OrchestratorBase:
+    """Query building and row shaping shared by the sync and async orchestrators."""
 
-class EnricherOrchestrator:
     def __init__(
         self,
-        connector: Optional[Neo4jConnector] = None,
+        connector: Any,
         limit_phenotypes: int = 10,
         limit_comorbid: int = 5,
         limit_indications: int = 10,
         limit_contraindications: int = 10,
+        combined_query: bool = False,
+        disease_index: Optional[DiseaseNameIndex] = None,
+        fulltext: bool = False,
+        cache: Optional[EnrichmentCache] = None,
+        use_cache: bool = True,
+        snapshot: Optional[EnrichmentSnapshot] = None,
+        ddi_index: Optional[DDIIndex] = None,
     ):
-        self._connector = connector or get_connector()
-        self._limit_phenotypes = limit_phenotypes
-        self._limit_comorbid = limit_comorbid
-        self._limit_indications = limit_indications
-        self._limit_contraindications = limit_contraindications
+        self._connector = connector
+        self._snapshot = snapshot
+        self._ddi_index = ddi_index
+        # A snapshot is already a local copy of every answer
+        self._cache = (cache or default_cache()) if use_cache and snapshot is None else None
+        self._graph_version: Optional[str] = None
+        self._version_checked_at = float("-inf")
+        self._combined_query = combined_query
+        self._disease_index = disease_index
+        if disease_index is not None:
+            self._matching = "resolved"
+        elif fulltext:
+            self._matching = "fulltext"
+        else:
+            self._matching = "contains"
+        self._limits = {
+            "causal_pathway": limit_phenotypes,
+            "comorbid_diseases": limit_comorbid,
+            "indications": limit_indications,
+            "contraindications": limit_contraindications,
+        }
+        if snapshot is not None:
+            snapshot.check_limits(self._limits)
 
-    @staticmethod
-    def _diagnosis_query_params(diagnoses: List[str], limit: int) -> dict:
+    def _diagnosis_specs(self, diagnoses: List[str]) -> List[Dict[str, object]]:
+        """Diagnosis specs with the fields the matching mode's queries need."""
+        if self._matching == "resolved":
+            return self._disease_index.resolve_specs(diagnoses)
         specs = build_diagnosis_specs(diagnoses)
+        if self._matching == "fulltext":
+            specs = [{**spec, "fulltext": fulltext_query(spec["tokens"])} for spec in specs]
+            specs = [spec for spec in specs if spec["fulltext"]]
+        return specs
+
+    def _diagnosis_query_params(self, diagnoses: List[str], limit: int) -> dict:
+        specs = self._diagnosis_specs(diagnoses)
         if not specs:
             return {}
         return {"diagnosis_specs": specs, "limit": limit}
 
-    def causal_pathway(self, diagnoses: List[str]) -> List[CausalPathwayEntry]:
-        params = self._diagnosis_query_params(diagnoses, self._limit_phenotypes)
+    def _aspect_query(self, aspect: str, inputs: List[str]) -> Optional[Tuple[str, dict]]:
+        """Query and parameters of one aspect, or None when the inputs cannot match anything."""
+        if aspect == "ddi_alerts":
+            if len(inputs) < 2:
+                return None
+            return DDI_QUERY, {"drug_ids": inputs}
+        params = self._diagnosis_query_params(inputs, self._limits[aspect])
         if not params:
-            return []
-        rows = self._connector.execute_query(CAUSAL_PATHWAY_QUERY, params)
-        grouped: dict[str, list[str]] = defaultdict(list)
+            return None
+        return _MATCH_QUERIES[self._matching][0][aspect], params
+
+    # --- cache ---
+
+    def _version_due(self) -> bool:
+        return (
+            (self._cache is not None or self._ddi_index is not None or self._disease_index is not None)
+            and time.monotonic() - self._version_checked_at >= ENRICHER_CACHE_VERSION_CHECK
+        )
+
+    def _set_graph_version(self, rows: List[dict]) -> None:
+        """Record the version stamp read by ``GRAPH_VERSION_QUERY``; a new stamp starts a fresh memory tier."""
+        version = graph_version_stamp(rows)
+        if self._graph_version is not None and version != self._graph_version:
+            logger.info(f"Graph version changed from {self._graph_version} to {version}")
+            if self._cache is not None:
+                self._cache.clear(memory_only=True)
+        self._graph_version = version
+        self._version_checked_at = time.monotonic()
+
+    def invalidate_cache(self) -> None:
+        """Drop every cached result (both tiers), e.g. after the graph was reloaded."""
+        if self._cache is not None:
+            self._cache.clear()
+        self._graph_version = None
+        self._version_checked_at = float("-inf")
+
+    def _ddi_index_stale(self) -> bool:
+        """Whether the DDI index was built from another graph version than the current one."""
+        return (
+            self._ddi_index is not None
+            and self._ddi_index.graph_version is not None
+            and self._ddi_index.graph_version != self._graph_version
+        )
+
+    def _disease_index_stale(self) -> bool:
+        """Whether the disease name index was built from another graph version than the current one."""
+        return (
+            self._disease_index is not None
+            and self._disease_index.graph_version is not None
+            and self._disease_index.graph_version != self._graph_version
+        )
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of the result cache (empty when caching is off)."""
+        if self._cache is None:
+            return {}
+        return {**self._cache.stats(), "graph_version": self._graph_version}
+
+    def _spec_key(self, aspect: str, spec: Dict[str, Any]) -> str:
+        return cache_key(
+            "aspect", aspect, self._matching, sorted(spec["tokens"]), spec.get("disease_ids"),
+            self._limits[aspect], self._graph_version,
+        )
+
+    def _lookup_specs(self, aspects, specs) -> Tuple[Dict[str, List[str]], Dict[str, Dict[str, list]], list]:
+        """
+        Look up the cached rows of every spec for ``aspects``.
+
+        Returns:
+            Keys per aspect (parallel to ``specs``), cached rows per aspect and
+            key, and the specs to query (missing in at least one aspect)
+        """
+        keys = {aspect: [self._spec_key(aspect, spec) for spec in specs] for aspect in aspects}
+        results: Dict[str, Dict[str, list]] = {aspect: {} for aspect in aspects}
+        missing: Dict[Any, Dict[str, Any]] = {}
+        for aspect in aspects:
+            for key, spec in zip(keys[aspect], specs):
+                if key in results[aspect]:
+                    continue
+                value = self._cache.get(key) if self._cache is not None else MISS
+                if value is MISS:
+                    missing.setdefault(spec["input_dx"], spec)
+                else:
+                    results[aspect][key] = value
+        return keys, results, list(missing.values())
+
+    def _store_specs(self, aspect: str, queried: list, rows: List[dict], results: Dict[str, list]) -> None:
+        """Split the rows of the queried specs by spec, cache them and add them to ``results``."""
+        by_dx: Dict[str, str] = {}
+        fetched: Dict[str, List[dict]] = {}
+        for spec in queried:
+            key = self._spec_key(aspect, spec)
+            # Diagnoses differing only in case or punctuation share a key and identical rows
+            if key not in fetched:
+                by_dx[spec["input_dx"]] = key
+                fetched[key] = []
         for row in rows:
-            disease = row.get("disease")
-            phenotype = row.get("phenotype")
-            if disease and phenotype:
-                grouped[disease].append(phenotype)
-        return [CausalPathwayEntry(disease=d, phenotypes=p) for d, p in grouped.items()]
+            key = by_dx.get(row.get("input_dx"))
+            if key is not None:
+                fetched[key].append({column: value for column, value in row.items() if column != "input_dx"})
+        results.update(fetched)
+        if self._cache is not None:
+            for key, key_rows in fetched.items():
+                self._cache.set(key, key_rows)
 
-    def comorbid_diseases(self, diagnoses: List[str]) -> List[ComorbidDiseaseEntry]:
-        params = self._diagnosis_query_params(diagnoses, self._limit_comorbid)
-        if not params:
-            return []
-        rows = self._connector.execute_query(COMORBID_DISEASES_QUERY, params)
+    def _assemble_specs(self, aspect: str, specs: list, keys: List[str], results: Dict[str, list]) -> list:
+        """Rebuild the rows of all specs in query order and turn them into entries."""
+        value_column = _DIAGNOSIS_ASPECTS[aspect][1]
+        rows = [dict(row, input_dx=spec["input_dx"]) for key, spec in zip(keys, specs) for row in results.get(key, [])]
+        rows.sort(key=lambda row: tuple(_order_key(row.get(column)) for column in ("input_dx", "disease", value_column)))
+        return self._build_aspect(aspect, rows)
+
+    def _prepare_aspect(self, aspect: str, inputs: List[str]) -> Prepared:
+        """Query for the uncached part of one aspect and the function building its result."""
+        if self._cache is None:
+            return self._aspect_query(aspect, inputs), lambda rows: self._build_aspect(aspect, rows)
+        if aspect == "ddi_alerts":
+            return self._prepare_ddi(inputs)
+
+        specs = self._diagnosis_specs(inputs)
+        keys, results, missing = self._lookup_specs([aspect], specs)
+        request = None
+        if missing:
+            request = _MATCH_QUERIES[self._matching][0][aspect], {
+                "diagnosis_specs": missing, "limit": self._limits[aspect],
+            }
+
+        def finish(rows: Optional[List[dict]]) -> list:
+            if rows is not None:
+                self._store_specs(aspect, missing, rows, results[aspect])
+            return self._assemble_specs(aspect, specs, keys[aspect], results[aspect])
+
+        return request, finish
+
+    def _prepare_combined(self, diagnoses: List[str]) -> Prepared:
+        """Combined query for the uncached diagnoses and the function building the four aspects."""
+        if self._cache is None:
+            return self._combined_request(diagnoses), self._split_combined
+
+        specs = self._diagnosis_specs(diagnoses)
+        keys, results, missing = self._lookup_specs(list(_DIAGNOSIS_ASPECTS), specs)
+        request = None
+        if missing:
+            params = {"diagnosis_specs": missing}
+            params.update({f"limit_{aspect}": limit for aspect, limit in self._limits.items()})
+            request = _MATCH_QUERIES[self._matching][1], params
+
+        def finish(rows: Optional[List[dict]]) -> Dict[str, list]:
+            if rows is not None:
+                for aspect, aspect_rows in self._combined_aspect_rows(rows).items():
+                    self._store_specs(aspect, missing, aspect_rows, results[aspect])
+            return {
+                aspect: self._assemble_specs(aspect, specs, keys[aspect], results[aspect])
+                for aspect in _DIAGNOSIS_ASPECTS
+            }
+
+        return request, finish
+
+    def _ddi_pairs(self, drug_ids: List[str]) -> List[Tuple[str, str]]:
+        """Drug pairs of a regimen (``id1 < id2``) in the order its DDI alerts are reported."""
+        if self._cache is None and self._ddi_index is None:
+            # The order of DDI_QUERY's nested UNWINDs, repeated ids included
+            return [(a, b) for a in drug_ids for b in drug_ids if a < b]
+        return sorted({(a, b) for a in drug_ids for b in drug_ids if a < b})
+
+    def _prepare_ddi(self, drug_ids: List[str]) -> Prepared:
+        """DDI query over the drugs of the uncached pairs and the function building the alerts."""
+        pairs = self._ddi_pairs(drug_ids)
+        keys = {pair: cache_key("ddi", pair, self._graph_version) for pair in pairs}
+        results = {}
+        for pair, key in keys.items():
+            value = self._cache.get(key)
+            if value is not MISS:
+                results[pair] = value
+        missing_ids = sorted({drug_id for pair in pairs if pair not in results for drug_id in pair})
+        request = (DDI_QUERY, {"drug_ids": missing_ids}) if missing_ids else None
+
+        def finish(rows: Optional[List[dict]]) -> list:
+            if rows is not None:
+                # The query answers every pair of the queried drugs
+                fetched = {(a, b): [] for a in missing_ids for b in missing_ids if a < b}
+                for row in rows:
+                    pair = (row.get("id1"), row.get("id2"))
+                    if pair in fetched:
+                        fetched[pair].append(row)
+                for pair, pair_rows in fetched.items():
+                    self._cache.set(cache_key("ddi", pair, self._graph_version), pair_rows)
+                results.update(fetched)
+            return self._build_aspect("ddi_alerts", [row for pair in pairs for row in results.get(pair, [])])
+
+        return request, finish
+
+    def _prepare_many(self, batch: List[Tuple[List[str], List[str]]]) -> PreparedMany:
+        """
+        Queries answering the aspects of many rows at once, and the function
+        demultiplexing their rows into one context per row.
+
+        The specs of all rows are sent in one UNWIND per aspect (or one
+        combined query), each distinct ``input_dx`` once, and the DDI query
+        checks the distinct pairs of all regimens. Rows are split back by
+        ``input_dx`` and drug pair and reassembled per row in the order of
+        the single-row queries, so every context equals what ``enrich``
+        returns for that row.
+        """
+        row_specs = [self._diagnosis_specs(diagnoses) for diagnoses, _ in batch]
+        specs = list({spec["input_dx"]: spec for spec_list in row_specs for spec in spec_list}.values())
+        keys, results, missing = self._lookup_specs(list(_DIAGNOSIS_ASPECTS), specs)
+        key_of = {aspect: dict(zip((spec["input_dx"] for spec in specs), keys[aspect])) for aspect in keys}
+
+        requests: Dict[str, Optional[Tuple[str, dict]]] = {}
+        if missing and self._combined_query:
+            params = {"diagnosis_specs": missing}
+            params.update({f"limit_{aspect}": limit for aspect, limit in self._limits.items()})
+            requests["combined"] = _MATCH_QUERIES[self._matching][1], params
+        elif missing:
+            for aspect, limit in self._limits.items():
+                query = _MATCH_QUERIES[self._matching][0][aspect]
+                requests[aspect] = query, {"diagnosis_specs": missing, "limit": limit}
+
+        row_pairs = [self._ddi_pairs(drug_ids) for _, drug_ids in batch]
+        pair_rows: Dict[Tuple[str, str], List[dict]] = {}
+        if self._ddi_index is None:
+            for pair in dict.fromkeys(pair for pairs in row_pairs for pair in pairs):
+                if self._cache is not None:
+                    value = self._cache.get(cache_key("ddi", pair, self._graph_version))
+                    if value is not MISS:
+                        pair_rows[pair] = value
+            missing_pairs = [
+                list(pair) for pair in dict.fromkeys(pair for pairs in row_pairs for pair in pairs)
+                if pair not in pair_rows
+            ]
+            if missing_pairs:
+                requests["ddi_alerts"] = DDI_PAIRS_QUERY, {"pairs": missing_pairs}
+
+        def finish(fetched: Dict[str, Optional[List[dict]]]) -> List[MedicalKnowledgeContext]:
+            aspect_rows = {aspect: fetched.get(aspect) for aspect in _DIAGNOSIS_ASPECTS}
+            if fetched.get("combined") is not None:
+                aspect_rows = self._combined_aspect_rows(fetched["combined"])
+            for aspect, rows in aspect_rows.items():
+                if rows is not None:
+                    self._store_specs(aspect, missing, rows, results[aspect])
+
+            if fetched.get("ddi_alerts") is not None:
+                queried = {tuple(pair): [] for pair in requests["ddi_alerts"][1]["pairs"]}
+                for row in fetched["ddi_alerts"]:
+                    pair = (row.get("id1"), row.get("id2"))
+                    if pair in queried:
+                        queried[pair].append(row)
+                if self._cache is not None:
+                    for pair, rows in queried.items():
+                        self._cache.set(cache_key("ddi", pair, self._graph_version), rows)
+                pair_rows.update(queried)
+
+            contexts = []
+            for spec_list, pairs, (_, drug_ids) in zip(row_specs, row_pairs, batch):
+                aspects = {
+                    aspect: self._assemble_specs(
+                        aspect, spec_list, [key_of[aspect][spec["input_dx"]] for spec in spec_list], results[aspect]
+                    )
+                    for aspect in _DIAGNOSIS_ASPECTS
+                }
+                if self._ddi_index is not None:
+                    ddi_rows = self._ddi_index.rows(drug_ids)
+                else:
+                    ddi_rows = [row for pair in pairs for row in pair_rows.get(pair, [])]
+                aspects["ddi_alerts"] = self._build_aspect("ddi_alerts", ddi_rows)
+                contexts.append(MedicalKnowledgeContext(**aspects))
+            return contexts
+
+        return requests, finish
+
+    @staticmethod
+    def _build_aspect(aspect: str, rows: List[dict]) -> list:
+        """Turn the rows of one aspect query into its schema entries."""
+        if aspect == "ddi_alerts":
+            return [
+                DDIAlert(
+                    drug1=row["drug1"],
+                    drug2=row["drug2"],
+                    interaction=row.get("interaction", "interaction"),
+                    ddi_type=row.get("ddi_type"),
+                    pattern=row.get("pattern"),
+                )
+                for row in rows
+                if row.get("drug1") and row.get("drug2")
+            ]
+        _, value_column, make_entry = _DIAGNOSIS_ASPECTS[aspect]
         grouped: dict[str, list[str]] = defaultdict(list)
         for row in rows:
             disease = row.get("disease")
-            related = row.get("related")
-            if disease and related:
-                grouped[disease].append(related)
-        return [ComorbidDiseaseEntry(disease=d, related=r) for d, r in grouped.items()]
+            value = row.get(value_column)
+            if disease and value:
+                grouped[disease].append(value)
+        return [make_entry(disease, values) for disease, values in grouped.items()]
 
-    def indications(self, diagnoses: List[str]) -> List[IndicationEntry]:
-        params = self._diagnosis_query_params(diagnoses, self._limit_indications)
-        if not params:
-            return []
-        rows = self._connector.execute_query(INDICATIONS_QUERY, params)
-        grouped: dict[str, list[str]] = defaultdict(list)
+    def _combined_request(self, diagnoses: List[str]) -> Optional[Tuple[str, dict]]:
+        """Combined query of the four diagnosis aspects, or None when the diagnoses cannot match anything."""
+        specs = self._diagnosis_specs(diagnoses)
+        if not specs:
+            return None
+        params = {"diagnosis_specs": specs}
+        params.update({f"limit_{aspect}": limit for aspect, limit in self._limits.items()})
+        return _MATCH_QUERIES[self._matching][1], params
+
+    @staticmethod
+    def _combined_aspect_rows(rows: List[dict]) -> Dict[str, List[dict]]:
+        """Demultiplex the rows of the combined query into the rows of each diagnosis aspect."""
+        aspect_rows: Dict[str, List[dict]] = {aspect: [] for aspect in _DIAGNOSIS_ASPECTS}
         for row in rows:
-            disease = row.get("disease")
-            drug = row.get("drug_name")
-            if disease and drug:
-                grouped[disease].append(drug)
-        return [IndicationEntry(disease=d, indicated_drugs=drugs) for d, drugs in grouped.items()]
+            aspect = row.get("aspect")
+            if aspect not in aspect_rows:
+                continue
+            value_column = _DIAGNOSIS_ASPECTS[aspect][1]
+            aspect_rows[aspect].append(
+                {"input_dx": row.get("input_dx"), "disease": row.get("disease"), value_column: row.get("value")}
+            )
+        return aspect_rows
 
-    def contraindications(self, diagnoses: List[str]) -> List[ContraindicationEntry]:
-        params = self._diagnosis_query_params(diagnoses, self._limit_contraindications)
-        if not params:
+    @classmethod
+    def _split_combined(cls, rows: List[dict]) -> Dict[str, list]:
+        """Demultiplex the rows of the combined query into the entries of each diagnosis aspect."""
+        return {aspect: cls._build_aspect(aspect, rows) for aspect, rows in cls._combined_aspect_rows(rows).items()}
+
+    # --- snapshot ---
+
+    def _snapshot_aspect(self, aspect: str, inputs: List[str]) -> list:
+        """Entries of one aspect answered from the snapshot."""
+        if aspect == "ddi_alerts":
+            return self._build_aspect(aspect, self._snapshot.ddi_rows(inputs))
+        rows = self._snapshot.diagnosis_rows(inputs, {aspect: self._limits[aspect]})
+        return self._split_combined(rows)[aspect]
+
+    def _snapshot_context(self, diagnoses: List[str], drugbank_ids: List[str]) -> MedicalKnowledgeContext:
+        """The whole context answered from the snapshot, one lookup per diagnosis."""
+        aspects = self._split_combined(self._snapshot.diagnosis_rows(diagnoses, self._limits))
+        aspects["ddi_alerts"] = self._snapshot_aspect("ddi_alerts", drugbank_ids)
+        return MedicalKnowledgeContext(**aspects)
+
+    @staticmethod
+    def _aspect_inputs(diagnoses: List[str], drugbank_ids: List[str]) -> Dict[str, List[str]]:
+        return {aspect: drugbank_ids if aspect == "ddi_alerts" else diagnoses for aspect in ASPECTS}
+
+
+class EnricherOrchestrator(_OrchestratorBase):
+    """
+    Builds a ``MedicalKnowledgeContext`` from PrimeKG in Neo4j.
+
+    With ``concurrent=True`` (the default) ``enrich`` runs the five aspect
+    queries in parallel on a shared thread pool, each on its own pooled driver
+    session, so a request takes about as long as its slowest aspect.
+    ``concurrent=False`` runs them one after another, which is easier to
+    debug and profile.
+
+    With ``combined_query=True`` the four diagnosis aspects are fetched by a
+    single query that matches the diseases once per diagnosis, so a request
+    makes two round trips (diagnoses and DDI) instead of five.
+
+    With a ``disease_index`` the diagnoses are resolved to Disease ids in
+    process and the queries start from those ids instead of scanning every
+    Disease name with ``CONTAINS``; an index built from the graph is rebuilt
+    when the graph version changes. Without one, ``fulltext=True`` finds the
+    diseases through the ``disease_names`` full-text index (word-prefix
+    matching); check it exists with ``Neo4jConnector.index_exists`` and keep
+    the ``CONTAINS`` scan as the fallback.
+
+    Results are cached per diagnosis and aspect and per drug pair (see
+    ``EnrichmentCache``) when a ``cache`` is passed or ``ENRICHER_CACHE_SIZE``
+    enables the default one (``use_cache=False`` turns both off). Keys
+    include the graph version stamp of the ``PrimeKGRelease`` node, re-read
+    every ``ENRICHER_CACHE_VERSION_CHECK`` seconds, so a reload invalidates
+    them; ``invalidate_cache()`` drops them immediately.
+
+    With a ``snapshot`` (see ``build_snapshot``) every aspect is answered
+    from that in-memory copy instead, without Neo4j or the cache; the
+    connector is then optional. With a ``ddi_index`` the DDI alerts are
+    checked against that in-memory copy of the adverse DDI edges, which is
+    rebuilt when the graph version changes.
+    """
+
+    def __init__(
+        self,
+        connector: Optional[Neo4jConnector] = None,
+        limit_phenotypes: int = 10,
+        limit_comorbid: int = 5,
+        limit_indications: int = 10,
+        limit_contraindications: int = 10,
+        concurrent: bool = True,
+        max_workers: Optional[int] = None,
+        combined_query: bool = False,
+        disease_index: Optional[DiseaseNameIndex] = None,
+        fulltext: bool = False,
+        cache: Optional[EnrichmentCache] = None,
+        use_cache: bool = True,
+        snapshot: Optional[EnrichmentSnapshot] = None,
+        ddi_index: Optional[DDIIndex] = None,
+    ):
+        if connector is None and snapshot is None:
+            connector = get_connector()
+        super().__init__(
+            connector,
+            limit_phenotypes=limit_phenotypes,
+            limit_comorbid=limit_comorbid,
+            limit_indications=limit_indications,
+            limit_contraindications=limit_contraindications,
+            combined_query=combined_query,
+            disease_index=disease_index,
+            fulltext=fulltext,
+            cache=cache,
+            use_cache=use_cache,
+            snapshot=snapshot,
+            ddi_index=ddi_index,
+        )
+        self._version_lock = threading.Lock()
+        self._concurrent = concurrent
+        # Enough threads for several overlapping enrich() calls
+        self._max_workers = max_workers or 4 * len(ASPECTS)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers, thread_name_prefix="enricher"
+                )
+            return self._executor
+
+    def _check_graph_version(self) -> None:
+        if self._version_due():
+            with self._version_lock:
+                if self._version_due():
+                    self._set_graph_version(self._connector.execute_query(GRAPH_VERSION_QUERY))
+                    if self._ddi_index_stale():
+                        self._ddi_index.refresh()
+                    if self._disease_index_stale():
+                        self._disease_index.refresh()
+
+    def _fetch(self, request: Optional[Tuple[str, dict]]) -> Optional[List[dict]]:
+        if request is None:
             return []
-        rows = self._connector.execute_query(CONTRAINDICATIONS_QUERY, params)
-        grouped: dict[str, list[str]] = defaultdict(list)
-        for row in rows:
-            disease = row.get("disease")
-            drug = row.get("drug_name")
-            if disease and drug:
-                grouped[disease].append(drug)
-        return [ContraindicationEntry(disease=d, contraindicated_drugs=drugs) for d, drugs in grouped.items()]
+        if self._cache is None:
+            return self._connector.execute_query(*request)
+        try:
+            return self._connector.execute_query(*request, raise_errors=True)
+        except Exception:
+            # Already logged by the connector; answer from the cache without storing the failure
+            return None
+
+    def _run(self, prepared: Prepared) -> Any:
+        request, finish = prepared
+        return finish(self._fetch(request))
+
+    def _run_aspect(self, aspect: str, inputs: List[str]) -> list:
+        if self._snapshot is not None:
+            return self._snapshot_aspect(aspect, inputs)
+        self._check_graph_version()
+        if aspect == "ddi_alerts" and self._ddi_index is not None:
+            return self._build_aspect(aspect, self._ddi_index.rows(inputs))
+        return self._run(self._prepare_aspect(aspect, inputs))
+
+    def _run_combined(self, diagnoses: List[str]) -> Dict[str, list]:
+        self._check_graph_version()
+        return self._run(self._prepare_combined(diagnoses))
+
+    def causal_pathway(self, diagnoses: List[str]) -> List[CausalPathwayEntry]:
+        return self._run_aspect("causal_pathway", diagnoses)
+
+    def comorbid_diseases(self, diagnoses: List[str]) -> List[ComorbidDiseaseEntry]:
+        return self._run_aspect("comorbid_diseases", diagnoses)
+
+    def indications(self, diagnoses: List[str]) -> List[IndicationEntry]:
+        return self._run_aspect("indications", diagnoses)
+
+    def contraindications(self, diagnoses: List[str]) -> List[ContraindicationEntry]:
+        return self._run_aspect("contraindications", diagnoses)
 
     def ddi_alerts(self, drugbank_ids: List[str]) -> List[DDIAlert]:
-        if len(drugbank_ids) < 2:
-            return []
-        rows = self._connector.execute_query(
-            DDI_QUERY,
-            {"drug_ids": drugbank_ids},
-        )
-        return [
-            DDIAlert(
-                drug1=row["drug1"],
-                drug2=row["drug2"],
-                interaction=row.get("interaction", "interaction"),
-                ddi_type=row.get("ddi_type"),
-                pattern=row.get("pattern"),
-            )
-            for row in rows
-            if row.get("drug1") and row.get("drug2")
-        ]
+        return self._run_aspect("ddi_alerts", drugbank_ids)
 
     def enrich(self, diagnoses: List[str], drugbank_ids: List[str]) -> MedicalKnowledgeContext:
-        return MedicalKnowledgeContext(
-            causal_pathway=self.causal_pathway(diagnoses),
-            comorbid_diseases=self.comorbid_diseases(diagnoses),
-            indications=self.indications(diagnoses),
-            contraindications=self.contraindications(diagnoses),
-            ddi_alerts=self.ddi_alerts(drugbank_ids),
-        )
+        if self._snapshot is not None:
+            # Dictionary lookups: threads would only add overhead
+            return self._snapshot_context(diagnoses, drugbank_ids)
+        # Once here rather than racing in every aspect thread
+        self._check_graph_version()
+        if self._combined_query:
+            return self._enrich_combined(diagnoses, drugbank_ids)
+        if not self._concurrent:
+            return MedicalKnowledgeContext(
+                causal_pathway=self.causal_pathway(diagnoses),
+                comorbid_diseases=self.comorbid_diseases(diagnoses),
+                indications=self.indications(diagnoses),
+                contraindications=self.contraindications(diagnoses),
+                ddi_alerts=self.ddi_alerts(drugbank_ids),
+            )
+
+        inputs = self._aspect_inputs(diagnoses, drugbank_ids)
+        executor = self._get_executor()
+        futures = {aspect: executor.submit(self._run_aspect, aspect, inputs[aspect]) for aspect in ASPECTS}
+        return MedicalKnowledgeContext(**{aspect: future.result() for aspect, future in futures.items()})
+
+    def enrich_many(self, batch: List[Tuple[List[str], List[str]]]) -> List[MedicalKnowledgeContext]:
+        """
+        Enrich many rows with one query per aspect (or one combined query)
+        and one DDI query for all of them.
+
+        Args:
+            batch: ``(diagnoses, drugbank_ids)`` of each row
+
+        Returns:
+            One context per row, equal to what ``enrich`` returns for it
+        """
+        if self._snapshot is not None:
+            return [self._snapshot_context(diagnoses, drugbank_ids) for diagnoses, drugbank_ids in batch]
+        self._check_graph_version()
+        requests, finish = self._prepare_many(batch)
+        if not self._concurrent or len(requests) < 2:
+            return finish({name: self._fetch(request) for name, request in requests.items()})
+        executor = self._get_executor()
+        futures = {name: executor.submit(self._fetch, request) for name, request in requests.items()}
+        return finish({name: future.result() for name, future in futures.items()})
+
+    def prefetch(
+        self,
+        diagnoses: Iterable[str],
+        drug_pairs: Iterable[Tuple[str, str]],
+        chunk_size: int = 1000,
+    ) -> Dict[str, int]:
+        """
+        Resolve distinct diagnoses and drug pairs once, ahead of the rows made of them.
+
+        Diagnoses normalizing to the same spec (the same sorted tokens and,
+        with a ``disease_index``, the same resolved diseases) are queried
+        once, ``chunk_size`` specs and pairs per ``enrich_many`` round. The
+        results land in the cache, so enriching rows built from these inputs
+        afterwards sends no queries; size the cache for all of them.
+
+        Args:
+            diagnoses: Diagnosis strings, repeats allowed
+            drug_pairs: DrugBank id pairs, repeats and either order allowed
+            chunk_size: Specs and pairs per round of queries
+
+        Returns:
+            dict: Distinct diagnoses, specs and drug pairs resolved
+
+        Raises:
+            ValueError: If the orchestrator has no result cache to keep them in
+        """
+        if self._cache is None:
+            raise ValueError("prefetch() keeps its results in the cache; enable it")
+        distinct = list(dict.fromkeys(diagnoses))
+        representatives: Dict[tuple, str] = {}
+        for spec in self._diagnosis_specs(distinct):
+            normalized = (tuple(sorted(spec["tokens"])), tuple(spec.get("disease_ids") or ()))
+            representatives.setdefault(normalized, spec["input_dx"])
+        specs = list(representatives.values())
+        pairs = sorted({tuple(sorted(pair)) for pair in drug_pairs if pair[0] != pair[1]})
+
+        entries = len(specs) * len(_DIAGNOSIS_ASPECTS) + (0 if self._ddi_index is not None else len(pairs))
+        if entries > self._cache.max_entries:
+            logger.warning(f"Prefetching {entries:,} results into a cache of {self._cache.max_entries:,} entries")
+        for start in range(0, max(len(specs), len(pairs)), chunk_size):
+            batch = [(specs[start:start + chunk_size], [])]
+            if self._ddi_index is None:
+                batch += [([], list(pair)) for pair in pairs[start:start + chunk_size]]
+            self.enrich_many(batch)
+
+        logger.info(f"Prefetched {len(distinct):,} diagnoses as {len(specs):,} specs and {len(pairs):,} drug pairs")
+        return {"diagnoses": len(distinct), "specs": len(specs), "drug_pairs": len(pairs)}
+
+    def _enrich_combined(self, diagnoses: List[str], drugbank_ids: List[str]) -> MedicalKnowledgeContext:
+        if not self._concurrent:
+            aspects = self._run_combined(diagnoses)
+            aspects["ddi_alerts"] = self.ddi_alerts(drugbank_ids)
+        else:
+            executor = self._get_executor()
+            combined = executor.submit(self._run_combined, diagnoses)
+            ddi_alerts = executor.submit(self._run_aspect, "ddi_alerts", drugbank_ids)
+            aspects = {**combined.result(), "ddi_alerts": ddi_alerts.result()}
+        return MedicalKnowledgeContext(**aspects)
+
+    def close(self) -> None:
+        """Shut down the aspect thread pool."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
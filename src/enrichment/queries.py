@@ -1,7 +1,7 @@
 # Disease display name matches any keyword token from the diagnosis
 def _disease_name_matches_tokens(with_vars: str) -> str:
     return f"""
-  WITH {with_vars}, toLower(coalesce(d.name, d.display_name, d.label, "")) AS dname
+  WITH {with_vars}, coalesce(d.name_lower, toLower(coalesce(d.name, d.display_name, d.label, ""))) AS dname
   WHERE ANY(token IN spec.tokens WHERE dname CONTAINS toLower(token))
 """
 
@@ -66,6 +66,122 @@ RETURN input_dx, disease, drug_name
 ORDER BY input_dx, disease, drug_name
 """
 
+# (aspect, relationship, target pattern, value column) of the diagnosis aspects
+_DIAGNOSIS_EXPANSIONS = [
+    ("causal_pathway", "DISEASE_PHENOTYPE_POSITIVE", "(x)", "phenotype"),
+    ("comorbid_diseases", "DISEASE_DISEASE", "(x:Disease)", "related"),
+    ("indications", "INDICATION", "(x:Drug)", "drug_name"),
+    ("contraindications", "CONTRAINDICATION", "(x:Drug)", "drug_name"),
+]
+
+# Full-text indexes over Disease and Drug names (created by init_database)
+DISEASE_FULLTEXT_INDEX = "disease_names"
+DRUG_FULLTEXT_INDEX = "drug_names"
+
+# Diseases of a spec resolved in-process (see ``DiseaseNameIndex``): start
+# from a seek on the Disease id constraint instead of scanning every name
+_RESOLVED_DISEASES = """
+  UNWIND spec.disease_ids AS disease_id
+  MATCH (d:Disease {id: disease_id})
+"""
+
+# Diseases of a spec found through the full-text index (``spec.fulltext``,
+# see ``fulltext_query``) instead of a CONTAINS scan
+_FULLTEXT_DISEASES = f"""
+  CALL db.index.fulltext.queryNodes('{DISEASE_FULLTEXT_INDEX}', spec.fulltext) YIELD node AS d
+"""
+
+
+def _aspect_query(match_diseases: str, relationship: str, target: str, value_column: str) -> str:
+    return """
+UNWIND $diagnosis_specs AS spec
+CALL {
+  WITH spec""" + match_diseases + f"""  MATCH (d)-[:{relationship}]->{target}
+  RETURN spec.input_dx AS input_dx,
+         coalesce(d.name, d.display_name, d.label) AS disease,
+         coalesce(x.name, x.display_name, x.label) AS {value_column}
+  LIMIT $limit
+}}
+RETURN input_dx, disease, {value_column}
+ORDER BY input_dx, disease, {value_column}
+"""
+
+
+# The single aspect queries over ``spec.disease_ids`` instead of ``spec.tokens``
+RESOLVED_ASPECT_QUERIES = {
+    aspect: _aspect_query(_RESOLVED_DISEASES, relationship, target, value_column)
+    for aspect, relationship, target, value_column in _DIAGNOSIS_EXPANSIONS
+}
+
+# The single aspect queries over ``spec.fulltext`` instead of ``spec.tokens``
+FULLTEXT_ASPECT_QUERIES = {
+    aspect: _aspect_query(_FULLTEXT_DISEASES, relationship, target, value_column)
+    for aspect, relationship, target, value_column in _DIAGNOSIS_EXPANSIONS
+}
+
+
+def _snapshot_aspect_query(relationship: str, target: str) -> str:
+    return f"""
+MATCH (d:Disease)
+CALL {{
+  WITH d
+  MATCH (d)-[:{relationship}]->{target}
+  WITH coalesce(x.name, x.display_name, x.label) AS value
+  WHERE value IS NOT NULL
+  RETURN value
+  ORDER BY value
+  LIMIT $limit
+}}
+RETURN d.id AS id, collect(value) AS values
+"""
+
+
+# Per-disease aspect values truncated to $limit, for the enrichment snapshot
+SNAPSHOT_ASPECT_QUERIES = {
+    aspect: _snapshot_aspect_query(relationship, target)
+    for aspect, relationship, target, _ in _DIAGNOSIS_EXPANSIONS
+}
+
+
+def _combined_branch(aspect: str, relationship: str, target: str) -> str:
+    return f"""
+    WITH diseases
+    UNWIND diseases AS d
+    MATCH (d)-[:{relationship}]->{target}
+    RETURN '{aspect}' AS aspect,
+           coalesce(d.name, d.display_name, d.label) AS disease,
+           coalesce(x.name, x.display_name, x.label) AS value
+    LIMIT $limit_{aspect}
+"""
+
+
+def _combined_diagnosis_query(match_diseases: str) -> str:
+    return """
+UNWIND $diagnosis_specs AS spec
+CALL {
+  WITH spec""" + match_diseases + """  WITH collect(d) AS diseases
+  CALL {""" + "    UNION ALL".join(
+        _combined_branch(aspect, relationship, target)
+        for aspect, relationship, target, _ in _DIAGNOSIS_EXPANSIONS
+    ) + """  }
+  RETURN aspect, disease, value
+}
+RETURN spec.input_dx AS input_dx, aspect, disease, value
+ORDER BY input_dx, aspect, disease, value
+"""
+
+
+# All four diagnosis aspects in one round trip: diseases are matched once per
+# spec and every aspect is expanded from them under its own limit. Rows carry
+# an ``aspect`` column; per aspect they are ordered like the single queries.
+COMBINED_DIAGNOSIS_QUERY = _combined_diagnosis_query("""
+  MATCH (d:Disease)
+""" + _disease_name_matches_tokens("spec, d"))
+
+RESOLVED_COMBINED_DIAGNOSIS_QUERY = _combined_diagnosis_query(_RESOLVED_DISEASES)
+
+FULLTEXT_COMBINED_DIAGNOSIS_QUERY = _combined_diagnosis_query(_FULLTEXT_DISEASES)
+
 # Flame adverse DDI only (excludes PrimeKG e.g. "synergistic interaction")
 DDI_QUERY = """
 WITH $drug_ids AS ids
@@ -76,9 +192,48 @@ WHERE id1 < id2
 MATCH (d1:Drug {id: id1})-[r:DRUG_DRUG]-(d2:Drug {id: id2})
 WHERE coalesce(r.display_relation, '') = 'Adverse interaction'
    OR coalesce(r.interaction_class, '') = 'adverse'
-RETURN coalesce(d1.name, d1.display_name, d1.label, id1) AS drug1,
+RETURN id1, id2,
+       coalesce(d1.name, d1.display_name, d1.label, id1) AS drug1,
        coalesce(d2.name, d2.display_name, d2.label, id2) AS drug2,
        coalesce(r.display_relation, 'Adverse interaction') AS interaction,
        r.ddi_type AS ddi_type,
        r.pattern AS pattern
 """
+
+# DDI_QUERY over given (id1, id2) pairs instead of every pair of a list, for
+# checking the regimens of many rows in one query
+DDI_PAIRS_QUERY = """
+UNWIND $pairs AS pair
+WITH pair[0] AS id1, pair[1] AS id2
+MATCH (d1:Drug {id: id1})-[r:DRUG_DRUG]-(d2:Drug {id: id2})
+WHERE coalesce(r.display_relation, '') = 'Adverse interaction'
+   OR coalesce(r.interaction_class, '') = 'adverse'
+RETURN id1, id2,
+       coalesce(d1.name, d1.display_name, d1.label, id1) AS drug1,
+       coalesce(d2.name, d2.display_name, d2.label, id2) AS drug2,
+       coalesce(r.display_relation, 'Adverse interaction') AS interaction,
+       r.ddi_type AS ddi_type,
+       r.pattern AS pattern
+"""
+
+# Every adverse DDI relationship once, as in DDI_QUERY (id1 < id2), for
+# building local copies of the DDI graph
+ADVERSE_DDI_EDGES_QUERY = """
+MATCH (a:Drug)-[r:DRUG_DRUG]->(b:Drug)
+WHERE coalesce(r.display_relation, '') = 'Adverse interaction'
+   OR coalesce(r.interaction_class, '') = 'adverse'
+WITH r, CASE WHEN a.id < b.id THEN a ELSE b END AS d1, CASE WHEN a.id < b.id THEN b ELSE a END AS d2
+WHERE d1.id <> d2.id
+RETURN d1.id AS id1, d2.id AS id2,
+       coalesce(d1.name, d1.display_name, d1.label, d1.id) AS drug1,
+       coalesce(d2.name, d2.display_name, d2.label, d2.id) AS drug2,
+       coalesce(r.display_relation, 'Adverse interaction') AS interaction,
+       r.ddi_type AS ddi_type,
+       r.pattern AS pattern
+"""
+
+# Version stamp of the loaded graph, recorded by the loaders
+GRAPH_VERSION_QUERY = """
+OPTIONAL MATCH (m:PrimeKGRelease {key: 'primekg'})
+RETURN m.version AS version, toString(m.applied_at) AS applied_at
+"""
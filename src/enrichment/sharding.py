@@ -0,0 +1,282 @@
+"""
+Sharded, resumable batch enrichment across worker processes.
+
+The input rows are split into contiguous shards of ``shard_rows`` rows, and
+worker processes (each with its own Neo4j driver) enrich every shard into its
+own part file. The rows can be streamed in shard-sized chunks, so the
+parent never holds the whole input. A JSON manifest next to the parts records the input
+fingerprint and each shard's row range, status and attempts: failed shards
+are retried on their own, and a rerun only redoes the shards that are not
+done. ``merge_parts`` concatenates the parts in input order.
+"""
+from __future__ import annotations
+
+import sys
+import os
+import json
+import shutil
+import logging
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.etl.checkpoint import file_fingerprint
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+
+# Writes the enriched rows of a shard's frame to the given path
+ShardFunction = Callable[[pd.DataFrame, str], None]
+
+
+def plan_shards(total_rows: int, shard_rows: int) -> List[Tuple[int, int]]:
+    """Contiguous ``[start, end)`` row ranges of at most ``shard_rows`` rows."""
+    return [(start, min(start + shard_rows, total_rows)) for start in range(0, total_rows, shard_rows)]
+
+
+class ShardManifest:
+    """
+    Manifest of the shards of one sharded run, kept in ``<parts_dir>/manifest.json``.
+
+    Every change is persisted atomically, so the manifest always describes
+    the part files on disk.
+    """
+
+    def __init__(self, parts_dir: str):
+        self.parts_dir = parts_dir
+        self.path = os.path.join(parts_dir, MANIFEST_NAME)
+        self.manifest: Dict[str, Any] = {}
+
+    def start(self, input_file: str, total_rows: int, shard_rows: int, resume: bool = True,
+              part_suffix: str = ".jsonl") -> bool:
+        """
+        Load the manifest of a previous run of the same input and shard size, or start a fresh one.
+
+        Shards marked done whose part file is gone are redone.
+
+        Returns:
+            bool: True if a previous run is being resumed
+        """
+        os.makedirs(self.parts_dir, exist_ok=True)
+        fingerprint = file_fingerprint(input_file)
+        if resume and os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as handle:
+                manifest = json.load(handle)
+            same_run = (manifest.get("fingerprint"), manifest.get("rows"), manifest.get("shard_rows"),
+                        manifest.get("part_suffix", ".jsonl"))
+            if same_run == (fingerprint, total_rows, shard_rows, part_suffix):
+                self.manifest = manifest
+                for shard in self.shards:
+                    if shard["status"] == "done" and not os.path.exists(self.part_path(shard)):
+                        shard["status"] = "pending"
+                self._save()
+                logger.info(f"Resuming {self.path}: {len(self.pending())} of {len(self.shards)} shards left")
+                return True
+            logger.warning(f"Manifest {self.path} belongs to another input, shard size or format, starting over")
+
+        self.manifest = {
+            "fingerprint": fingerprint,
+            "rows": total_rows,
+            "shard_rows": shard_rows,
+            "part_suffix": part_suffix,
+            "shards": [
+                {"shard": index, "start": start, "end": end, "part": f"part-{index:05d}{part_suffix}",
+                 "status": "pending", "attempts": 0, "error": None}
+                for index, (start, end) in enumerate(plan_shards(total_rows, shard_rows))
+            ],
+        }
+        self._save()
+        return False
+
+    @property
+    def shards(self) -> List[Dict[str, Any]]:
+        return self.manifest.get("shards", [])
+
+    def part_path(self, shard: Dict[str, Any]) -> str:
+        return os.path.join(self.parts_dir, shard["part"])
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """Shards that are not done, in input order."""
+        return [shard for shard in self.shards if shard["status"] != "done"]
+
+    def update(self, index: int, **fields: Any) -> None:
+        """Set fields of one shard and persist the manifest."""
+        self.shards[index].update(fields)
+        self._save()
+
+    def _save(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(self.manifest, handle, indent=2, default=str)
+        os.replace(tmp_path, self.path)
+
+
+def _run_shard(shard_fn: ShardFunction, frame: pd.DataFrame, part_path: str) -> int:
+    # The part only appears once complete
+    tmp_path = f"{part_path}.tmp"
+    shard_fn(frame, tmp_path)
+    os.replace(tmp_path, part_path)
+    return len(frame)
+
+
+def run_shards(
+    frame: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+    input_file: str,
+    parts_dir: str,
+    shard_fn: ShardFunction,
+    workers: int,
+    shard_rows: int = 10000,
+    retries: int = 2,
+    initializer: Optional[Callable[..., None]] = None,
+    initargs: tuple = (),
+    resume: bool = True,
+    on_shard_done: Optional[Callable[[Dict[str, Any]], None]] = None,
+    total_rows: Optional[int] = None,
+    part_suffix: str = ".jsonl",
+) -> ShardManifest:
+    """
+    Enrich the shards of ``frame`` in worker processes.
+
+    Workers are spawned (not forked), so none inherits the parent's driver;
+    ``initializer(*initargs)`` runs once in each, e.g. to build its
+    orchestrator. A shard whose worker raises is resubmitted up to
+    ``retries`` times, then marked failed with the error; the others carry on.
+    If a worker dies (e.g. killed for memory), the pool breaks and every
+    shard in flight fails with it; they are resubmitted to a new pool under
+    the same retry budget.
+
+    The rows may also be streamed as consecutive chunks of ``shard_rows``
+    rows (e.g. ``pd.read_csv(..., chunksize=shard_rows)``) with their
+    ``total_rows``; at most two shards per worker are then held in memory.
+
+    Args:
+        frame: Input rows, or their consecutive chunks of ``shard_rows`` rows
+        input_file: File the rows were read from (fingerprinted for resuming)
+        parts_dir: Directory of the part files and the manifest
+        shard_fn: Picklable function writing a shard's enriched rows to a path
+        workers: Worker processes
+        shard_rows: Rows per shard
+        retries: Extra attempts per shard
+        initializer: Called in every worker before its first shard
+        initargs: Arguments of ``initializer``
+        resume: Keep the shards a previous run of the same input finished
+        on_shard_done: Called in the parent with each finished shard
+        total_rows: Number of input rows; required when ``frame`` is chunked
+        part_suffix: File name suffix of the parts (e.g. ``.jsonl.gz``)
+
+    Returns:
+        ShardManifest: Final state of every shard
+
+    Raises:
+        ValueError: If chunks come without ``total_rows`` or do not line up with the shards
+    """
+    if isinstance(frame, pd.DataFrame):
+        total_rows = len(frame)
+        chunks: Iterator[pd.DataFrame] = (frame.iloc[start:end] for start, end in plan_shards(total_rows, shard_rows))
+    elif total_rows is None:
+        raise ValueError("total_rows is required when the rows come in chunks")
+    else:
+        chunks = iter(frame)
+
+    manifest = ShardManifest(parts_dir)
+    manifest.start(input_file, total_rows, shard_rows, resume=resume, part_suffix=part_suffix)
+    pending = manifest.pending()
+    if not pending:
+        return manifest
+    last_pending = pending[-1]["shard"]
+
+    def new_pool():
+        return ProcessPoolExecutor(
+            max_workers=min(workers, len(pending)), mp_context=get_context("spawn"),
+            initializer=initializer, initargs=initargs,
+        )
+
+    pools = [new_pool()]
+    try:
+        tries: Dict[int, int] = {}
+        # Rows of the shards in flight, kept for their retries
+        shard_frames: Dict[int, pd.DataFrame] = {}
+        futures: Dict[Any, Dict[str, Any]] = {}
+
+        def submit(shard):
+            tries[shard["shard"]] = tries.get(shard["shard"], 0) + 1
+            manifest.update(shard["shard"], status="running", attempts=shard["attempts"] + 1, error=None)
+            args = (_run_shard, shard_fn, shard_frames[shard["shard"]], manifest.part_path(shard))
+            try:
+                future = pools[-1].submit(*args)
+            except BrokenProcessPool:
+                # A worker died: the shards still in the old pool fail and are resubmitted here
+                logger.warning("Worker pool broken, starting a new one")
+                pools[-1].shutdown(wait=False, cancel_futures=True)
+                pools.append(new_pool())
+                future = pools[-1].submit(*args)
+            futures[future] = shard
+
+        def collect():
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                shard = futures.pop(future)
+                try:
+                    rows = future.result()
+                except Exception as e:
+                    error = str(e) or type(e).__name__
+                    logger.error(f"Shard {shard['shard']} (rows {shard['start']}-{shard['end']}) failed: {error}")
+                    if tries[shard["shard"]] <= retries:
+                        submit(shard)
+                    else:
+                        manifest.update(shard["shard"], status="failed", error=error)
+                        del shard_frames[shard["shard"]]
+                    continue
+                del shard_frames[shard["shard"]]
+                manifest.update(shard["shard"], status="done", rows=rows)
+                if on_shard_done is not None:
+                    on_shard_done(shard)
+
+        for shard, part_frame in zip(manifest.shards, chunks):
+            if len(part_frame) != shard["end"] - shard["start"]:
+                raise ValueError(f"Chunk of {len(part_frame)} rows for shard {shard['shard']} "
+                                 f"(rows {shard['start']}-{shard['end']})")
+            if shard["status"] != "done":
+                shard_frames[shard["shard"]] = part_frame
+                submit(shard)
+                while len(futures) >= 2 * workers:
+                    collect()
+            if shard["shard"] == last_pending:
+                break
+        while futures:
+            collect()
+    finally:
+        pools[-1].shutdown()
+
+    unread = [shard["shard"] for shard in manifest.shards if shard["status"] == "pending"]
+    if unread:
+        raise ValueError(f"The chunks ended before shards {unread}")
+    return manifest
+
+
+def merge_parts(manifest: ShardManifest, output: str) -> int:
+    """
+    Concatenate the part files of a finished run into ``output`` in input order.
+
+    Returns:
+        int: Rows merged
+
+    Raises:
+        RuntimeError: If a shard is not done
+    """
+    unfinished = [shard["shard"] for shard in manifest.pending()]
+    if unfinished:
+        raise RuntimeError(f"Cannot merge, shards not done: {unfinished}")
+    tmp_path = f"{output}.tmp"
+    with open(tmp_path, "wb") as out:
+        for shard in manifest.shards:
+            with open(manifest.part_path(shard), "rb") as part:
+                shutil.copyfileobj(part, out, 1024 * 1024)
+    os.replace(tmp_path, output)
+    return sum(shard.get("rows", 0) for shard in manifest.shards)
@@ -0,0 +1,234 @@
+"""
+Read-only local snapshot of the enrichment payloads of every disease.
+
+``build_snapshot`` precomputes, for every Disease node, the values of the
+four diagnosis aspects (already truncated to the limits it is built with),
+the Disease names and the adverse DDI pairs, and writes them to one SQLite
+file. ``EnrichmentSnapshot`` loads that file into memory and answers the
+orchestrators' aspects with dictionary lookups, so serving from it needs no
+Neo4j in the request path (see ``EnricherOrchestrator(snapshot=...)``).
+"""
+from __future__ import annotations
+
+import sys
+import os
+import json
+import time
+import logging
+import sqlite3
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.db.neo4j_connector import get_connector
+from src.enrichment.cache import graph_version_stamp
+from src.enrichment.diagnosis_tokens import build_diagnosis_specs
+from src.enrichment.disease_index import DISEASE_NAMES_QUERY, DiseaseNameIndex
+from src.enrichment.queries import ADVERSE_DDI_EDGES_QUERY, GRAPH_VERSION_QUERY, SNAPSHOT_ASPECT_QUERIES
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the table layout changes
+SNAPSHOT_FORMAT = 1
+
+# Orchestrator defaults; a snapshot cannot serve larger limits than it was built with
+DEFAULT_LIMITS = {
+    "causal_pathway": 10,
+    "comorbid_diseases": 5,
+    "indications": 10,
+    "contraindications": 10,
+}
+
+DDI_COLUMNS = ("id1", "id2", "drug1", "drug2", "interaction", "ddi_type", "pattern")
+
+_SCHEMA = [
+    "CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)",
+    "CREATE TABLE diseases (position INTEGER PRIMARY KEY, id, name TEXT)",
+    "CREATE TABLE payloads (disease INTEGER, aspect TEXT, vals TEXT, PRIMARY KEY (disease, aspect)) WITHOUT ROWID",
+    f"CREATE TABLE ddi ({', '.join(DDI_COLUMNS)})",
+]
+
+
+def build_snapshot(
+    path: str,
+    connector: Optional[Any] = None,
+    limits: Optional[Dict[str, int]] = None,
+    fetch_size: int = 5000,
+) -> Dict[str, Any]:
+    """
+    Precompute the enrichment payloads of every disease into a SQLite file.
+
+    The file is written next to ``path`` and moved into place at the end, so
+    readers never see a half-built snapshot.
+
+    Args:
+        path: Snapshot file to write (replaced if it exists)
+        connector: Neo4j connector (default: the shared one)
+        limits: Values kept per disease and aspect (default: ``DEFAULT_LIMITS``)
+        fetch_size: Records pulled from the server per round trip
+
+    Returns:
+        dict: Graph version, limits and the number of diseases, payloads and DDI pairs written
+    """
+    connector = connector or get_connector()
+    limits = {**DEFAULT_LIMITS, **(limits or {})}
+    start = time.time()
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    partial = f"{path}.partial"
+    if os.path.exists(partial):
+        os.remove(partial)
+
+    db = sqlite3.connect(partial)
+    try:
+        for statement in _SCHEMA:
+            db.execute(statement)
+
+        positions: Dict[Any, int] = {}
+        for row in connector.stream_query(DISEASE_NAMES_QUERY, fetch_size=fetch_size):
+            if row.get("id") is not None and row["id"] not in positions:
+                positions[row["id"]] = len(positions)
+                db.execute("INSERT INTO diseases VALUES (?, ?, ?)", (positions[row["id"]], row["id"], row.get("name") or ""))
+
+        payloads = 0
+        for aspect, limit in limits.items():
+            rows = connector.stream_query(SNAPSHOT_ASPECT_QUERIES[aspect], {"limit": limit}, fetch_size=fetch_size)
+            entries = [
+                (positions[row["id"]], aspect, json.dumps(row["values"]))
+                for row in rows
+                if row.get("values") and row.get("id") in positions
+            ]
+            db.executemany("INSERT OR REPLACE INTO payloads VALUES (?, ?, ?)", entries)
+            payloads += len(entries)
+            logger.info(f"Snapshot: {len(entries):,} diseases with {aspect}")
+
+        ddi_rows = connector.stream_query(ADVERSE_DDI_EDGES_QUERY, fetch_size=fetch_size)
+        cursor = db.executemany(
+            f"INSERT INTO ddi VALUES ({', '.join('?' * len(DDI_COLUMNS))})",
+            (tuple(row.get(column) for column in DDI_COLUMNS) for row in ddi_rows),
+        )
+        ddi_pairs = cursor.rowcount
+        db.execute("CREATE INDEX ddi_pair ON ddi (id1, id2)")
+
+        graph_version = graph_version_stamp(connector.execute_query(GRAPH_VERSION_QUERY))
+        meta = {
+            "format": SNAPSHOT_FORMAT,
+            "graph_version": graph_version,
+            "limits": limits,
+            "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }
+        db.executemany("INSERT INTO meta VALUES (?, ?)", [(key, json.dumps(value)) for key, value in meta.items()])
+        db.commit()
+    finally:
+        db.close()
+    os.replace(partial, path)
+
+    summary = {
+        "graph_version": graph_version,
+        "limits": limits,
+        "diseases": len(positions),
+        "payloads": payloads,
+        "ddi_pairs": ddi_pairs,
+    }
+    logger.info(f"Wrote enrichment snapshot {path} in {time.time() - start:.1f}s: {summary}")
+    return summary
+
+
+class EnrichmentSnapshot:
+    """
+    In-memory view of a snapshot written by ``build_snapshot``.
+
+    The file is opened read-only and loaded whole (a few MB for PrimeKG);
+    diagnoses are resolved with a ``DiseaseNameIndex`` over the stored names,
+    so a diagnosis matches the same diseases as the ``CONTAINS`` queries.
+    Lookups never touch the file or the graph and are thread-safe.
+
+    Truncation is per disease rather than per diagnosis: a diagnosis gets
+    the first ``limit`` values over its matched diseases in name order, a
+    deterministic choice among the rows the live query may return.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Snapshot file written by ``build_snapshot``
+
+        Raises:
+            ValueError: If the file is not a snapshot of this format
+        """
+        self.path = path
+        db = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+        try:
+            try:
+                meta = {key: json.loads(value) for key, value in db.execute("SELECT key, value FROM meta")}
+            except sqlite3.DatabaseError as e:
+                raise ValueError(f"{path} is not an enrichment snapshot: {e}") from e
+            if meta.get("format") != SNAPSHOT_FORMAT:
+                raise ValueError(f"{path} has snapshot format {meta.get('format')}, expected {SNAPSHOT_FORMAT}")
+
+            diseases = db.execute("SELECT position, id, name FROM diseases ORDER BY position").fetchall()
+            self._names = [name for _, _, name in diseases]
+            self._payloads: Dict[str, Dict[int, List[str]]] = defaultdict(dict)
+            for disease, aspect, values in db.execute("SELECT disease, aspect, vals FROM payloads"):
+                self._payloads[aspect][disease] = json.loads(values)
+            self._ddi: Dict[Tuple[Any, Any], List[dict]] = defaultdict(list)
+            for values in db.execute(f"SELECT {', '.join(DDI_COLUMNS)} FROM ddi"):
+                row = dict(zip(DDI_COLUMNS, values))
+                self._ddi[(row["id1"], row["id2"])].append(row)
+        finally:
+            db.close()
+
+        self.graph_version: str = meta["graph_version"]
+        self.limits: Dict[str, int] = meta["limits"]
+        self.built_at: str = meta["built_at"]
+        # Positions stand in for the Disease ids, which the lookups never need
+        self._index = DiseaseNameIndex(rows=[{"id": position, "name": name} for position, _, name in diseases])
+        self._index.refresh()
+        logger.info(
+            f"Loaded enrichment snapshot {path} ({len(diseases):,} diseases, "
+            f"{sum(len(rows) for rows in self._ddi.values()):,} DDI pairs, graph {self.graph_version})"
+        )
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def check_limits(self, limits: Dict[str, int]) -> None:
+        """Warn about aspects requested with more values than the snapshot kept."""
+        for aspect, limit in limits.items():
+            if limit > self.limits.get(aspect, 0):
+                logger.warning(
+                    f"Snapshot {self.path} keeps {self.limits.get(aspect, 0)} {aspect} values per disease, "
+                    f"fewer than the requested {limit}"
+                )
+
+    def diagnosis_rows(self, diagnoses: List[str], limits: Dict[str, int]) -> List[dict]:
+        """
+        Rows of the diagnosis aspects in ``limits``, shaped like those of the
+        combined diagnosis query (``input_dx``, ``aspect``, ``disease``,
+        ``value``) and in its order.
+        """
+        rows = []
+        for spec in build_diagnosis_specs(diagnoses):
+            diseases = sorted(self._index.resolve(spec["tokens"]), key=self._names.__getitem__)
+            for aspect, limit in limits.items():
+                payloads = self._payloads.get(aspect, {})
+                spec_rows = [
+                    {"input_dx": spec["input_dx"], "aspect": aspect, "disease": self._names[disease], "value": value}
+                    for disease in diseases
+                    for value in payloads.get(disease, ())
+                ]
+                rows.extend(spec_rows[:limit])
+        rows.sort(key=lambda row: (row["input_dx"], row["aspect"], row["disease"], row["value"]))
+        return rows
+
+    def ddi_rows(self, drug_ids: List[str]) -> List[dict]:
+        """Rows of ``DDI_QUERY`` for the adverse interactions among ``drug_ids``."""
+        ids = sorted({drug_id for drug_id in drug_ids if drug_id})
+        return [
+            row
+            for i, id1 in enumerate(ids)
+            for id2 in ids[i + 1:]
+            for row in self._ddi.get((id1, id2), ())
+        ]
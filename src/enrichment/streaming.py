@@ -0,0 +1,199 @@
+"""
+Streaming I/O of the batch enrichment rows.
+
+The input CSV is read in chunks of a fixed number of rows, so memory stays
+flat whatever the file size. The list columns of a chunk (``diagnose``,
+``drugbank_id``) are parsed once per distinct cell value rather than once
+per row. The column dtypes are fixed by a first pass over the file
+(``scan_csv``) rather than guessed per chunk. The enriched records are
+encoded straight to UTF-8 JSON lines and written through a large buffer,
+optionally gzip- or zstd-compressed (chosen by the ``.gz`` / ``.zst``
+suffix of the output).
+
+``orjson`` (JSON encoding) and ``zstandard`` (``.zst`` output) are optional;
+without ``orjson`` the lines are encoded with the stdlib ``json`` in the
+same compact form.
+"""
+from __future__ import annotations
+
+import ast
+import io
+import sys
+import os
+import gzip
+import json
+import logging
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+# Output suffix -> compression
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".zst": "zstd"}
+
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+# Column kind -> dtype the chunks are read with
+KIND_DTYPES = {"int": "Int64", "float": "float64", "bool": "boolean", "str": "object"}
+
+
+def parse_list_cell(value: object) -> List[str]:
+    """Parse a CSV cell that may be a Python list repr or a plain string."""
+    if isinstance(value, list):
+        return [str(v) for v in value]
+    if not isinstance(value, str) or not value.strip():
+        return []
+    try:
+        parsed = ast.literal_eval(value)
+        if isinstance(parsed, list):
+            return [str(v) for v in parsed]
+    except (ValueError, SyntaxError):
+        pass
+    return [value.strip()]
+
+
+def parse_list_column(chunk: pd.DataFrame, name: str) -> List[List[str]]:
+    """
+    Parse every cell of a list column of a chunk, each distinct value once.
+
+    The same diagnosis and drug lists recur across many rows, so the column
+    is factorized and only its distinct values go through ``literal_eval``.
+    Rows share the parsed list of their value; callers must not mutate it.
+
+    Args:
+        chunk: Input rows
+        name: Column name; a missing column parses as empty lists
+
+    Returns:
+        One parsed list per row (empty for missing cells)
+    """
+    if name not in chunk:
+        return [[] for _ in range(len(chunk))]
+    codes, uniques = pd.factorize(chunk[name], use_na_sentinel=True)
+    parsed = [parse_list_cell(value) for value in uniques] + [[]]  # code -1 (NaN) -> []
+    return [parsed[code] for code in codes]
+
+
+def read_csv_chunks(path: str, chunk_rows: int, dtype: Optional[Dict[str, str]] = None) -> Iterator[pd.DataFrame]:
+    """Read a CSV in consecutive chunks of ``chunk_rows`` rows, with the column dtypes of ``scan_csv``."""
+    with pd.read_csv(path, chunksize=chunk_rows, dtype=dtype) as reader:
+        yield from reader
+
+
+def _column_kind(column: pd.Series) -> Optional[str]:
+    """Kind of the values of a column as pandas read them, None if they are all missing."""
+    values = column.dropna()
+    if values.empty:
+        return None
+    if pd.api.types.is_bool_dtype(values):
+        return "bool"
+    if pd.api.types.is_integer_dtype(values):
+        return "int"
+    if pd.api.types.is_float_dtype(values):
+        return "int" if (values % 1 == 0).all() else "float"
+    return "str"
+
+
+def _merge_kinds(kind: Optional[str], other: Optional[str]) -> Optional[str]:
+    if kind is None or other is None or kind == other:
+        return kind or other
+    if {kind, other} == {"int", "float"}:
+        return "float"
+    return "str"
+
+
+def scan_csv(path: str, chunk_rows: int = 100000) -> Tuple[int, Dict[str, str]]:
+    """
+    Count the rows of a CSV and fix the dtype of every column over the whole file.
+
+    pandas infers dtypes per chunk, so an integer column reads as float in
+    just the chunks where it has gaps, and a column of numbers with a few
+    strings reads as numbers in the chunks without them. This first pass
+    merges what every chunk holds: whole numbers (gaps or not) are
+    ``Int64``, any fraction makes a column ``float64``, and anything that is
+    not uniformly numeric or boolean is read as strings. Passing the result
+    to ``read_csv_chunks`` makes a row's output independent of its chunk.
+
+    Returns:
+        Number of rows, and column name -> dtype
+    """
+    rows = 0
+    kinds: Dict[str, Optional[str]] = {}
+    with pd.read_csv(path, chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            rows += len(chunk)
+            for name in chunk.columns:
+                kinds[name] = _merge_kinds(kinds.get(name), _column_kind(chunk[name]))
+    return rows, {name: KIND_DTYPES[kind or "str"] for name, kind in kinds.items()}
+
+
+def chunk_records(chunk: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Rows of a chunk as dicts of plain Python values, missing cells as None."""
+    return chunk.astype(object).where(chunk.notna(), None).to_dict("records")
+
+
+def encode_line(record: Dict[str, Any]) -> bytes:
+    """One compact JSON line, UTF-8 encoded, with orjson if it is installed."""
+    if orjson is not None:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def compression_for(path: str) -> Optional[str]:
+    """Compression of an output path from its suffix: ``"gzip"``, ``"zstd"`` or None."""
+    return COMPRESSION_SUFFIXES.get(os.path.splitext(path)[1])
+
+
+def open_jsonl(path: str, compression: Optional[str] = None, buffer_size: int = DEFAULT_BUFFER_SIZE) -> BinaryIO:
+    """
+    Open a buffered binary writer for JSON lines.
+
+    Args:
+        path: Output path
+        compression: ``"gzip"``, ``"zstd"`` or None for plain text
+        buffer_size: Bytes buffered before each write to the file or compressor
+
+    Returns:
+        Writer; closing it flushes and closes the file
+
+    Raises:
+        ImportError: If zstd compression is asked for without ``zstandard``
+        ValueError: If the compression is unknown
+    """
+    if compression is None:
+        return open(path, "wb", buffering=buffer_size)
+    if compression == "gzip":
+        # Level 6 compresses JSON almost as well as 9 at a fraction of the CPU
+        raw = gzip.open(path, "wb", compresslevel=6)
+    elif compression == "zstd":
+        if zstandard is None:
+            raise ImportError("zstandard is required for .zst output (pip install zstandard)")
+        raw = zstandard.ZstdCompressor(level=3).stream_writer(open(path, "wb"))
+    else:
+        raise ValueError(f"Unknown compression {compression!r}")
+    return io.BufferedWriter(raw, buffer_size=buffer_size)
+
+
+def write_records(out: BinaryIO, records: Iterable[Dict[str, Any]]) -> int:
+    """
+    Write records as JSON lines with a single write call.
+
+    Returns:
+        Number of records written
+    """
+    lines = [encode_line(record) for record in records]
+    out.write(b"".join(lines))
+    return len(lines)
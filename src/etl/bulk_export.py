@@ -0,0 +1,288 @@
+"""
+Export PrimeKG (and optionally Flame DDI) as CSV files for ``neo4j-admin database import full``.
+
+Cold builds don't need transactional MERGE: the offline importer writes the
+store directly from header/data CSV pairs. Files are split per node label and
+per ``(relation type, source label, target label)`` partition, using the same
+label and relation-type normalization as ``PrimeKGLoader``. Each label has its
+own ID space, matching the loader's per-label ``id`` uniqueness constraints.
+"""
+import os
+import sys
+import csv
+import shlex
+import logging
+import pandas as pd
+from tqdm import tqdm
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from src.etl.primekg_loader import NAME_INDEXED_LABELS, NodeKeySet, PrimeKGLoader, name_fields
+from src.utils.columnar import advance_progress, iter_edge_batches
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+NODE_PROPERTIES = ['name', 'type', 'source']
+# Extra columns of NAME_INDEXED_LABELS nodes
+NAME_PROPERTIES = ['name_lower']
+FLAME_DDI_PROPERTIES = ['display_relation', 'description', 'source', 'interaction_class', 'ddi_type', 'pattern']
+
+
+def _hash_rows(frame):
+    """Hash each row of a frame into a uint64 key."""
+    return pd.util.hash_pandas_object(frame.astype(str), index=False).to_numpy()
+
+
+class BulkImportExporter:
+    """
+    Writer for neo4j-admin import header and data files.
+    """
+
+    def __init__(self, output_dir, batch_size=100000, max_rows=None):
+        """
+        Initialize the exporter.
+
+        Args:
+            output_dir (str): Directory that receives the CSV files
+            batch_size (int): Number of CSV rows to parse per chunk
+            max_rows (int): Maximum number of PrimeKG rows to export (None = all rows)
+        """
+        self.output_dir = output_dir
+        self.batch_size = batch_size
+        self.max_rows = max_rows
+        self.node_files = {}
+        self.relationship_files = {}
+        self.node_counts = {}
+        self.relationship_counts = {}
+        self._seen_nodes = {}
+        self._seen_relationships = {}
+        self._handles = {}
+
+    def _open(self, file_name, header):
+        """Open a data file for appending and write its separate header file once."""
+        if file_name not in self._handles:
+            with open(os.path.join(self.output_dir, f"{file_name}_header.csv"), 'w', newline='', encoding='utf-8') as handle:
+                csv.writer(handle).writerow(header)
+            self._handles[file_name] = open(os.path.join(self.output_dir, f"{file_name}.csv"), 'w', newline='', encoding='utf-8')
+        return self._handles[file_name]
+
+    def _write_nodes(self, label, nodes):
+        """
+        Append nodes not exported yet to the label's data file.
+
+        Args:
+            label (str): Normalized Neo4j label
+            nodes (pd.DataFrame): Columns ``id`` plus ``NODE_PROPERTIES``
+        """
+        seen = self._seen_nodes.setdefault(label, NodeKeySet())
+        nodes = nodes.drop_duplicates(subset=['id'])
+        nodes = nodes[seen.add_new(NodeKeySet.hash_nodes(pd.Series(label, index=nodes.index), nodes['id']))]
+        if nodes.empty:
+            return
+
+        file_name = f"nodes_{label}"
+        columns = ['id'] + NODE_PROPERTIES
+        header = [f"id:ID({label})"] + NODE_PROPERTIES
+        if label in NAME_INDEXED_LABELS:
+            fields = pd.DataFrame([name_fields(name) for name in nodes['name']], index=nodes.index)
+            nodes = nodes.assign(name_lower=fields['name_lower'])
+            columns += ['name_lower']
+            header += NAME_PROPERTIES
+        handle = self._open(file_name, header)
+        nodes[columns].to_csv(handle, header=False, index=False)
+        self.node_files[label] = file_name
+        self.node_counts[label] = self.node_counts.get(label, 0) + len(nodes)
+
+    def _write_relationships(self, relation_type, source_label, target_label, edges, properties, dedup_columns):
+        """
+        Append relationships not exported yet to the partition's data file.
+
+        Args:
+            relation_type (str): Normalized relationship type
+            source_label (str): Normalized label of the source nodes
+            target_label (str): Normalized label of the target nodes
+            edges (pd.DataFrame): Columns ``source_id``, ``target_id`` plus ``properties``
+            properties (list): Relationship property columns
+            dedup_columns (list): Columns identifying one relationship (the loader's MERGE key)
+        """
+        partition = (relation_type, source_label, target_label, tuple(dedup_columns))
+        seen = self._seen_relationships.setdefault(partition, NodeKeySet())
+        edges = edges.drop_duplicates(subset=dedup_columns)
+        edges = edges[seen.add_new(_hash_rows(edges[dedup_columns]))]
+        if edges.empty:
+            return
+
+        suffix = '_flame_ddi' if 'interaction_class' in properties else ''
+        file_name = f"rels_{relation_type}_{source_label}_{target_label}{suffix}"
+        header = [f":START_ID({source_label})", f":END_ID({target_label})"] + properties
+        handle = self._open(file_name, header)
+        edges[['source_id', 'target_id'] + properties].to_csv(handle, header=False, index=False)
+        self.relationship_files[file_name] = relation_type
+        self.relationship_counts[relation_type] = self.relationship_counts.get(relation_type, 0) + len(edges)
+
+    def export_primekg(self, edges_file):
+        """
+        Export the PrimeKG edges file as node and relationship CSVs.
+
+        Args:
+            edges_file (str): Path to the PrimeKG CSV file
+
+        Returns:
+            int: Number of CSV rows exported
+        """
+        logger.info(f"Exporting {edges_file} for neo4j-admin import")
+        total_rows = 0
+        file_size = os.path.getsize(edges_file)
+
+        with tqdm(total=file_size, unit='B', unit_scale=True, desc="Exporting PrimeKG") as pbar:
+            for chunk in iter_edge_batches(edges_file, self.batch_size):
+                if self.max_rows:
+                    remaining_rows = self.max_rows - total_rows
+                    if remaining_rows <= 0:
+                        break
+                    chunk = chunk.head(remaining_rows)
+                total_rows += len(chunk)
+
+                # Stringify ids the same way as the loader
+                chunk = chunk.assign(x_id=chunk['x_id'].astype(str), y_id=chunk['y_id'].astype(str))
+
+                for side in ('x', 'y'):
+                    nodes = pd.DataFrame({
+                        'id': chunk[f'{side}_id'],
+                        'name': chunk[f'{side}_name'],
+                        'type': chunk[f'{side}_type'],
+                        'source': chunk[f'{side}_source'],
+                    })
+                    for node_type, group in nodes.groupby('type', sort=False, observed=True):
+                        self._write_nodes(PrimeKGLoader._normalize_label(node_type), group)
+
+                edges = pd.DataFrame({
+                    'source_id': chunk['x_id'],
+                    'target_id': chunk['y_id'],
+                    'display_relation': chunk['display_relation'],
+                })
+                for (x_type, relation, y_type), group in edges.groupby(
+                        [chunk['x_type'], chunk['relation'], chunk['y_type']], sort=False, observed=True):
+                    self._write_relationships(
+                        PrimeKGLoader._normalize_relation_type(relation),
+                        PrimeKGLoader._normalize_label(x_type),
+                        PrimeKGLoader._normalize_label(y_type),
+                        group,
+                        ['display_relation'],
+                        ['source_id', 'target_id'],
+                    )
+
+                advance_progress(pbar, chunk)
+                pbar.set_postfix({"rows": f"{total_rows:,}", "labels": len(self.node_files)})
+
+        logger.info(f"Exported {total_rows:,} PrimeKG rows")
+        return total_rows
+
+    def export_flame_ddi(self, csv_path):
+        """
+        Export adverse Flame DDI rows as ``DRUG_DRUG`` relationships.
+
+        Uses the same filtering and properties as ``scripts/import_flame_ddi_to_neo4j.py``.
+        Drugs not present in PrimeKG are exported as ``Drug`` nodes with source ``flame_ddi``.
+
+        Args:
+            csv_path (str): Path to ddi_data_all.csv
+
+        Returns:
+            int: Number of DDI rows exported
+        """
+        from scripts.import_flame_ddi_to_neo4j import FLAME_DRUG_DRUG_DISPLAY, _read_batches
+
+        logger.info(f"Exporting Flame DDI from {csv_path}")
+        total_rows = 0
+        for batch in _read_batches(csv_path=csv_path, batch_size=self.batch_size):
+            total_rows += len(batch)
+            edges = pd.DataFrame(batch).rename(columns={'drug1': 'source_id', 'drug2': 'target_id'})
+            edges['display_relation'] = FLAME_DRUG_DRUG_DISPLAY
+            edges['source'] = 'flame_ddi'
+            edges['interaction_class'] = 'adverse'
+
+            drug_ids = pd.concat([edges['source_id'], edges['target_id']], ignore_index=True)
+            self._write_nodes('Drug', pd.DataFrame({'id': drug_ids, 'name': None, 'type': None, 'source': 'flame_ddi'}))
+            self._write_relationships(
+                'DRUG_DRUG', 'Drug', 'Drug', edges, FLAME_DDI_PROPERTIES,
+                ['source_id', 'target_id', 'ddi_type', 'pattern'],
+            )
+
+        logger.info(f"Exported {total_rows:,} Flame DDI rows")
+        return total_rows
+
+    def import_command(self, database='neo4j'):
+        """
+        Build the ``neo4j-admin database import full`` command for the exported files.
+
+        Args:
+            database (str): Target database name
+
+        Returns:
+            list: Command arguments
+        """
+        command = ['neo4j-admin', 'database', 'import', 'full', database,
+                   '--overwrite-destination', '--id-type=string']
+        for label, file_name in sorted(self.node_files.items()):
+            command.append(f"--nodes={label}={file_name}_header.csv,{file_name}.csv")
+        for file_name, relation_type in sorted(self.relationship_files.items()):
+            command.append(f"--relationships={relation_type}={file_name}_header.csv,{file_name}.csv")
+        return command
+
+    def close(self):
+        """Close all open data files."""
+        for handle in self._handles.values():
+            handle.close()
+        self._handles = {}
+
+
+def export_import_csv(edges_file, output_dir, ddi_csv=None, batch_size=100000, max_rows=None):
+    """
+    Convert PrimeKG (and optionally Flame DDI) into neo4j-admin import files.
+
+    Writes ``import.sh`` next to the CSVs with the matching import command.
+
+    Args:
+        edges_file (str): Path to the PrimeKG CSV file
+        output_dir (str): Directory that receives the CSV files
+        ddi_csv (str): Optional path to the Flame ddi_data_all.csv
+        batch_size (int): Number of CSV rows to parse per chunk
+        max_rows (int): Maximum number of PrimeKG rows to export (None = all rows)
+
+    Returns:
+        dict: Summary of the export
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    exporter = BulkImportExporter(output_dir, batch_size=batch_size, max_rows=max_rows)
+    try:
+        total_rows = exporter.export_primekg(edges_file)
+        ddi_rows = exporter.export_flame_ddi(ddi_csv) if ddi_csv else 0
+    finally:
+        exporter.close()
+
+    command = exporter.import_command()
+    script_path = os.path.join(output_dir, 'import.sh')
+    with open(script_path, 'w', encoding='utf-8') as handle:
+        handle.write('#!/bin/sh\n')
+        handle.write('# Run with Neo4j stopped, then create constraints and dump with dumps.sh\n')
+        handle.write('cd "$(dirname "$0")" || exit 1\n')
+        lines = [' '.join(command[:7])] + [shlex.quote(arg) for arg in command[7:]]
+        handle.write(' \\\n  '.join(lines) + '\n')
+    os.chmod(script_path, 0o755)
+
+    for label, count in sorted(exporter.node_counts.items()):
+        logger.info(f"  {label}: {count:,} nodes")
+    for relation_type, count in sorted(exporter.relationship_counts.items()):
+        logger.info(f"  {relation_type}: {count:,} relationships")
+    logger.info(f"Wrote neo4j-admin import command to {script_path}")
+
+    return {
+        "rows_exported": total_rows,
+        "ddi_rows_exported": ddi_rows,
+        "node_counts": exporter.node_counts,
+        "relationship_counts": exporter.relationship_counts,
+        "import_script": script_path,
+    }
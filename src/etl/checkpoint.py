@@ -0,0 +1,154 @@
+"""
+Checkpoint manifests for resumable PrimeKG loads.
+"""
+import os
+import glob
+import json
+import hashlib
+import logging
+import numpy as np
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Bytes hashed from the start and end of the input file for its fingerprint
+_FINGERPRINT_BYTES = 1024 * 1024
+
+
+def file_fingerprint(path):
+    """
+    Fingerprint an input file cheaply (size, mtime and hashes of its first and last MiB).
+
+    Args:
+        path (str): Path to the file
+
+    Returns:
+        dict: Fingerprint fields
+    """
+    stat = os.stat(path)
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        digest.update(handle.read(_FINGERPRINT_BYTES))
+        if stat.st_size > _FINGERPRINT_BYTES:
+            handle.seek(max(_FINGERPRINT_BYTES, stat.st_size - _FINGERPRINT_BYTES))
+            digest.update(handle.read())
+    return {
+        "path": os.path.abspath(path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": digest.hexdigest(),
+    }
+
+
+class LoadCheckpoint:
+    """
+    Manifest of the work a load has committed to Neo4j.
+
+    The manifest is a JSON file next to the input CSV holding the input
+    fingerprint, and per phase the number of CSV rows whose writes are
+    committed plus the per-label and per-relation counts. Keys of nodes already
+    extracted are journaled to a separate append-only file so node
+    deduplication survives a restart.
+    """
+
+    def __init__(self, edges_file, path=None):
+        """
+        Initialize the checkpoint.
+
+        Args:
+            edges_file (str): Path to the PrimeKG CSV file being loaded
+            path (str): Manifest path (default: ``<edges_file>.checkpoint.json``)
+        """
+        self.edges_file = edges_file
+        self.path = path or f"{edges_file}.checkpoint.json"
+        self.manifest = {}
+
+    def _keys_path(self, phase):
+        return f"{self.path}.{phase}.keys"
+
+    def start(self, resume=False):
+        """
+        Load the existing manifest when resuming, otherwise start a fresh one.
+
+        A manifest whose fingerprint does not match the input file is discarded.
+
+        Args:
+            resume (bool): Whether to continue from a previous run
+
+        Returns:
+            bool: True if a previous run is being resumed
+        """
+        fingerprint = file_fingerprint(self.edges_file)
+        if resume and os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as handle:
+                manifest = json.load(handle)
+            if manifest.get("fingerprint") == fingerprint:
+                self.manifest = manifest
+                logger.info(f"Resuming from checkpoint {self.path}")
+                return True
+            logger.warning(f"Checkpoint {self.path} belongs to a different input file, starting over")
+        elif resume:
+            logger.info(f"No checkpoint found at {self.path}, starting from the beginning")
+
+        for keys_path in glob.glob(glob.escape(self.path) + '.*.keys'):
+            os.remove(keys_path)
+        self.manifest = {"fingerprint": fingerprint, "phases": {}}
+        self._save()
+        return False
+
+    def phase(self, name):
+        """
+        Get the recorded state of a phase.
+
+        Args:
+            name (str): Phase name
+
+        Returns:
+            dict: Phase state (empty if the phase has not started)
+        """
+        return self.manifest.get("phases", {}).get(name, {})
+
+    def update(self, name, **fields):
+        """
+        Record progress of a phase and persist the manifest atomically.
+
+        Args:
+            name (str): Phase name
+            **fields: Phase fields to set (e.g. ``rows_committed``, ``completed``)
+        """
+        self.manifest.setdefault("phases", {}).setdefault(name, {}).update(fields)
+        self._save()
+
+    def append_keys(self, phase, keys):
+        """
+        Journal node keys whose nodes have been committed.
+
+        Args:
+            phase (str): Phase name
+            keys (np.ndarray): uint64 node keys
+        """
+        if len(keys):
+            with open(self._keys_path(phase), 'ab') as handle:
+                np.asarray(keys, dtype=np.uint64).tofile(handle)
+
+    def load_keys(self, phase):
+        """
+        Read the journaled node keys of a phase.
+
+        Args:
+            phase (str): Phase name
+
+        Returns:
+            np.ndarray: uint64 node keys
+        """
+        keys_path = self._keys_path(phase)
+        if not os.path.exists(keys_path):
+            return np.empty(0, dtype=np.uint64)
+        return np.fromfile(keys_path, dtype=np.uint64)
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as handle:
+            json.dump(self.manifest, handle, indent=2, default=str)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,269 @@
+"""
+Incremental (delta) loading between two PrimeKG releases.
+
+Both CSVs are hash-partitioned on disk by node and edge key, so only one
+partition of each release is in memory at a time. Each node and edge gets a
+fingerprint of its properties; comparing the partitions yields the inserts,
+deletes and property updates that are applied to Neo4j. The applied release
+is recorded on a ``PrimeKGRelease`` metadata node.
+"""
+import os
+import sys
+import pickle
+import logging
+import tempfile
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from src.etl.primekg_loader import NodeKeySet, PrimeKGLoader
+from src.utils.columnar import advance_progress, iter_edge_batches
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+NODE_KEY = ['type', 'id']
+EDGE_KEY = ['x_type', 'x_id', 'relation', 'y_type', 'y_id']
+
+
+def _node_delete_query(node_label):
+    return f"""
+    UNWIND $rows AS row
+    MATCH (n:{node_label} {{id: row.id}})
+    DETACH DELETE n
+    """
+
+
+def _relationship_delete_query(source_label, relation_type, target_label):
+    # Flame DDI edges share DRUG_DRUG but are not part of PrimeKG releases
+    return f"""
+    UNWIND $rows AS row
+    MATCH (source:{source_label} {{id: row.source_id}})-[r:{relation_type}]->(target:{target_label} {{id: row.target_id}})
+    WHERE coalesce(r.source, '') <> 'flame_ddi'
+    DELETE r
+    """
+
+
+def _hash_rows(frame):
+    """Hash each row of a frame into a uint64 key."""
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+
+def _append_frame(path, frame):
+    with open(path, 'ab') as handle:
+        pickle.dump(frame, handle, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _read_frames(path):
+    frames = []
+    if os.path.exists(path):
+        with open(path, 'rb') as handle:
+            while True:
+                try:
+                    frames.append(pickle.load(handle))
+                except EOFError:
+                    break
+    return pd.concat(frames, ignore_index=True) if frames else None
+
+
+def diff_frames(old, new, key, fingerprint, keep):
+    """
+    Compare the records of one partition of the old and new release.
+
+    Args:
+        old (pd.DataFrame): Old release records (None if the partition is empty)
+        new (pd.DataFrame): New release records (None if the partition is empty)
+        key (list): Columns identifying a record
+        fingerprint (list): Columns whose values are compared
+        keep (str): Which duplicate of a key wins (``first`` or ``last``)
+
+    Returns:
+        tuple: ``(inserts, deletes, updates)`` as DataFrames of new/old/new records
+    """
+    columns = (new if new is not None else old).columns
+    empty = pd.DataFrame(columns=columns)
+    old = empty if old is None else old.drop_duplicates(subset=key, keep=keep)
+    new = empty if new is None else new.drop_duplicates(subset=key, keep=keep)
+
+    old = old.assign(_key=_hash_rows(old[key].astype(str)), _fp=_hash_rows(old[fingerprint].astype(str)))
+    new = new.assign(_key=_hash_rows(new[key].astype(str)), _fp=_hash_rows(new[fingerprint].astype(str)))
+
+    old_keys = old['_key'].to_numpy()
+    new_keys = new['_key'].to_numpy()
+    in_old = np.isin(new_keys, old_keys)
+    in_new = np.isin(old_keys, new_keys)
+
+    inserts = new[~in_old]
+    deletes = old[~in_new]
+    old_fp = pd.Series(old['_fp'].to_numpy(), index=old_keys)
+    both = new[in_old]
+    updates = both[both['_fp'].to_numpy() != old_fp.loc[both['_key'].to_numpy()].to_numpy()]
+
+    drop = ['_key', '_fp']
+    return inserts.drop(columns=drop), deletes.drop(columns=drop), updates.drop(columns=drop)
+
+
+class DeltaLoader:
+    """
+    Apply the difference between two PrimeKG releases to Neo4j.
+    """
+
+    def __init__(self, loader=None, partitions=64, work_dir=None):
+        """
+        Initialize the delta loader.
+
+        Args:
+            loader (PrimeKGLoader): Loader used for batched writes (batch size, workers, retries)
+            partitions (int): Number of on-disk hash partitions per release
+            work_dir (str): Directory for partition files (default: a temporary directory)
+        """
+        self.loader = loader or PrimeKGLoader()
+        self.db = self.loader.db
+        self.partitions = partitions
+        self.work_dir = work_dir
+        self.counts = {
+            "nodes_inserted": 0, "nodes_updated": 0, "nodes_deleted": 0,
+            "relationships_inserted": 0, "relationships_updated": 0, "relationships_deleted": 0,
+        }
+
+    def _partition_release(self, csv_file, work_dir, release):
+        """
+        Split a release CSV into node and edge partition files by key hash.
+
+        Args:
+            csv_file (str): Path to the PrimeKG CSV file
+            work_dir (str): Directory for partition files
+            release (str): ``old`` or ``new``
+
+        Returns:
+            set: Node types found in the release
+        """
+        node_types = set()
+        file_size = os.path.getsize(csv_file)
+        with tqdm(total=file_size, unit='B', unit_scale=True, desc=f"Partitioning {release} release") as pbar:
+            for chunk in iter_edge_batches(csv_file, self.loader.batch_size):
+                chunk = chunk.assign(x_id=chunk['x_id'].astype(str), y_id=chunk['y_id'].astype(str))
+
+                nodes = pd.concat([
+                    pd.DataFrame({
+                        'id': chunk[f'{side}_id'].to_numpy(),
+                        'name': chunk[f'{side}_name'].to_numpy(),
+                        'type': chunk[f'{side}_type'].to_numpy(),
+                        'source': chunk[f'{side}_source'].to_numpy(),
+                    })
+                    for side in ('x', 'y')
+                ], ignore_index=True).drop_duplicates(subset=NODE_KEY)
+                node_types.update(nodes['type'].unique())
+                node_parts = NodeKeySet.hash_nodes(nodes['type'], nodes['id']) % self.partitions
+                for part, group in nodes.groupby(node_parts, sort=False):
+                    _append_frame(os.path.join(work_dir, f"{release}_nodes_{part}.pkl"), group)
+
+                edges = chunk[EDGE_KEY + ['display_relation']]
+                edge_parts = _hash_rows(edges[EDGE_KEY]) % self.partitions
+                for part, group in edges.groupby(edge_parts, sort=False):
+                    _append_frame(os.path.join(work_dir, f"{release}_edges_{part}.pkl"), group)
+
+                advance_progress(pbar, chunk)
+        return node_types
+
+    def _apply_nodes(self, work_dir, dry_run):
+        """Upsert new/changed nodes per partition; return the nodes to delete."""
+        node_deletes = []
+        for part in tqdm(range(self.partitions), desc="Diffing nodes"):
+            old = _read_frames(os.path.join(work_dir, f"old_nodes_{part}.pkl"))
+            new = _read_frames(os.path.join(work_dir, f"new_nodes_{part}.pkl"))
+            if old is None and new is None:
+                continue
+            inserts, deletes, updates = diff_frames(old, new, NODE_KEY, ['name', 'source'], keep='first')
+            self.counts["nodes_inserted"] += len(inserts)
+            self.counts["nodes_updated"] += len(updates)
+            self.counts["nodes_deleted"] += len(deletes)
+            upserts = pd.concat([inserts, updates], ignore_index=True)
+            if not dry_run and not upserts.empty:
+                self.loader._load_nodes_batch(upserts.to_dict('records'))
+            if not deletes.empty:
+                node_deletes.append(deletes)
+        return node_deletes
+
+    def _apply_relationships(self, work_dir, dry_run):
+        """Delete removed edges and upsert new/changed edges per partition."""
+        for part in tqdm(range(self.partitions), desc="Diffing relationships"):
+            old = _read_frames(os.path.join(work_dir, f"old_edges_{part}.pkl"))
+            new = _read_frames(os.path.join(work_dir, f"new_edges_{part}.pkl"))
+            if old is None and new is None:
+                continue
+            inserts, deletes, updates = diff_frames(old, new, EDGE_KEY, ['display_relation'], keep='last')
+            self.counts["relationships_inserted"] += len(inserts)
+            self.counts["relationships_updated"] += len(updates)
+            self.counts["relationships_deleted"] += len(deletes)
+            if dry_run:
+                continue
+
+            for (x_type, relation, y_type), group in deletes.groupby(['x_type', 'relation', 'y_type'], sort=False, observed=True):
+                query = _relationship_delete_query(
+                    PrimeKGLoader._normalize_label(x_type),
+                    PrimeKGLoader._normalize_relation_type(relation),
+                    PrimeKGLoader._normalize_label(y_type),
+                )
+                rows = group.rename(columns={'x_id': 'source_id', 'y_id': 'target_id'})[['source_id', 'target_id']]
+                self._write_batches(query, rows.to_dict('records'))
+
+            upserts = pd.concat([inserts, updates], ignore_index=True)
+            if not upserts.empty:
+                self.loader._load_relationships_batch(upserts)
+
+    def _delete_nodes(self, node_deletes):
+        """Detach-delete nodes that are no longer in the new release."""
+        for deletes in node_deletes:
+            for node_type, group in deletes.groupby('type', sort=False, observed=True):
+                query = _node_delete_query(PrimeKGLoader._normalize_label(node_type))
+                self._write_batches(query, group[['id']].to_dict('records'))
+
+    def _write_batches(self, query, records):
+        result = self.loader._write_rows(query, records)
+        if not result.get("success", False):
+            logger.error(f"Failed to apply {len(records) - result.get('rows', 0)} deletes")
+            logger.error(f"Error: {result.get('error', 'Unknown error')}")
+
+    def diff_load(self, old_file, new_file, version, dry_run=False):
+        """
+        Apply the changes between two PrimeKG releases to Neo4j.
+
+        Nodes are upserted first, then relationships are deleted and upserted,
+        and finally removed nodes are detach-deleted, so every relationship
+        write finds its endpoints.
+
+        Args:
+            old_file (str): CSV of the release currently loaded in Neo4j
+            new_file (str): CSV of the release to apply
+            version (str): Version recorded on the ``PrimeKGRelease`` node
+            dry_run (bool): Only compute the change counts
+
+        Returns:
+            dict: Inserted/updated/deleted counts for nodes and relationships
+        """
+        logger.info(f"Computing delta {old_file} -> {new_file} ({self.partitions} partitions)")
+        with tempfile.TemporaryDirectory(dir=self.work_dir) as work_dir:
+            self._partition_release(old_file, work_dir, 'old')
+            new_types = self._partition_release(new_file, work_dir, 'new')
+
+            if not dry_run:
+                self.loader.create_constraints(new_types)
+
+            node_deletes = self._apply_nodes(work_dir, dry_run)
+            self._apply_relationships(work_dir, dry_run)
+            if not dry_run:
+                self._delete_nodes(node_deletes)
+
+        for name, count in self.counts.items():
+            logger.info(f"  {name}: {count:,}")
+
+        if self.loader.failed_writes:
+            logger.warning(f"Not recording release {version}: {self.loader.failed_writes} writes failed")
+        elif not dry_run:
+            self.loader.record_release(version, new_file, self.counts)
+
+        return dict(self.counts)
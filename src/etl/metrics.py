@@ -0,0 +1,149 @@
+"""
+Throughput instrumentation for PrimeKG loads.
+"""
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from src.db.neo4j_connector import WRITE_COUNTERS
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class LoadMetrics:
+    """
+    Collects phase timings, transaction latencies and Neo4j counters of a load run.
+
+    Phases are timed in wall-clock seconds (``parse``: reading chunks,
+    ``dedup``: node extraction, ``write``: Neo4j writes). Every committed
+    write transaction records its latency (including driver retries) and
+    counters; recording is thread-safe so parallel relationship writers can
+    share one instance.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.started_at = datetime.now(timezone.utc)
+        self.phase_seconds = {}
+        self.latencies = []
+        self.failed_transactions = 0
+        self.retries = 0
+        self.counters = dict.fromkeys(WRITE_COUNTERS, 0)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Time a block of work as part of a phase.
+
+        Args:
+            name (str): Phase name
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.phase_seconds[name] = self.phase_seconds.get(name, 0.0) + elapsed
+
+    def timed_chunks(self, chunks):
+        """
+        Wrap a chunk iterator so the time spent producing chunks counts as ``parse``.
+
+        Args:
+            chunks (iterable): Chunk iterator
+
+        Yields:
+            pd.DataFrame: The same chunks
+        """
+        iterator = iter(chunks)
+        while True:
+            with self.phase("parse"):
+                chunk = next(iterator, None)
+            if chunk is None:
+                return
+            yield chunk
+
+    def record_write(self, result):
+        """
+        Record the transactions of one ``execute_write_batches`` call.
+
+        Args:
+            result (dict): Result of ``Neo4jConnector.execute_write_batches``
+        """
+        with self._lock:
+            self.latencies.extend(result.get("transaction_seconds", []))
+            self.retries += result.get("retries", 0)
+            for key in WRITE_COUNTERS:
+                self.counters[key] += result.get(key, 0)
+            if not result.get("success", False):
+                self.failed_transactions += 1
+
+    def report(self, rows, **extra):
+        """
+        Build the run report.
+
+        Args:
+            rows (int): Input rows loaded
+            **extra: Additional top-level fields (configuration, per-label stats, ...)
+
+        Returns:
+            dict: JSON-serializable report
+        """
+        elapsed = time.perf_counter() - self.started
+        latencies_ms = np.array(self.latencies) * 1000.0
+        transactions = len(self.latencies)
+        report = {
+            "started_at": self.started_at.isoformat(),
+            "elapsed_seconds": round(elapsed, 3),
+            "phase_seconds": {name: round(seconds, 3) for name, seconds in self.phase_seconds.items()},
+            "rows": rows,
+            "rows_per_second": round(rows / elapsed, 1) if elapsed else 0.0,
+            "transactions": transactions,
+            "transactions_per_second": round(transactions / elapsed, 1) if elapsed else 0.0,
+            "transaction_latency_ms": {
+                "p50": round(float(np.percentile(latencies_ms, 50)), 3) if transactions else None,
+                "p99": round(float(np.percentile(latencies_ms, 99)), 3) if transactions else None,
+                "max": round(float(latencies_ms.max()), 3) if transactions else None,
+            },
+            "failed_transactions": self.failed_transactions,
+            "retries": self.retries,
+            "neo4j_counters": dict(self.counters),
+        }
+        report.update(extra)
+        return report
+
+    def write_report(self, path, rows, **extra):
+        """
+        Write the run report as JSON.
+
+        Args:
+            path (str): Output path
+            rows (int): Input rows loaded
+            **extra: Additional top-level fields
+
+        Returns:
+            dict: The written report
+        """
+        report = self.report(rows, **extra)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2, default=str)
+        logger.info(
+            f"Run report written to {path}: {report['rows_per_second']:,} rows/s, "
+            f"{report['transactions_per_second']:,} tx/s, p99 {report['transaction_latency_ms']['p99']} ms"
+        )
+        return report
@@ -4,36 +4,230 @@ ETL module for loading PrimeKG data into Neo4j.
 import os
 import sys
 import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import numpy as np
 import pandas as pd
 from tqdm import tqdm
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from config.config import DATA_DIR
-from src.db.neo4j_connector import get_connector
+from src.db.neo4j_connector import WRITE_COUNTERS, get_connector
+from src.enrichment.queries import DISEASE_FULLTEXT_INDEX, DRUG_FULLTEXT_INDEX
+from src.etl.checkpoint import LoadCheckpoint
+from src.etl.metrics import LoadMetrics
+from src.utils.columnar import advance_progress, distinct_values, iter_edge_batches, read_schema
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Labels whose nodes also store ``name_lower``, read by the name-matching queries
+# instead of lowercasing every name (see src/enrichment/queries.py)
+NAME_INDEXED_LABELS = ('Disease', 'Drug')
+
+# Full-text indexes behind the opt-in index-backed name matching
+# (see src/enrichment/queries.py)
+NAME_INDEXES = [
+    f"CREATE FULLTEXT INDEX {DISEASE_FULLTEXT_INDEX} IF NOT EXISTS "
+    "FOR (n:Disease) ON EACH [n.name, n.display_name, n.label]",
+    f"CREATE FULLTEXT INDEX {DRUG_FULLTEXT_INDEX} IF NOT EXISTS "
+    "FOR (n:Drug) ON EACH [n.name, n.display_name, n.label]",
+]
+
+
+# Version stamp of the loaded graph; enrichment caches key their entries on it
+RELEASE_METADATA_QUERY = """
+MERGE (m:PrimeKGRelease {key: 'primekg'})
+SET m.version = $version,
+    m.source_file = $source_file,
+    m.applied_at = datetime(),
+    m.counts = $counts
+"""
+
+
+def _node_merge_query(node_label):
+    """
+    Build the batched node MERGE query for a single label.
+
+    Args:
+        node_label (str): Normalized Neo4j label
+
+    Returns:
+        str: Cypher query expecting a ``$rows`` list parameter
+    """
+    query = f"""
+    UNWIND $rows AS row
+    MERGE (n:{node_label} {{id: row.id}})
+    SET n.name = row.name, n.type = row.type, n.source = row.source
+    """
+    if node_label in NAME_INDEXED_LABELS:
+        query += "SET n.name_lower = row.name_lower\n"
+    return query
+
+
+def name_fields(name):
+    """
+    Get the normalized name properties of a Disease or Drug node.
+
+    Args:
+        name: Node name (may be missing)
+
+    Returns:
+        dict: ``name_lower``
+    """
+    if not isinstance(name, str) or not name:
+        return {'name_lower': None}
+    return {'name_lower': name.lower()}
+
+
+def _relationship_merge_query(source_label, relation_type, target_label):
+    """
+    Build the batched relationship MERGE query for one (source, relation, target) partition.
+
+    The query text only depends on the partition key, so Neo4j can reuse the
+    cached plan for every batch of the same partition.
+
+    Args:
+        source_label (str): Normalized label of the source nodes
+        relation_type (str): Normalized relationship type
+        target_label (str): Normalized label of the target nodes
+
+    Returns:
+        str: Cypher query expecting a ``$rows`` list parameter
+    """
+    return f"""
+    UNWIND $rows AS row
+    MATCH (source:{source_label} {{id: row.source_id}})
+    MATCH (target:{target_label} {{id: row.target_id}})
+    MERGE (source)-[r:{relation_type}]->(target)
+    SET r.display_relation = row.display_relation
+    """
+
+
+def _bucket_cells(bucket_count):
+    """
+    Number of bucket cells: unordered pairs of buckets, including each bucket with itself.
+
+    Args:
+        bucket_count (int): Number of buckets
+
+    Returns:
+        int: Number of cells
+    """
+    return bucket_count * (bucket_count + 1) // 2
+
+
+class NodeKeySet:
+    """
+    Compact set of node keys already extracted from the edges file.
+
+    Keys are 64-bit hashes of ``(type, id)`` kept in a sorted NumPy array, so
+    memory stays at 8 bytes per unique node instead of one Python string each.
+    Newly added keys go to a small pending array that is merged into the main
+    array once it grows past a fraction of it, keeping inserts amortized.
+    """
+
+    def __init__(self, keys=None):
+        self._keys = np.unique(np.asarray(keys, dtype=np.uint64)) if keys is not None else np.empty(0, dtype=np.uint64)
+        self._pending = np.empty(0, dtype=np.uint64)
+        self._added = []
+
+    def __len__(self):
+        return len(self._keys) + len(self._pending)
+
+    @staticmethod
+    def hash_nodes(node_types, node_ids):
+        """
+        Hash node types and ids into 64-bit keys.
+
+        Args:
+            node_types (pd.Series): Node types
+            node_ids (pd.Series): Node ids as strings
+
+        Returns:
+            np.ndarray: uint64 key per node
+        """
+        frame = pd.DataFrame({'type': node_types.to_numpy(), 'id': node_ids.to_numpy()})
+        return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+    def _contains(self, keys, sorted_keys):
+        if not len(sorted_keys):
+            return np.zeros(len(keys), dtype=bool)
+        positions = np.searchsorted(sorted_keys, keys)
+        positions[positions == len(sorted_keys)] = 0
+        return sorted_keys[positions] == keys
+
+    def add_new(self, keys):
+        """
+        Add keys to the set and report which ones were not present before.
+
+        Args:
+            keys (np.ndarray): Unique uint64 keys
+
+        Returns:
+            np.ndarray: Boolean mask of keys that were new
+        """
+        new_mask = ~(self._contains(keys, self._keys) | self._contains(keys, self._pending))
+        if new_mask.any():
+            self._added.append(keys[new_mask])
+            self._pending = np.union1d(self._pending, keys[new_mask])
+            if len(self._pending) * 8 > len(self._keys):
+                self._keys = np.union1d(self._keys, self._pending)
+                self._pending = np.empty(0, dtype=np.uint64)
+        return new_mask
+
+    def take_added(self):
+        """
+        Return the keys added since the previous call.
+
+        Returns:
+            np.ndarray: uint64 keys
+        """
+        added = np.concatenate(self._added) if self._added else np.empty(0, dtype=np.uint64)
+        self._added = []
+        return added
+
+
+# Columns needed to discover node/relation types and sources
+ANALYSIS_COLUMNS = ['relation', 'x_type', 'x_source', 'y_type', 'y_source']
+
+
 class PrimeKGLoader:
     """
     Loader class for importing PrimeKG data into Neo4j.
     """
 
-    def __init__(self, batch_size=1000, max_rows=None):
+    def __init__(self, batch_size=1000, max_rows=None, workers=1, max_retries=5, commit_size=None):
         """
         Initialize the PrimeKG loader.
 
         Args:
             batch_size (int): Number of records to process in a batch
             max_rows (int): Maximum number of rows to process (None = all rows)
+            workers (int): Number of concurrent relationship writers
+            max_retries (int): Resubmissions of uncommitted batches after the driver's own retries ran out
+            commit_size (int): Rows per transaction (None = one ``batch_size`` batch per transaction)
         """
         self.db = get_connector()
         self.batch_size = batch_size
+        self.commit_size = commit_size
         self.max_rows = max_rows
+        self.workers = max(1, workers)
+        # Set by _iter_chunks once it has read the last chunk of the file
+        self._input_exhausted = False
+        self.max_retries = max_retries
+        self.checkpoint = None
+        self.metrics = LoadMetrics()
+        self._stats_lock = threading.Lock()
         self.node_types = set()
         self.relation_types = set()
+        self.node_label_stats = {}
+        self.relation_type_stats = {}
+        # Writes that still failed after all retries; a chunk with one is not checkpointed
+        self.failed_writes = 0
 
     def analyze_data(self, csv_file):
         """
@@ -55,43 +249,37 @@ class PrimeKGLoader:
         node_sources = set()
         total_rows = 0
 
-        # Get file size for progress bar
-        file_size = os.path.getsize(csv_file)
-
-        # Create a progress bar
-        with tqdm(total=file_size, unit='B', unit_scale=True, desc="Analyzing data") as pbar:
-            for chunk in pd.read_csv(csv_file, chunksize=self.batch_size):
-                # Check if we've reached max_rows limit
-                if self.max_rows and total_rows >= self.max_rows:
-                    logger.info(f"Reached max_rows limit ({self.max_rows:,}) during analysis, stopping")
-                    break
-
-                # Limit chunk size if we're near max_rows
-                remaining_rows = self.max_rows - total_rows if self.max_rows else len(chunk)
-                if self.max_rows and remaining_rows < len(chunk):
-                    chunk = chunk.head(remaining_rows)
-
-                total_rows += len(chunk)
+        # With a fresh Parquet cache the full-file analysis is a metadata read
+        schema = None if self.max_rows else read_schema(csv_file)
+        if schema is not None:
+            node_types.update(distinct_values(csv_file, 'x_type'))
+            node_types.update(distinct_values(csv_file, 'y_type'))
+            relation_types.update(distinct_values(csv_file, 'relation'))
+            node_sources.update(distinct_values(csv_file, 'x_source'))
+            node_sources.update(distinct_values(csv_file, 'y_source'))
+            total_rows = schema["total_rows"]
+        else:
+            # Get file size for progress bar
+            file_size = os.path.getsize(csv_file)
 
-                # Extract unique node types
-                node_types.update(chunk['x_type'].unique())
-                node_types.update(chunk['y_type'].unique())
+            # Create a progress bar
+            with tqdm(total=file_size, unit='B', unit_scale=True, desc="Analyzing data") as pbar:
+                for chunk in self._iter_chunks(csv_file, columns=ANALYSIS_COLUMNS):
+                    total_rows += len(chunk)
 
-                # Extract unique relation types
-                relation_types.update(chunk['relation'].unique())
+                    # Extract unique node types
+                    node_types.update(chunk['x_type'].unique())
+                    node_types.update(chunk['y_type'].unique())
 
-                # Extract unique node sources
-                node_sources.update(chunk['x_source'].unique())
-                node_sources.update(chunk['y_source'].unique())
+                    # Extract unique relation types
+                    relation_types.update(chunk['relation'].unique())
 
-                # Update progress bar with approximate chunk size (rows * avg bytes per row)
-                chunk_size = len(chunk) * 100  # Approximate bytes per row
-                pbar.update(chunk_size)
-                pbar.set_postfix({"rows": f"{total_rows:,}", "node_types": len(node_types), "rel_types": len(relation_types)})
+                    # Extract unique node sources
+                    node_sources.update(chunk['x_source'].unique())
+                    node_sources.update(chunk['y_source'].unique())
 
-                # Break if we've reached max_rows
-                if self.max_rows and total_rows >= self.max_rows:
-                    break
+                    advance_progress(pbar, chunk)
+                    pbar.set_postfix({"rows": f"{total_rows:,}", "node_types": len(node_types), "rel_types": len(relation_types)})
 
         # Store the results
         self.node_types = node_types
@@ -114,7 +302,8 @@ class PrimeKGLoader:
             "total_rows": total_rows
         }
 
-    def _normalize_label(self, label):
+    @staticmethod
+    def _normalize_label(label):
         """
         Normalize a label for Neo4j (remove spaces, slashes, etc.)
 
@@ -133,18 +322,37 @@ class PrimeKGLoader:
 
         return normalized
 
-    def create_constraints(self):
+    @staticmethod
+    def _normalize_relation_type(relation):
+        """
+        Normalize a PrimeKG relation name into a Neo4j relationship type.
+
+        Args:
+            relation (str): Original relation name
+
+        Returns:
+            str: Normalized relationship type
+        """
+        return relation.replace(' ', '_').replace('-', '_').upper()
+
+    def create_constraints(self, node_types=None):
         """
-        Create necessary constraints in Neo4j for efficient data loading.
+        Create necessary constraints in Neo4j for efficient data loading,
+        plus the name indexes used by the enrichment queries.
+
+        Args:
+            node_types (iterable): Node types to constrain (None = discovered node types)
         """
         logger.info("Creating constraints in Neo4j...")
 
         # Create constraints for node uniqueness based on discovered node types
         constraints = []
+        if node_types is None:
+            node_types = self.node_types
 
         # If we've analyzed the data, use the discovered node types
-        if self.node_types:
-            for node_type in self.node_types:
+        if node_types:
+            for node_type in node_types:
                 neo4j_label = self._normalize_label(node_type)
                 constraints.append(f"CREATE CONSTRAINT IF NOT EXISTS FOR (n:{neo4j_label}) REQUIRE n.id IS UNIQUE")
         else:
@@ -162,6 +370,12 @@ class PrimeKGLoader:
                 logger.error(f"Failed to create constraint: {constraint}")
                 logger.error(f"Error: {result.get('error', 'Unknown error')}")
 
+        for index in NAME_INDEXES:
+            result = self.db.execute_write_query(index)
+            if not result.get("success", False):
+                logger.error(f"Failed to create index: {index}")
+                logger.error(f"Error: {result.get('error', 'Unknown error')}")
+
         logger.info("Constraints created successfully")
 
     def extract_and_load_nodes(self, edges_file):
@@ -189,11 +403,20 @@ class PrimeKGLoader:
         # Create constraints
         self.create_constraints()
 
+        # Skip rows already committed by an interrupted run
+        state = self._phase_state("nodes")
+        if state["completed"]:
+            logger.info("Node loading already completed according to checkpoint, skipping")
+            return state["loaded"]
+        if state["rows_committed"]:
+            logger.info(f"Resuming node loading after row {state['rows_committed']:,}")
+            self.node_label_stats = state.get("node_label_stats", {})
+
         # Track unique nodes to avoid duplicates
-        processed_nodes = set()
-        total_nodes = 0
+        seen_nodes = NodeKeySet(self.checkpoint.load_keys("nodes") if self.checkpoint else None)
+        total_nodes = state["loaded"]
         chunk_count = 0
-        total_rows_processed = 0
+        total_rows_processed = state["rows_committed"]
 
         # Get file size for progress bar
         file_size = os.path.getsize(edges_file)
@@ -202,84 +425,85 @@ class PrimeKGLoader:
         pbar = tqdm(total=file_size, unit='B', unit_scale=True, desc="Extracting nodes")
 
         # Process the file in chunks
-        for chunk in pd.read_csv(edges_file, chunksize=self.batch_size):
-            # Check if we've reached max_rows limit
-            if self.max_rows and total_rows_processed >= self.max_rows:
-                logger.info(f"Reached max_rows limit ({self.max_rows:,}), stopping node extraction")
+        stopped = False
+        for chunk in self._iter_chunks(edges_file, start_row=total_rows_processed):
+            failed_writes = self.failed_writes
+            # Extract source (x) and target (y) nodes not seen in earlier chunks
+            with self.metrics.phase("dedup"):
+                chunk_nodes = self._extract_chunk_nodes(chunk, seen_nodes)
+
+            # Load source and target nodes together, one transaction per label
+            if chunk_nodes:
+                with self.metrics.phase("write"):
+                    total_nodes += self._load_nodes_batch(chunk_nodes)
+
+            # Neither the rows nor their node keys are checkpointed, so a resumed run rewrites them
+            if self.failed_writes > failed_writes:
+                self._stop_phase("node loading", total_rows_processed, len(chunk))
+                stopped = True
                 break
 
-            # Limit chunk size if we're near max_rows
-            remaining_rows = self.max_rows - total_rows_processed if self.max_rows else len(chunk)
-            if self.max_rows and remaining_rows < len(chunk):
-                chunk = chunk.head(remaining_rows)
-            # Extract source nodes (x)
-            source_nodes = []
-            for _, row in chunk.iterrows():
-                node_id = f"{row['x_type']}_{row['x_id']}"
-                if node_id not in processed_nodes:
-                    processed_nodes.add(node_id)
-                    # Always store IDs as strings to avoid integer overflow issues
-                    node_id_value = str(row['x_id'])
-
-                    source_nodes.append({
-                        'id': node_id_value,
-                        'name': row['x_name'],
-                        'type': row['x_type'],
-                        'source': row['x_source']
-                    })
-
-            # Extract target nodes (y)
-            target_nodes = []
-            for _, row in chunk.iterrows():
-                node_id = f"{row['y_type']}_{row['y_id']}"
-                if node_id not in processed_nodes:
-                    processed_nodes.add(node_id)
-                    # Always store IDs as strings to avoid integer overflow issues
-                    node_id_value = str(row['y_id'])
-
-                    target_nodes.append({
-                        'id': node_id_value,
-                        'name': row['y_name'],
-                        'type': row['y_type'],
-                        'source': row['y_source']
-                    })
-
-            # Load source nodes
-            if source_nodes:
-                new_nodes = self._load_nodes_batch(source_nodes)
-                total_nodes += new_nodes
-                pbar.update(new_nodes)
-
-            # Load target nodes
-            if target_nodes:
-                new_nodes = self._load_nodes_batch(target_nodes)
-                total_nodes += new_nodes
-                pbar.update(new_nodes)
-
             # Update progress information
             chunk_count += 1
             total_rows_processed += len(chunk)
+            self._commit_checkpoint("nodes", total_rows_processed, total_nodes, seen_nodes=seen_nodes,
+                                    node_label_stats=self.node_label_stats)
 
-            # Update progress bar with approximate chunk size (rows * avg bytes per row)
-            chunk_size = len(chunk) * 100  # Approximate bytes per row
-            pbar.update(chunk_size)
+            advance_progress(pbar, chunk)
 
             # Update progress bar description with stats
-            pbar.set_postfix({"rows": f"{total_rows_processed:,}", "nodes": f"{total_nodes:,}", "unique": len(processed_nodes)})
+            pbar.set_postfix({"rows": f"{total_rows_processed:,}", "nodes": f"{total_nodes:,}", "unique": len(seen_nodes)})
 
-            # Break if we've reached max_rows
-            if self.max_rows and total_rows_processed >= self.max_rows:
-                break
+        if not stopped:
+            self._complete_checkpoint("nodes")
 
         # Close progress bar
         pbar.close()
+        for node_label, stats in sorted(self.node_label_stats.items()):
+            logger.info(f"  {node_label}: {stats['created']:,} created, {stats['updated']:,} updated")
         logger.info(f"Loaded {total_nodes:,} unique nodes into Neo4j from {total_rows_processed:,} rows")
         return total_nodes
 
+    def _extract_chunk_nodes(self, chunk, seen_nodes):
+        """
+        Extract the source and target nodes of a chunk that have not been seen yet.
+
+        The x and y columns are stacked, deduplicated on ``(type, id)`` within
+        the chunk and filtered against ``seen_nodes`` without iterating rows.
+
+        Args:
+            chunk (pd.DataFrame): Rows of the PrimeKG CSV
+            seen_nodes (NodeKeySet): Keys of nodes already extracted; updated in place
+
+        Returns:
+            list: Node dictionaries ready for ``_load_nodes_batch``, source nodes first
+        """
+        # Always store IDs as strings to avoid integer overflow issues
+        stacked = pd.concat([
+            pd.DataFrame({
+                'id': chunk[f'{side}_id'].astype(str).to_numpy(),
+                'name': chunk[f'{side}_name'].to_numpy(),
+                'type': chunk[f'{side}_type'].to_numpy(),
+                'source': chunk[f'{side}_source'].to_numpy(),
+            })
+            for side in ('x', 'y')
+        ], ignore_index=True)
+        stacked = stacked.drop_duplicates(subset=['type', 'id'])
+
+        keys = NodeKeySet.hash_nodes(stacked['type'], stacked['id'])
+        new_nodes = stacked[seen_nodes.add_new(keys)]
+        return new_nodes.to_dict('records')
+
     def _load_nodes_batch(self, nodes):
         """
         Load a batch of nodes into Neo4j.
 
+        Nodes are grouped by their normalized label and each group is written
+        with ``UNWIND $rows ... MERGE`` batches of at most ``batch_size`` rows,
+        see ``_write_rows``. Disease and Drug nodes also get ``name_lower``.
+        Created/updated counts are accumulated per label
+        in ``self.node_label_stats``.
+
         Args:
             nodes (list): List of node dictionaries
 
@@ -288,27 +512,28 @@ class PrimeKGLoader:
         """
         total_loaded = 0
 
+        # Group nodes by Neo4j label so each label gets one query text
+        nodes_by_label = {}
         for node in nodes:
-            # Convert node type to a valid Neo4j label
             node_label = self._normalize_label(node['type'])
+            nodes_by_label.setdefault(node_label, []).append(node)
 
-            # Create a Cypher query to create the node
-            query = f"""
-            MERGE (n:{node_label} {{id: $id}})
-            SET n.name = $name, n.type = $type, n.source = $source
-            """
-
-            result = self.db.execute_write_query(query, {
-                'id': node['id'],
-                'name': node['name'],
-                'type': node['type'],
-                'source': node['source']
-            })
+        for node_label, label_nodes in nodes_by_label.items():
+            query = _node_merge_query(node_label)
+            if node_label in NAME_INDEXED_LABELS:
+                label_nodes = [{**node, **name_fields(node.get('name'))} for node in label_nodes]
+            stats = self.node_label_stats.setdefault(node_label, {"created": 0, "updated": 0})
+
+            result = self._write_rows(query, label_nodes)
+            created = result.get("nodes_created", 0)
+            stats["created"] += created
+            stats["updated"] += result.get("rows", 0) - created
+            total_loaded += created
 
-            if result.get("success", False):
-                total_loaded += result.get("nodes_created", 0)
-            else:
-                logger.error(f"Failed to create node: {node['id']}")
+            if not result.get("success", False):
+                failed = len(label_nodes) - result.get("rows", 0)
+                first_id = label_nodes[result["failed_batch"] * self.batch_size]['id']
+                logger.error(f"Failed to create {failed} {node_label} nodes (failed batch starts at id {first_id})")
                 logger.error(f"Error: {result.get('error', 'Unknown error')}")
 
         return total_loaded
@@ -335,9 +560,18 @@ class PrimeKGLoader:
         if not self.relation_types:
             self.analyze_data(edges_file)
 
+        # Skip rows already committed by an interrupted run
+        state = self._phase_state("relationships")
+        if state["completed"]:
+            logger.info("Relationship loading already completed according to checkpoint, skipping")
+            return state["loaded"]
+        if state["rows_committed"]:
+            logger.info(f"Resuming relationship loading after row {state['rows_committed']:,}")
+            self.relation_type_stats = state.get("relation_type_stats", {})
+
         # Track progress
-        total_relationships = 0
-        processed_rows = 0
+        total_relationships = state["loaded"]
+        processed_rows = state["rows_committed"]
         chunk_count = 0
 
         # Get file size for progress bar
@@ -347,86 +581,485 @@ class PrimeKGLoader:
         pbar = tqdm(total=file_size, unit='B', unit_scale=True, desc="Loading relationships")
 
         # Process the file in chunks
-        for chunk in pd.read_csv(edges_file, chunksize=self.batch_size):
-            # Check if we've reached max_rows limit
-            if self.max_rows and processed_rows >= self.max_rows:
-                logger.info(f"Reached max_rows limit ({self.max_rows:,}), stopping relationship loading")
+        stopped = False
+        for chunk in self._iter_chunks(edges_file, start_row=processed_rows,
+                                       chunk_rows=self._relationship_chunk_rows()):
+            failed_writes = self.failed_writes
+            # Write the chunk partitioned by (x_type, relation, y_type)
+            with self.metrics.phase("write"):
+                chunk_relationships = self._load_relationships_batch(chunk)
+            total_relationships += chunk_relationships
+            if self.failed_writes > failed_writes:
+                self._stop_phase("relationship loading", processed_rows, len(chunk))
+                stopped = True
                 break
 
-            # Limit chunk size if we're near max_rows
-            remaining_rows = self.max_rows - processed_rows if self.max_rows else len(chunk)
-            if self.max_rows and remaining_rows < len(chunk):
-                chunk = chunk.head(remaining_rows)
-            # Process each relationship in the chunk and collect results
-            chunk_results = []
-            for _, row in chunk.iterrows():
-                # Normalize the relationship type for Neo4j
-                relation_type = row['relation'].replace(' ', '_').replace('-', '_').upper()
-
-                # Create source and target node labels
-                source_label = self._normalize_label(row['x_type'])
-                target_label = self._normalize_label(row['y_type'])
-
-                # Create a Cypher query to create the relationship
-                query = f"""
-                MATCH (source:{source_label} {{id: $source_id}})
-                MATCH (target:{target_label} {{id: $target_id}})
-                MERGE (source)-[r:{relation_type}]->(target)
-                SET r.display_relation = $display_relation
-                """
-
-                # Always store IDs as strings to avoid integer overflow issues
-                source_id_value = str(row['x_id'])
-                target_id_value = str(row['y_id'])
-
-                result = self.db.execute_write_query(query, {
-                    'source_id': source_id_value,
-                    'target_id': target_id_value,
-                    'display_relation': row['display_relation']
-                })
-
-                # Add result to list for later processing
-                chunk_results.append(result)
-
-                if not result.get("success", False):
-                    logger.error(f"Failed to create relationship: {row['x_id']} -> {row['y_id']}")
-                    logger.error(f"Error: {result.get('error', 'Unknown error')}")
-
             # Update progress
             processed_rows += len(chunk)
             chunk_count += 1
+            self._commit_checkpoint("relationships", processed_rows, total_relationships,
+                                    relation_type_stats=self.relation_type_stats)
 
-            # Count new relationships in this chunk
-            chunk_relationships = 0
-            for result in chunk_results:
-                if result.get("success", False):
-                    new_rels = result.get("relationships_created", 0)
-                    chunk_relationships += new_rels
-                    total_relationships += new_rels
-
-            # Update progress bar with approximate chunk size (rows * avg bytes per row)
-            chunk_size = len(chunk) * 100  # Approximate bytes per row
-            pbar.update(chunk_size)
+            advance_progress(pbar, chunk)
 
             # Update progress bar with stats
             pbar.set_postfix({"rows": f"{processed_rows:,}", "rels": f"{total_relationships:,}", "chunks": chunk_count})
 
-            # Break if we've reached max_rows
-            if self.max_rows and processed_rows >= self.max_rows:
-                break
+        if not stopped:
+            self._complete_checkpoint("relationships")
 
         # Close progress bar
         pbar.close()
+        for relation_type, stats in sorted(self.relation_type_stats.items()):
+            rate = stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0
+            logger.info(f"  {relation_type}: {stats['rows']:,} rows, {stats['created']:,} created, {rate:,.0f} rows/s")
         logger.info(f"Loaded {total_relationships:,} relationships into Neo4j from {processed_rows:,} rows")
         return total_relationships
 
-    def load_primekg_data(self, edges_file=None, max_rows=None):
+    def _write_rows(self, query, records):
+        """
+        Write records as ``$rows`` batches of ``batch_size`` in one session.
+
+        Batches are committed every ``commit_size`` rows through
+        ``Neo4jConnector.execute_write_batches``, whose transaction functions are
+        retried by the driver. If transient failures outlast the driver's retry
+        time, the uncommitted batches are resubmitted with exponential backoff.
+        Transactions are recorded in ``self.metrics``.
+
+        Args:
+            query (str): Cypher query taking a ``$rows`` list
+            records (list): Row dictionaries
+
+        Returns:
+            dict: Counters and ``rows`` summed over all committed batches; ``success`` and ``error``
+            of the last attempt; on failure ``failed_batch``, the index of the first batch not committed
+        """
+        batches = [{'rows': records[start:start + self.batch_size]}
+                   for start in range(0, len(records), self.batch_size)]
+        totals = {"rows": 0, "success": True}
+        attempt = 0
+        committed_batches = 0
+        while batches:
+            result = self.db.execute_write_batches(query, batches, commit_size=self.commit_size)
+            self.metrics.record_write(result)
+            for key in WRITE_COUNTERS + ["rows"]:
+                totals[key] = totals.get(key, 0) + result.get(key, 0)
+            totals["success"] = result.get("success", False)
+            totals["error"] = result.get("error")
+            if not totals["success"]:
+                totals["failed_batch"] = committed_batches + result.get("batches_committed", 0)
+            if totals["success"] or not result.get("transient", False) or attempt >= self.max_retries:
+                break
+            committed_batches += result.get("batches_committed", 0)
+            batches = batches[result.get("batches_committed", 0):]
+            delay = 0.1 * (2 ** attempt)
+            attempt += 1
+            logger.warning(f"Transient write failure, resubmitting {len(batches)} batches "
+                           f"({attempt}/{self.max_retries}) in {delay:.1f}s")
+            time.sleep(delay)
+        if not totals["success"]:
+            with self._stats_lock:
+                self.failed_writes += 1
+        return totals
+
+    def _load_relationships_batch(self, chunk):
+        """
+        Load a chunk of PrimeKG edges into Neo4j.
+
+        The chunk is partitioned by ``(x_type, relation, y_type)`` and each
+        partition is written with ``UNWIND`` batches of ``batch_size`` rows.
+        Rows, created relationships and write time are accumulated per
+        relationship type in ``self.relation_type_stats``. With more than one
+        worker the writes are spread over a thread pool, see
+        ``_load_relationships_parallel``.
+
+        Args:
+            chunk (pd.DataFrame): Rows of the PrimeKG CSV
+
+        Returns:
+            int: Number of relationships created
+        """
+        # Always store IDs as strings to avoid integer overflow issues
+        edges = pd.DataFrame({
+            'x_type': chunk['x_type'],
+            'relation': chunk['relation'],
+            'y_type': chunk['y_type'],
+            'source_id': chunk['x_id'].astype(str),
+            'target_id': chunk['y_id'].astype(str),
+            'display_relation': chunk['display_relation'],
+        })
+
+        partitions = self._relationship_partitions(edges)
+        if self.workers > 1:
+            return self._load_relationships_parallel(edges, partitions)
+        return self._write_relationship_partitions(
+            [(key, records) for key, (records, _) in partitions.items()]
+        )
+
+    def _relationship_partitions(self, edges):
+        """
+        Split edges by ``(x_type, relation, y_type)`` into rows of the write query.
+
+        Args:
+            edges (pd.DataFrame): Edges with string ``source_id``/``target_id``
+
+        Returns:
+            dict: ``(x_type, relation, y_type)`` -> (row dicts, positions of the rows in ``edges``)
+        """
+        partitions = {}
+        for key, positions in edges.groupby(
+                ['x_type', 'relation', 'y_type'], sort=False, observed=True).indices.items():
+            records = edges[['source_id', 'target_id', 'display_relation']].iloc[positions].to_dict('records')
+            partitions[key] = (records, positions)
+        return partitions
+
+    def _write_relationship_partitions(self, partitions):
+        """
+        Write partitions of edges, one session per partition.
+
+        Args:
+            partitions (list): ``((x_type, relation, y_type), row dicts)`` pairs
+
+        Returns:
+            int: Number of relationships created
+        """
+        total_created = 0
+
+        for (x_type, relation, y_type), records in partitions:
+            relation_type = self._normalize_relation_type(relation)
+            query = _relationship_merge_query(
+                self._normalize_label(x_type), relation_type, self._normalize_label(y_type)
+            )
+
+            started = time.perf_counter()
+            result = self._write_rows(query, records)
+            elapsed = time.perf_counter() - started
+
+            created = result.get("relationships_created", 0)
+            total_created += created
+            with self._stats_lock:
+                stats = self.relation_type_stats.setdefault(relation_type, {"rows": 0, "created": 0, "seconds": 0.0})
+                stats["seconds"] += elapsed
+                stats["rows"] += result.get("rows", 0)
+                stats["created"] += created
+
+            if not result.get("success", False):
+                failed = len(records) - result.get("rows", 0)
+                first = records[result["failed_batch"] * self.batch_size]
+                logger.error(f"Failed to create {failed} {relation_type} relationships ({x_type} -> {y_type}, "
+                             f"failed batch starts at {first['source_id']} -> {first['target_id']})")
+                logger.error(f"Error: {result.get('error', 'Unknown error')}")
+
+        return total_created
+
+    def _load_relationships_parallel(self, edges, partitions):
+        """
+        Write edges with ``workers`` concurrent writers without lock conflicts.
+
+        Every endpoint id is hashed into one of ``2 * workers`` buckets and each
+        edge is assigned to the cell of its (unordered) endpoint bucket pair.
+        A cell is started as soon as a writer is idle and neither of its
+        buckets is held by a running cell, largest cells first, so no two
+        concurrent transactions can touch the same node and no writer waits
+        for a whole round to finish. The rows of each partition are built
+        once and only split between the cells.
+
+        Args:
+            edges (pd.DataFrame): Edges with string ``source_id``/``target_id``
+            partitions (dict): Output of ``_relationship_partitions(edges)``
+
+        Returns:
+            int: Number of relationships created
+        """
+        bucket_count = 2 * self.workers
+        source_buckets = pd.util.hash_array(edges['source_id'].to_numpy()) % bucket_count
+        target_buckets = pd.util.hash_array(edges['target_id'].to_numpy()) % bucket_count
+        low = np.minimum(source_buckets, target_buckets)
+        high = np.maximum(source_buckets, target_buckets)
+        # Cell of every edge as a single index into the bucket_count x bucket_count grid
+        edge_cells = low * bucket_count + high
+
+        cells = {}
+        for key, (records, positions) in partitions.items():
+            partition_cells = edge_cells[positions]
+            order = np.argsort(partition_cells, kind='stable')
+            cell_ids, starts = np.unique(partition_cells[order], return_index=True)
+            for cell_id, rows in zip(cell_ids, np.split(order, starts[1:])):
+                cell = (int(cell_id) // bucket_count, int(cell_id) % bucket_count)
+                cells.setdefault(cell, []).append((key, [records[i] for i in rows]))
+        sizes = {cell: sum(len(records) for _, records in cell_partitions) for cell, cell_partitions in cells.items()}
+        pending = sorted(cells, key=sizes.get, reverse=True)
+
+        total_created = 0
+        busy = set()
+        futures = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while pending or futures:
+                for cell in list(pending):
+                    if len(futures) >= self.workers:
+                        break
+                    if busy.isdisjoint(cell):
+                        pending.remove(cell)
+                        busy.update(cell)
+                        futures[executor.submit(self._write_relationship_partitions, cells[cell])] = cell
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    busy.difference_update(futures.pop(future))
+                    total_created += future.result()
+        return total_created
+
+    def _relationship_chunk_rows(self):
+        """
+        Rows per chunk of the phases that write relationships.
+
+        With several workers a chunk is spread over the bucket cells of
+        ``_load_relationships_parallel``, so it holds about ``batch_size`` rows
+        per cell; otherwise each cell's transactions would carry only a few rows.
+
+        Returns:
+            int: Rows per chunk
+        """
+        if self.workers == 1:
+            return self.batch_size
+        return self.batch_size * _bucket_cells(2 * self.workers)
+
+    def _iter_chunks(self, csv_file, start_row=0, columns=None, chunk_rows=None):
+        """
+        Iterate over the PrimeKG edges in ``batch_size`` chunks, honouring ``max_rows``.
+
+        Reads the Parquet cache instead of the CSV when it is fresh. Time spent
+        reading counts as the ``parse`` phase. ``self._input_exhausted`` is set
+        once the last chunk of the file has been consumed, whether or not
+        ``max_rows`` was reached with it.
+
+        Args:
+            csv_file (str): Path to the PrimeKG CSV file
+            start_row (int): Number of data rows to skip (already committed)
+            columns (list): Columns to read (None = all columns)
+            chunk_rows (int): Rows per chunk (None = ``batch_size``)
+
+        Yields:
+            pd.DataFrame: Chunks of the edges file
+        """
+        self._input_exhausted = False
+        total_rows = start_row
+        batches = iter_edge_batches(csv_file, chunk_rows or self.batch_size, columns=columns, skip_rows=start_row)
+        for chunk in self.metrics.timed_chunks(batches):
+            if self.max_rows:
+                remaining_rows = self.max_rows - total_rows
+                if remaining_rows <= 0:
+                    logger.info(f"Reached max_rows limit ({self.max_rows:,}), stopping")
+                    break
+                if remaining_rows < len(chunk):
+                    chunk = chunk.head(remaining_rows)
+            total_rows += len(chunk)
+            yield chunk
+        else:
+            self._input_exhausted = True
+
+    def _stop_phase(self, phase, rows_committed, chunk_rows):
+        """
+        Log that a phase stops at a chunk whose writes failed.
+
+        The chunk is not checkpointed, so ``resume`` starts again at its first row.
+
+        Args:
+            phase (str): Phase description
+            rows_committed (int): CSV rows committed before the chunk
+            chunk_rows (int): Rows of the chunk
+        """
+        logger.error(f"Writes of rows {rows_committed:,}-{rows_committed + chunk_rows:,} failed, stopping {phase}; "
+                     f"rerun with resume to retry from row {rows_committed:,}")
+
+    def _phase_state(self, phase):
+        """
+        Get the checkpointed state of a load phase.
+
+        Args:
+            phase (str): Phase name
+
+        Returns:
+            dict: Phase state with at least ``rows_committed``, ``loaded`` and ``completed``
+        """
+        state = {"rows_committed": 0, "loaded": 0, "completed": False}
+        if self.checkpoint:
+            state.update(self.checkpoint.phase(phase))
+        return state
+
+    def _commit_checkpoint(self, phase, rows_committed, loaded, seen_nodes=None, **fields):
+        """
+        Record that the first ``rows_committed`` CSV rows of a phase are written.
+
+        Args:
+            phase (str): Phase name
+            rows_committed (int): CSV rows whose writes have been committed
+            loaded (int): Nodes or relationships created so far in the phase
+            seen_nodes (NodeKeySet): Node keys to journal for the phase
+            **fields: Extra phase fields (e.g. per-label counts)
+        """
+        if not self.checkpoint:
+            return
+        if seen_nodes is not None:
+            self.checkpoint.append_keys(phase, seen_nodes.take_added())
+        self.checkpoint.update(phase, rows_committed=rows_committed, loaded=loaded, **fields)
+
+    def _complete_checkpoint(self, phase):
+        """
+        Mark a phase completed when its chunks reached the end of the file.
+
+        A phase cut short by ``max_rows`` stays open, so a resumed run with a
+        higher limit continues it; one whose limit happens to match the file
+        length is complete.
+
+        Args:
+            phase (str): Phase name
+        """
+        if self.checkpoint and self._input_exhausted:
+            self.checkpoint.update(phase, completed=True)
+
+    def load_single_pass(self, edges_file):
+        """
+        Load nodes and relationships while parsing the PrimeKG CSV only once.
+
+        Each chunk is fanned out to the type analysis, node extraction and
+        relationship stages in that order. Node writes are committed before the
+        chunk's relationships are written, so every relationship batch only
+        references endpoint nodes that are already in the graph.
+
+        Args:
+            edges_file (str): Path to the PrimeKG CSV file
+
+        Returns:
+            dict: Summary of the loading process
+        """
+        logger.info(f"Loading {edges_file} in a single pass")
+        if self.max_rows:
+            logger.info(f"Limiting to {self.max_rows:,} rows")
+
+        # Skip rows already committed by an interrupted run
+        state = self._phase_state("single_pass")
+        if state["rows_committed"] and not state["completed"]:
+            logger.info(f"Resuming single-pass load after row {state['rows_committed']:,}")
+        if state["rows_committed"]:
+            self.node_label_stats = state.get("node_label_stats", {})
+            self.relation_type_stats = state.get("relation_type_stats", {})
+            self.node_types.update(state.get("node_types", []))
+            self.relation_types.update(state.get("relation_types", []))
+
+        seen_nodes = NodeKeySet(self.checkpoint.load_keys("single_pass") if self.checkpoint else None)
+        constrained_types = set(state.get("node_types", []))
+        node_sources = set(state.get("node_sources", []))
+        total_nodes = state.get("nodes_loaded", 0)
+        total_relationships = state["loaded"]
+        total_rows = state["rows_committed"]
+
+        file_size = os.path.getsize(edges_file)
+        pbar = tqdm(total=file_size, unit='B', unit_scale=True, desc="Loading (single pass)")
+
+        chunks = [] if state["completed"] else self._iter_chunks(
+            edges_file, start_row=total_rows, chunk_rows=self._relationship_chunk_rows()
+        )
+        stopped = False
+        for chunk in chunks:
+            failed_writes = self.failed_writes
+
+            # Analysis stage: track types and constrain labels the first time they appear
+            chunk_node_types = set(chunk['x_type'].unique()) | set(chunk['y_type'].unique())
+            self.node_types.update(chunk_node_types)
+            self.relation_types.update(chunk['relation'].unique())
+            node_sources.update(chunk['x_source'].unique())
+            node_sources.update(chunk['y_source'].unique())
+            new_types = chunk_node_types - constrained_types
+            if new_types:
+                self.create_constraints(new_types)
+                constrained_types.update(new_types)
+
+            # Node stage: committed before any relationship of this chunk is written
+            with self.metrics.phase("dedup"):
+                chunk_nodes = self._extract_chunk_nodes(chunk, seen_nodes)
+            with self.metrics.phase("write"):
+                if chunk_nodes:
+                    total_nodes += self._load_nodes_batch(chunk_nodes)
+
+                # Relationship stage
+                total_relationships += self._load_relationships_batch(chunk)
+            if self.failed_writes > failed_writes:
+                self._stop_phase("single-pass load", total_rows, len(chunk))
+                stopped = True
+                break
+            total_rows += len(chunk)
+            self._commit_checkpoint(
+                "single_pass", total_rows, total_relationships, seen_nodes=seen_nodes,
+                nodes_loaded=total_nodes,
+                node_types=sorted(self.node_types),
+                relation_types=sorted(self.relation_types),
+                node_sources=sorted(node_sources),
+                node_label_stats=self.node_label_stats,
+                relation_type_stats=self.relation_type_stats,
+            )
+
+            advance_progress(pbar, chunk)
+            pbar.set_postfix({"rows": f"{total_rows:,}", "nodes": f"{total_nodes:,}", "rels": f"{total_relationships:,}"})
+
+        pbar.close()
+        if not state["completed"] and not stopped:
+            self._complete_checkpoint("single_pass")
+        logger.info(f"Found {len(self.node_types)} node types: {', '.join(self.node_types)}")
+        logger.info(f"Found {len(node_sources)} node sources: {', '.join(node_sources)}")
+        logger.info(f"Loaded {total_nodes:,} nodes and {total_relationships:,} relationships from {total_rows:,} rows")
+
+        return {
+            "nodes_loaded": total_nodes,
+            "relationships_loaded": total_relationships,
+            "node_types": len(self.node_types),
+            "relation_types": len(self.relation_types),
+            "node_label_stats": self.node_label_stats,
+            "relation_type_stats": self.relation_type_stats,
+            "total_rows_processed": total_rows,
+            "failed_writes": self.failed_writes,
+        }
+
+    def record_release(self, version, source_file, counts):
+        """
+        Record the loaded release on the ``PrimeKGRelease`` metadata node.
+
+        Args:
+            version (str): Release version
+            source_file (str): Input file of the release
+            counts (dict): Summary counts to store
+
+        Returns:
+            bool: True if the release was recorded
+        """
+        result = self.db.execute_write_query(RELEASE_METADATA_QUERY, {
+            'version': version,
+            'source_file': os.path.abspath(source_file),
+            'counts': [f"{name}={count}" for name, count in counts.items()],
+        })
+        if not result.get("success", False):
+            logger.error(f"Failed to record release {version}: {result.get('error', 'Unknown error')}")
+            return False
+        logger.info(f"Recorded PrimeKG release {version}")
+        return True
+
+    def load_primekg_data(self, edges_file=None, max_rows=None, single_pass=False, resume=False, report_file=None,
+                          release=None):
         """
         Load PrimeKG data into Neo4j.
 
+        Progress is checkpointed next to the input file after every committed
+        chunk, so an interrupted run can be continued with ``resume=True``.
+        At the end a JSON run report with phase timings, throughput,
+        transaction latency percentiles and Neo4j counters is written.
+
         Args:
             edges_file (str): Path to the PrimeKG CSV file
             max_rows (int): Maximum number of rows to process (None = all rows)
+            single_pass (bool): Parse the CSV once and stream each chunk through all stages
+            resume (bool): Skip work committed by a previous run of the same input file
+            report_file (str): Run report path (default: ``<edges_file>.report.json``)
+            release (str): Version recorded on the ``PrimeKGRelease`` node (default: input file name);
+                only recorded after a load of the whole file without failed writes
 
         Returns:
             dict: Summary of the loading process
@@ -439,8 +1072,63 @@ class PrimeKGLoader:
         if edges_file is None:
             edges_file = os.path.join(DATA_DIR, "primekg_data.csv")
 
-        # Analyze the data (limited if max_rows is set)
-        analysis = self.analyze_data(edges_file)
+        self.checkpoint = LoadCheckpoint(edges_file)
+        self.checkpoint.start(resume=resume)
+        self.metrics = LoadMetrics()
+
+        if single_pass:
+            result = self.load_single_pass(edges_file)
+        else:
+            result = self._load_two_pass(edges_file)
+
+        result["report_file"] = report_file or f"{edges_file}.report.json"
+        self.metrics.write_report(
+            result["report_file"],
+            result["total_rows_processed"],
+            input_file=os.path.abspath(edges_file),
+            mode="single_pass" if single_pass else "two_pass",
+            resumed=resume,
+            batch_size=self.batch_size,
+            commit_size=self.commit_size,
+            workers=self.workers,
+            max_rows=self.max_rows,
+            nodes_loaded=result["nodes_loaded"],
+            relationships_loaded=result["relationships_loaded"],
+            node_label_stats=self.node_label_stats,
+            relation_type_stats=self.relation_type_stats,
+        )
+        # Only a complete load of the whole file is a release of the graph
+        if self.max_rows or result["failed_writes"]:
+            logger.warning("Not recording the release: "
+                           + (f"load limited to {self.max_rows:,} rows" if self.max_rows else
+                              f"{result['failed_writes']} writes failed"))
+            result["release_recorded"] = False
+        else:
+            result["release_recorded"] = self.record_release(release or os.path.basename(edges_file), edges_file, {
+                'nodes_loaded': result["nodes_loaded"],
+                'relationships_loaded': result["relationships_loaded"],
+            })
+        return result
+
+    def _load_two_pass(self, edges_file):
+        """
+        Load nodes and then relationships, each phase reading the whole file.
+
+        Args:
+            edges_file (str): Path to the PrimeKG CSV file
+
+        Returns:
+            dict: Summary of the loading process
+        """
+        # Analyze the data (limited if max_rows is set), unless a resumed run already did
+        analysis = self.checkpoint.phase("analysis")
+        if analysis.get("max_rows", -1) == self.max_rows:
+            logger.info("Using data analysis from checkpoint")
+            self.node_types = set(analysis["node_types"])
+            self.relation_types = set(analysis["relation_types"])
+        else:
+            analysis = self.analyze_data(edges_file)
+            self.checkpoint.update("analysis", max_rows=self.max_rows, **analysis)
 
         # Create constraints
         self.create_constraints()
@@ -448,15 +1136,22 @@ class PrimeKGLoader:
         # Extract and load nodes
         nodes_count = self.extract_and_load_nodes(edges_file)
 
-        # Load relationships
-        relationships_count = self.load_relationships(edges_file)
+        # Load relationships, only once every node is written
+        if self.failed_writes:
+            logger.error("Skipping relationship loading because node loading did not finish")
+            relationships_count = self._phase_state("relationships")["loaded"]
+        else:
+            relationships_count = self.load_relationships(edges_file)
 
         return {
             "nodes_loaded": nodes_count,
             "relationships_loaded": relationships_count,
             "node_types": len(self.node_types),
             "relation_types": len(self.relation_types),
-            "total_rows_processed": min(analysis["total_rows"], self.max_rows) if self.max_rows else analysis["total_rows"]
+            "node_label_stats": self.node_label_stats,
+            "relation_type_stats": self.relation_type_stats,
+            "total_rows_processed": min(analysis["total_rows"], self.max_rows) if self.max_rows else analysis["total_rows"],
+            "failed_writes": self.failed_writes,
         }
 
 
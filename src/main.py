@@ -31,11 +31,42 @@ def parse_args():
     load_parser.add_argument('--data-file', help='Path to PrimeKG CSV data file')
     load_parser.add_argument('--batch-size', type=int, default=1000, help='Batch size for loading data')
     load_parser.add_argument('--max-rows', type=int, default=None, help='Maximum number of rows to load (for testing)')
+    load_parser.add_argument('--workers', type=int, default=1, help='Number of concurrent relationship writers')
+    load_parser.add_argument('--commit-size', type=int, default=None, help='Rows per transaction (default: one batch per transaction)')
+    load_parser.add_argument('--single-pass', action='store_true', help='Parse the CSV once, loading nodes and relationships per chunk')
+    load_parser.add_argument('--resume', action='store_true', help='Resume an interrupted load from its checkpoint')
+    load_parser.add_argument('--report-file', help='Path of the JSON run report (default: <data-file>.report.json)')
+    load_parser.add_argument('--release', help='Version recorded on the PrimeKGRelease node (default: data file name)')
+
+    # Build columnar cache command
+    cache_parser = subparsers.add_parser('build-cache', help='Convert the PrimeKG CSV into its Parquet cache')
+    cache_parser.add_argument('--data-file', help='Path to PrimeKG CSV data file')
+
+    # Incremental load between releases command
+    diff_parser = subparsers.add_parser('diff-load', help='Apply the changes between two PrimeKG releases')
+    diff_parser.add_argument('--old-file', required=True, help='CSV of the release currently in Neo4j')
+    diff_parser.add_argument('--new-file', required=True, help='CSV of the release to apply')
+    diff_parser.add_argument('--release', required=True, help='Version recorded on the PrimeKGRelease node')
+    diff_parser.add_argument('--partitions', type=int, default=64, help='On-disk hash partitions per release')
+    diff_parser.add_argument('--batch-size', type=int, default=10000, help='Rows per chunk and write transaction')
+    diff_parser.add_argument('--workers', type=int, default=1, help='Number of concurrent relationship writers')
+    diff_parser.add_argument('--dry-run', action='store_true', help='Only report the number of changes')
+
+    # Export neo4j-admin import files command
+    export_parser = subparsers.add_parser('export-import-csv', help='Write CSV files for neo4j-admin database import full')
+    export_parser.add_argument('--data-file', help='Path to PrimeKG CSV data file')
+    export_parser.add_argument('--ddi-csv', help='Optional Flame DDI CSV (ddi_data_all.csv) to include')
+    export_parser.add_argument('--output-dir', default=os.path.join(DATA_DIR, 'import'), help='Directory to write import files to')
+    export_parser.add_argument('--batch-size', type=int, default=100000, help='Rows to parse per chunk')
+    export_parser.add_argument('--max-rows', type=int, default=None, help='Maximum number of rows to export (for testing)')
 
     # Query data command
     query_parser = subparsers.add_parser('query', help='Run a Cypher query against Neo4j')
     query_parser.add_argument('--query', required=True, help='Cypher query to execute')
     query_parser.add_argument('--params', help='Query parameters in JSON format')
+    query_parser.add_argument('--format', choices=['ndjson', 'json'], default='ndjson',
+                              help='Stream one JSON record per line (ndjson) or print a single JSON array (json)')
+    query_parser.add_argument('--fetch-size', type=int, default=1000, help='Records fetched from Neo4j per round trip')
 
     # Test connection command
     test_parser = subparsers.add_parser('test-connection', help='Test Neo4j connection')
@@ -53,10 +84,40 @@ def main():
 
     elif args.command == 'load':
         # Load PrimeKG data into Neo4j
-        loader = PrimeKGLoader(batch_size=args.batch_size)
-        result = loader.load_primekg_data(edges_file=args.data_file, max_rows=args.max_rows)
+        loader = PrimeKGLoader(batch_size=args.batch_size, workers=args.workers, commit_size=args.commit_size)
+        result = loader.load_primekg_data(
+            edges_file=args.data_file, max_rows=args.max_rows, single_pass=args.single_pass, resume=args.resume,
+            report_file=args.report_file,
+            release=args.release,
+        )
         logger.info(f"Loading complete: {result}")
 
+    elif args.command == 'build-cache':
+        # One-time CSV -> Parquet conversion, reused while newer than the CSV
+        from src.utils.columnar import convert_csv_to_parquet
+        convert_csv_to_parquet(args.data_file or os.path.join(DATA_DIR, "primekg_data.csv"))
+
+    elif args.command == 'diff-load':
+        # Apply only the inserts, deletes and updates between two releases
+        from src.etl.delta_loader import DeltaLoader
+        loader = PrimeKGLoader(batch_size=args.batch_size, workers=args.workers)
+        result = DeltaLoader(loader, partitions=args.partitions).diff_load(
+            args.old_file, args.new_file, args.release, dry_run=args.dry_run
+        )
+        logger.info(f"Delta load complete: {result}")
+
+    elif args.command == 'export-import-csv':
+        # Convert PrimeKG into neo4j-admin bulk import files
+        from src.etl.bulk_export import export_import_csv
+        result = export_import_csv(
+            edges_file=args.data_file or os.path.join(DATA_DIR, "primekg_data.csv"),
+            output_dir=args.output_dir,
+            ddi_csv=args.ddi_csv,
+            batch_size=args.batch_size,
+            max_rows=args.max_rows,
+        )
+        logger.info(f"Export complete: {result}")
+
     elif args.command == 'query':
         # Run a Cypher query
         import json
@@ -69,8 +130,14 @@ def main():
                 logger.error("Invalid JSON in params argument")
                 sys.exit(1)
 
-        result = db.execute_query(args.query, params)
-        print(json.dumps(result, indent=2, default=str))
+        if args.format == 'json':
+            result = db.execute_query(args.query, params)
+            print(json.dumps(result, indent=2, default=str))
+        else:
+            # Constant memory: records are written as they arrive
+            for record in db.stream_query(args.query, params, fetch_size=args.fetch_size):
+                sys.stdout.write(json.dumps(record, default=str) + '\n')
+            sys.stdout.flush()
 
     elif args.command == 'test-connection':
         # Test Neo4j connection
@@ -0,0 +1,277 @@
+"""
+Columnar Parquet cache of the PrimeKG edges CSV.
+
+The CSV is converted once into a typed Parquet file next to it, with the
+low-cardinality columns (node types, relations, sources) dictionary-encoded.
+Readers use the cache whenever it is newer than the CSV: batches are read
+through a memory map with column projection, dictionary columns come back as
+pandas categoricals instead of one Python string per cell, and schema
+questions (columns, row count) are answered from the Parquet footer.
+
+Requires the optional ``pyarrow`` dependency; without it every reader falls
+back to parsing the CSV.
+"""
+import os
+import logging
+from typing import Any, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depends on the environment
+    pa = None
+    pc = None
+    pq = None
+
+# Dictionary-encoded (categorical) columns of the PrimeKG edges file
+CATEGORICAL_COLUMNS = ['relation', 'display_relation', 'x_type', 'x_source', 'y_type', 'y_source']
+
+# Node ids are stored as strings, exactly as the loader writes them
+ID_COLUMNS = ['x_id', 'y_id']
+STRING_COLUMNS = ID_COLUMNS + ['x_name', 'y_name']
+
+# Integer node indexes; a gap in a chunk must not turn them into floats
+INDEX_COLUMNS = ['x_index', 'y_index']
+
+
+def parquet_available() -> bool:
+    """Return True if pyarrow is installed."""
+    return pq is not None
+
+
+def cache_path(csv_file: str) -> str:
+    """
+    Get the Parquet cache path for a CSV file.
+
+    Args:
+        csv_file: Path to the CSV file
+
+    Returns:
+        Path of the ``.parquet`` file next to it
+    """
+    root, _ = os.path.splitext(csv_file)
+    return f"{root}.parquet"
+
+
+def fresh_cache(csv_file: str) -> Optional[str]:
+    """
+    Get the Parquet cache of a CSV file if it can be used.
+
+    Args:
+        csv_file: Path to the CSV file
+
+    Returns:
+        Cache path if pyarrow is available and the cache is newer than the CSV, else None
+    """
+    parquet_file = cache_path(csv_file)
+    if not parquet_available() or not os.path.exists(parquet_file):
+        return None
+    if os.path.exists(csv_file) and os.path.getmtime(parquet_file) < os.path.getmtime(csv_file):
+        return None
+    return parquet_file
+
+
+def _arrow_schema(chunk: pd.DataFrame) -> "pa.Schema":
+    # Columns outside the PrimeKG layout keep the type inferred from the first chunk
+    inferred = pa.Schema.from_pandas(chunk, preserve_index=False)
+    fields = []
+    for column in chunk.columns:
+        if column in CATEGORICAL_COLUMNS:
+            fields.append(pa.field(column, pa.dictionary(pa.int32(), pa.string())))
+        elif column in STRING_COLUMNS:
+            fields.append(pa.field(column, pa.string()))
+        elif column in INDEX_COLUMNS:
+            fields.append(pa.field(column, pa.int64()))
+        else:
+            fields.append(inferred.field(column))
+    return pa.schema(fields)
+
+
+def convert_csv_to_parquet(csv_file: str, chunk_size: int = 500000) -> str:
+    """
+    Convert a PrimeKG CSV into its typed, dictionary-encoded Parquet cache.
+
+    Each CSV chunk becomes one row group. Ids are stringified the same way as
+    ``PrimeKGLoader`` does, so both sources yield identical node ids.
+
+    Args:
+        csv_file: Path to the CSV file
+        chunk_size: Number of CSV rows per row group
+
+    Returns:
+        Path of the written Parquet file
+    """
+    if not parquet_available():
+        raise ImportError("pyarrow is required for the Parquet cache (pip install pyarrow)")
+
+    parquet_file = cache_path(csv_file)
+    tmp_file = f"{parquet_file}.tmp"
+    logger.info(f"Converting {csv_file} to {parquet_file}")
+
+    writer = None
+    total_rows = 0
+    try:
+        for chunk in pd.read_csv(csv_file, chunksize=chunk_size):
+            for column in chunk.columns:
+                if column in CATEGORICAL_COLUMNS:
+                    chunk[column] = chunk[column].astype('string').astype('category')
+                elif column in ID_COLUMNS:
+                    chunk[column] = chunk[column].astype(str)
+                elif column in STRING_COLUMNS:
+                    chunk[column] = chunk[column].astype('string')
+            if writer is None:
+                schema = _arrow_schema(chunk)
+                writer = pq.ParquetWriter(tmp_file, schema)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            total_rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    os.replace(tmp_file, parquet_file)
+    logger.info(f"Wrote {total_rows:,} rows to {parquet_file}")
+    return parquet_file
+
+
+def iter_edge_batches(csv_file: str, chunk_size: int = 10000, columns: Optional[List[str]] = None,
+                      skip_rows: int = 0) -> Iterator[pd.DataFrame]:
+    """
+    Iterate over the PrimeKG edges in DataFrame batches, preferring the Parquet cache.
+
+    Args:
+        csv_file: Path to the CSV file
+        chunk_size: Number of rows per batch
+        columns: Columns to read (None = all columns)
+        skip_rows: Number of leading data rows to skip
+
+    Yields:
+        DataFrame batches (categorical columns when read from the cache). Each
+        batch's ``attrs['progress']`` holds ``(position, total)`` in bytes of
+        the file actually read, for ``advance_progress``.
+    """
+    parquet_file = fresh_cache(csv_file)
+    if parquet_file is None:
+        skiprows = range(1, skip_rows + 1) if skip_rows else None
+        file_size = os.path.getsize(csv_file)
+        with open(csv_file, 'rb') as handle:
+            for frame in pd.read_csv(handle, chunksize=chunk_size, usecols=columns, skiprows=skiprows):
+                # The parser reads ahead in blocks, so this is exact to within one block
+                frame.attrs['progress'] = (min(handle.tell(), file_size), file_size)
+                yield frame
+        return
+
+    parquet = pq.ParquetFile(parquet_file, memory_map=True)
+    file_size = os.path.getsize(parquet_file)
+    num_rows = parquet.metadata.num_rows
+    rows_read = 0
+    row_group = 0
+    if skip_rows:
+        # Jump over whole row groups using the footer metadata
+        while row_group < parquet.num_row_groups and skip_rows >= parquet.metadata.row_group(row_group).num_rows:
+            skip_rows -= parquet.metadata.row_group(row_group).num_rows
+            rows_read += parquet.metadata.row_group(row_group).num_rows
+            row_group += 1
+    row_groups = list(range(row_group, parquet.num_row_groups))
+    if not row_groups:
+        return
+
+    def _with_progress(frame):
+        # Parquet positions are the fraction of rows read, scaled to the file size
+        frame.attrs['progress'] = (file_size * rows_read // max(num_rows, 1), file_size)
+        return frame
+
+    pending = None
+    for batch in parquet.iter_batches(batch_size=chunk_size, row_groups=row_groups, columns=columns):
+        frame = batch.to_pandas()
+        rows_read += len(frame)
+        if skip_rows:
+            dropped = min(skip_rows, len(frame))
+            frame = frame.iloc[dropped:]
+            skip_rows -= dropped
+        if pending is not None:
+            frame = pd.concat([pending, frame], ignore_index=True)
+            pending = None
+        # Row group boundaries can produce short batches; re-block them to chunk_size
+        while len(frame) >= chunk_size:
+            yield _with_progress(frame.iloc[:chunk_size].reset_index(drop=True))
+            frame = frame.iloc[chunk_size:]
+        if len(frame):
+            pending = frame
+    if pending is not None and len(pending):
+        yield _with_progress(pending.reset_index(drop=True))
+
+
+def advance_progress(pbar, frame):
+    """
+    Move a byte-based progress bar to the input position of a batch.
+
+    Args:
+        pbar (tqdm): Progress bar created with ``unit='B'``
+        frame (pd.DataFrame): Batch yielded by ``iter_edge_batches``
+    """
+    position, total = frame.attrs.get('progress', (None, None))
+    if position is None:
+        return
+    if pbar.total != total:
+        pbar.total = total
+    pbar.update(position - pbar.n)
+
+
+def read_schema(csv_file: str) -> Optional[Dict[str, Any]]:
+    """
+    Read columns, dtypes and row count from the Parquet footer.
+
+    Args:
+        csv_file: Path to the CSV file
+
+    Returns:
+        Dict with ``columns``, ``column_dtypes`` and ``total_rows``, or None without a fresh cache
+    """
+    parquet_file = fresh_cache(csv_file)
+    if parquet_file is None:
+        return None
+    metadata = pq.read_metadata(parquet_file)
+    schema = metadata.schema.to_arrow_schema()
+    return {
+        "columns": schema.names,
+        "column_dtypes": {field.name: str(field.type) for field in schema},
+        "total_rows": metadata.num_rows,
+    }
+
+
+def distinct_values(csv_file: str, column: str) -> Optional[List[Any]]:
+    """
+    Get the distinct values of a dictionary-encoded column from the Parquet cache.
+
+    Only the column's dictionaries are decoded, not one string per row.
+
+    Args:
+        csv_file: Path to the CSV file
+        column: Column name
+
+    Returns:
+        Distinct values in first-seen order, or None without a fresh cache
+    """
+    parquet_file = fresh_cache(csv_file)
+    if parquet_file is None:
+        return None
+    values = {}
+    table = pq.read_table(parquet_file, columns=[column], memory_map=True)
+    for chunk in table.column(column).chunks:
+        if pa.types.is_dictionary(chunk.type):
+            used = pc.unique(chunk.indices).to_pylist()
+            dictionary = chunk.dictionary.to_pylist()
+            for index in used:
+                if index is not None:
+                    values.setdefault(dictionary[index], None)
+        else:
+            for value in pc.unique(chunk).to_pylist():
+                values.setdefault(value, None)
+    return list(values)
@@ -3,9 +3,12 @@ Utility functions for the PrimeKG to Neo4j server.
 """
 import os
 import logging
+from contextlib import closing
 import pandas as pd
 from typing import Dict, List, Any
 
+from src.utils.columnar import distinct_values, iter_edge_batches, read_schema
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -24,6 +27,8 @@ def ensure_directory(directory: str) -> None:
 def read_csv_in_chunks(file_path: str, chunk_size: int = 10000) -> pd.DataFrame:
     """
     Read a CSV file in chunks to handle large files.
+
+    Uses the Parquet cache of the file when it is fresh (see ``src.utils.columnar``).
     
     Args:
         file_path: Path to the CSV file
@@ -37,7 +42,7 @@ def read_csv_in_chunks(file_path: str, chunk_size: int = 10000) -> pd.DataFrame:
         return
     
     try:
-        for chunk in pd.read_csv(file_path, chunksize=chunk_size):
+        for chunk in iter_edge_batches(file_path, chunk_size):
             yield chunk
     except Exception as e:
         logger.error(f"Error reading CSV file: {e}")
@@ -58,17 +63,25 @@ def analyze_csv_structure(file_path: str) -> Dict[str, Any]:
     
     try:
         # Read just the header and a few rows
-        df = pd.read_csv(file_path, nrows=5)
-        
-        # Get column information
-        columns = list(df.columns)
-        dtypes = {col: str(df[col].dtype) for col in columns}
+        with closing(iter_edge_batches(file_path, 5)) as batches:
+            df = next(batches)
         
         # Get file size
         file_size = os.path.getsize(file_path) / (1024 * 1024)  # Size in MB
         
-        # Count total rows (this reads the whole file)
-        total_rows = sum(1 for _ in open(file_path)) - 1  # Subtract header row
+        schema = read_schema(file_path)
+        if schema is not None:
+            # Columns, types and row count come from the Parquet footer
+            columns = schema["columns"]
+            dtypes = schema["column_dtypes"]
+            total_rows = schema["total_rows"]
+        else:
+            # Get column information
+            columns = list(df.columns)
+            dtypes = {col: str(df[col].dtype) for col in columns}
+            
+            # Count total rows (this reads the whole file)
+            total_rows = sum(1 for _ in open(file_path)) - 1  # Subtract header row
         
         return {
             "file_path": file_path,
@@ -146,6 +159,11 @@ def get_edge_types(edges_file: str) -> List[str]:
         return []
     
     try:
+        # Decode only the dictionary of the cached relation column when possible
+        relations = distinct_values(edges_file, "relation")
+        if relations is not None:
+            return relations
+
         # Read just the relation column
         df = pd.read_csv(edges_file, usecols=["relation"])
         relations = df["relation"].unique().tolist()
@@ -0,0 +1,214 @@
+"""
+Seeded generator of synthetic PrimeKG-shaped edge files.
+
+The generated CSV has the columns of the real ``kg.csv`` and mimics its
+shape: the same node types, relations and relative relation sizes, a skewed
+(Zipf-like) degree distribution within every node type, and every undirected
+edge written in both directions, grouped by relation. It is meant for
+reproducible loader benchmarks and tests, not for biology.
+"""
+import logging
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Number of rows (both directions) in the real PrimeKG kg.csv
+REAL_EDGE_COUNT = 8_100_498
+
+# Node type -> (approximate node count in PrimeKG, source, id format)
+NODE_TYPES = {
+    "gene/protein": (27671, "NCBI", "{}"),
+    "drug": (7957, "DrugBank", "DB{:05d}"),
+    "effect/phenotype": (15311, "HPO", "{}"),
+    "disease": (17080, "MONDO", "{}"),
+    "biological_process": (28642, "GO", "{}"),
+    "molecular_function": (11169, "GO", "{}"),
+    "cellular_component": (4176, "GO", "{}"),
+    "anatomy": (14035, "UBERON", "{}"),
+    "pathway": (2516, "REACTOME", "R-HSA-{}"),
+    "exposure": (818, "CTD", "D{:06d}"),
+}
+
+# (relation, display_relation, x_type, y_type, approximate row count in PrimeKG)
+RELATIONS = [
+    ("anatomy_protein_present", "expression present", "anatomy", "gene/protein", 3036406),
+    ("drug_drug", "synergistic interaction", "drug", "drug", 2672628),
+    ("protein_protein", "ppi", "gene/protein", "gene/protein", 642150),
+    ("disease_phenotype_positive", "phenotype present", "disease", "effect/phenotype", 300634),
+    ("bioprocess_protein", "interacts with", "biological_process", "gene/protein", 289610),
+    ("cellcomp_protein", "interacts with", "cellular_component", "gene/protein", 166804),
+    ("disease_protein", "associated with", "disease", "gene/protein", 160822),
+    ("molfunc_protein", "interacts with", "molecular_function", "gene/protein", 139060),
+    ("drug_effect", "side effect", "drug", "effect/phenotype", 129568),
+    ("bioprocess_bioprocess", "parent-child", "biological_process", "biological_process", 105772),
+    ("pathway_protein", "interacts with", "pathway", "gene/protein", 85292),
+    ("disease_disease", "parent-child", "disease", "disease", 64388),
+    ("contraindication", "contraindication", "drug", "disease", 61350),
+    ("drug_protein", "target", "drug", "gene/protein", 51306),
+    ("anatomy_protein_absent", "expression absent", "anatomy", "gene/protein", 39774),
+    ("phenotype_phenotype", "parent-child", "effect/phenotype", "effect/phenotype", 37472),
+    ("anatomy_anatomy", "parent-child", "anatomy", "anatomy", 28064),
+    ("molfunc_molfunc", "parent-child", "molecular_function", "molecular_function", 27148),
+    ("indication", "indication", "drug", "disease", 18776),
+    ("cellcomp_cellcomp", "parent-child", "cellular_component", "cellular_component", 9690),
+    ("phenotype_protein", "associated with", "effect/phenotype", "gene/protein", 6660),
+    ("off-label use", "off-label use", "drug", "disease", 5136),
+    ("pathway_pathway", "parent-child", "pathway", "pathway", 5070),
+    ("exposure_disease", "linked to", "exposure", "disease", 4608),
+    ("exposure_exposure", "parent-child", "exposure", "exposure", 4140),
+    ("exposure_bioprocess", "interacts with", "exposure", "biological_process", 3250),
+    ("disease_phenotype_negative", "phenotype absent", "disease", "effect/phenotype", 2483),
+    ("exposure_protein", "interacts with", "exposure", "gene/protein", 2424),
+    ("exposure_molfunc", "interacts with", "exposure", "molecular_function", 90),
+    ("exposure_cellcomp", "interacts with", "exposure", "cellular_component", 20),
+]
+
+COLUMNS = ['relation', 'display_relation',
+           'x_index', 'x_id', 'x_type', 'x_name', 'x_source',
+           'y_index', 'y_id', 'y_type', 'y_name', 'y_source']
+
+# Exponent of the Zipf-like node popularity within a node type
+DEGREE_EXPONENT = 0.7
+
+# Smallest number of nodes generated per node type
+MIN_NODES_PER_TYPE = 10
+
+
+def node_counts(n_edges: int) -> Dict[str, int]:
+    """
+    Get the number of nodes per type for a graph of ``n_edges`` rows.
+
+    Node counts scale with the square root of the edge ratio to the real
+    graph, so small graphs keep enough distinct node pairs per relation.
+
+    Args:
+        n_edges: Number of CSV rows to generate
+
+    Returns:
+        Node type -> node count
+    """
+    scale = (n_edges / REAL_EDGE_COUNT) ** 0.5
+    return {
+        node_type: max(MIN_NODES_PER_TYPE, int(round(count * scale)))
+        for node_type, (count, _, _) in NODE_TYPES.items()
+    }
+
+
+def _pair_targets(n_edges: int) -> Dict[str, int]:
+    """Split ``n_edges / 2`` undirected pairs over the relations by their real share."""
+    pairs = n_edges // 2
+    total = sum(row_count for *_, row_count in RELATIONS)
+    targets = {relation: pairs * row_count // total for relation, _, _, _, row_count in RELATIONS}
+    # Hand the rounding remainder to the largest relations
+    for relation, *_ in RELATIONS[:pairs - sum(targets.values())]:
+        targets[relation] += 1
+    return targets
+
+
+def _sample_pairs(rng, n_x, n_y, target, same_type, weights_x, weights_y):
+    """
+    Sample ``target`` distinct node pairs with Zipf-weighted endpoints.
+
+    Pairs of the same node type are unordered and never self loops.
+
+    Returns:
+        tuple: ``(x, y)`` local node indexes
+    """
+    capacity = n_x * (n_x - 1) // 2 if same_type else n_x * n_y
+    target = min(target, capacity // 2)
+    keys = np.empty(0, dtype=np.int64)
+    for _ in range(50):
+        if len(keys) >= target:
+            break
+        draw = int((target - len(keys)) * 1.3) + 16
+        x = rng.choice(n_x, draw, p=weights_x)
+        y = rng.choice(n_y, draw, p=weights_y)
+        if same_type:
+            keep = x != y
+            x, y = np.minimum(x[keep], y[keep]), np.maximum(x[keep], y[keep])
+        keys = np.union1d(keys, x.astype(np.int64) * n_y + y)
+    if len(keys) > target:
+        keys = rng.choice(keys, target, replace=False)
+    else:
+        keys = rng.permutation(keys)
+    return keys // n_y, keys % n_y
+
+
+def write_synthetic_primekg(path: str, n_edges: int, seed: int = 0, block_size: int = 500000) -> Dict[str, Any]:
+    """
+    Write a synthetic PrimeKG-shaped edges CSV.
+
+    Args:
+        path: Output CSV path
+        n_edges: Number of rows to generate (both directions count; rounded down to even)
+        seed: Random seed; the same seed and size always produce the same file
+        block_size: Number of node pairs written per CSV block
+
+    Returns:
+        Summary with ``rows``, ``nodes`` per type and ``relations`` row counts
+    """
+    rng = np.random.default_rng(seed)
+    counts = node_counts(n_edges)
+
+    # Per-type node tables; popularity ranks are shuffled so hubs have random ids
+    nodes = {}
+    offset = 0
+    for node_type, (_, source, id_format) in NODE_TYPES.items():
+        n = counts[node_type]
+        local_ids = rng.permutation(n) + 1
+        ids = np.array([id_format.format(i) for i in local_ids], dtype=object)
+        weights = 1.0 / np.arange(1, n + 1) ** DEGREE_EXPONENT
+        nodes[node_type] = {
+            "type": node_type,
+            "index": offset + np.arange(n),
+            "id": ids,
+            "name": np.array([f"{node_type} {node_id}" for node_id in ids], dtype=object),
+            "source": source,
+            "weights": weights / weights.sum(),
+        }
+        offset += n
+
+    targets = _pair_targets(n_edges)
+    relation_rows = {}
+    header = True
+    with open(path, 'w', newline='', encoding='utf-8') as handle:
+        for relation, display_relation, x_type, y_type, _ in RELATIONS:
+            if not targets[relation]:
+                continue
+            x_nodes, y_nodes = nodes[x_type], nodes[y_type]
+            x, y = _sample_pairs(
+                rng, len(x_nodes["id"]), len(y_nodes["id"]), targets[relation],
+                x_type == y_type, x_nodes["weights"], y_nodes["weights"],
+            )
+            if len(x) < targets[relation]:
+                logger.warning(f"{relation}: only {len(x):,} of {targets[relation]:,} distinct pairs available")
+
+            # Undirected edges appear in both directions, forward block first
+            for (src, src_nodes), (tgt, tgt_nodes) in (((x, x_nodes), (y, y_nodes)), ((y, y_nodes), (x, x_nodes))):
+                for start in range(0, len(src), block_size):
+                    s, t = src[start:start + block_size], tgt[start:start + block_size]
+                    pd.DataFrame({
+                        'relation': relation,
+                        'display_relation': display_relation,
+                        'x_index': src_nodes["index"][s],
+                        'x_id': src_nodes["id"][s],
+                        'x_type': src_nodes["type"],
+                        'x_name': src_nodes["name"][s],
+                        'x_source': src_nodes["source"],
+                        'y_index': tgt_nodes["index"][t],
+                        'y_id': tgt_nodes["id"][t],
+                        'y_type': tgt_nodes["type"],
+                        'y_name': tgt_nodes["name"][t],
+                        'y_source': tgt_nodes["source"],
+                    }, columns=COLUMNS).to_csv(handle, header=header, index=False)
+                    header = False
+            relation_rows[relation] = 2 * len(x)
+
+    rows = sum(relation_rows.values())
+    logger.info(f"Wrote {rows:,} synthetic PrimeKG rows ({sum(counts.values()):,} nodes) to {path}")
+    return {"rows": rows, "nodes": counts, "relations": relation_rows}
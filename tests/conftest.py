@@ -0,0 +1,40 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.db.neo4j_connector import WRITE_COUNTERS
+
+
+def _replay_write_batches(db):
+    """Emulate execute_write_batches with one execute_write_query call per batch."""
+    def execute_write_batches(query, batches, commit_size=None, on_commit=None):
+        totals = {"success": True, "rows": 0, "transactions": 0, "batches_committed": 0,
+                  "retries": 0, "transaction_seconds": [], **dict.fromkeys(WRITE_COUNTERS, 0)}
+        for parameters in batches:
+            result = db.execute_write_query(query, parameters)
+            if not result.get("success", False):
+                totals.update({"success": False, "error": result.get("error"),
+                               "transient": result.get("transient", False)})
+                return totals
+            for key in WRITE_COUNTERS:
+                totals[key] += result.get(key, 0)
+            totals["rows"] += len(parameters.get("rows", ()))
+            totals["transactions"] += 1
+            totals["batches_committed"] += 1
+            totals["transaction_seconds"].append(0.001)
+            if on_commit is not None:
+                on_commit(totals)
+        return totals
+    return execute_write_batches
+
+
+@pytest.fixture
+def mock_db():
+    db = MagicMock()
+    db.execute_write_query.side_effect = lambda query, params=None: {
+        "success": True,
+        "nodes_created": len((params or {}).get("rows", [])),
+        "relationships_created": 0,
+    }
+    db.execute_write_batches.side_effect = _replay_write_batches(db)
+    return db
@@ -0,0 +1,193 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from neo4j.exceptions import ClientError, TransientError
+
+from src.db.neo4j_connector import WRITE_COUNTERS, Neo4jConnector
+
+
+class FakeSession:
+    """Session whose execute_write runs the transaction function like the driver, failing on demand."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.executed = []
+        self.transactions = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute_write(self, work, *args):
+        while True:
+            tx = MagicMock()
+            tx.run.side_effect = lambda query, params: self._run(params)
+            failure = self.failures.pop(0) if self.failures else None
+            if isinstance(failure, TransientError):
+                work(tx, *args)
+                continue  # rolled back and retried by the driver
+            if failure is not None:
+                raise failure
+            result = work(tx, *args)
+            self.transactions.append(args[0])
+            return result
+
+    def _run(self, params):
+        self.executed.append(params)
+        counters = dict.fromkeys(WRITE_COUNTERS, 0)
+        counters["relationships_created"] = len(params["rows"])
+        return MagicMock(consume=lambda: SimpleNamespace(counters=SimpleNamespace(**counters)))
+
+
+def _connector(failures=()):
+    connector = Neo4jConnector()
+    session = FakeSession(list(failures))
+    connector.driver = MagicMock()
+    connector.driver.session.return_value = session
+    return connector, session
+
+
+def _batches(sizes):
+    return [{"rows": [{"id": i} for i in range(size)]} for size in sizes]
+
+
+def test_write_batches_groups_commits_in_one_session():
+    connector, session = _connector()
+    result = connector.execute_write_batches("UNWIND $rows AS row CREATE ()", _batches([2, 2, 2, 2, 1]), commit_size=4)
+
+    assert connector.driver.session.call_count == 1
+    assert [len(group) for group in session.transactions] == [2, 2, 1]
+    assert result["success"] is True
+    assert result["transactions"] == 3
+    assert result["rows"] == result["relationships_created"] == 9
+    assert result["batches_committed"] == 5
+    assert len(result["transaction_seconds"]) == 3
+
+
+def test_write_batches_report_progress_after_each_commit():
+    connector, session = _connector([None, TransientError("deadlock")])
+    progress = []
+    connector.execute_write_batches(
+        "q", _batches([2, 2, 1]), commit_size=3,
+        on_commit=lambda totals: progress.append((totals["batches_committed"], totals["rows"])),
+    )
+
+    # The retried transaction is reported once, after its commit
+    assert progress == [(2, 4), (3, 5)]
+
+
+def test_write_batches_counts_driver_retries_once():
+    connector, session = _connector([None, TransientError("deadlock")])
+    result = connector.execute_write_batches("q", _batches([1, 1]))
+
+    assert result["success"] is True
+    assert result["retries"] == 1
+    # The rolled-back attempt's counters are not added
+    assert result["relationships_created"] == 2
+
+
+def test_write_batches_reports_committed_prefix_on_failure():
+    connector, session = _connector([None, ClientError("syntax")])
+    result = connector.execute_write_batches("q", _batches([3, 3, 3]))
+
+    assert result["success"] is False
+    assert not result.get("transient")
+    assert result["batches_committed"] == 1
+    assert result["rows"] == 3
+
+
+class StreamingSession:
+    def __init__(self, n_records):
+        self.records = [MagicMock(data=lambda i=i: {"id": i}) for i in range(n_records)]
+        self.pulled = 0
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.closed = True
+        return False
+
+    def run(self, query, parameters):
+        for record in self.records:
+            self.pulled += 1
+            yield record
+
+
+def _streaming_connector(n_records):
+    connector = Neo4jConnector()
+    session = StreamingSession(n_records)
+    connector.driver = MagicMock()
+    connector.driver.session.return_value = session
+    return connector, session
+
+
+def test_stream_query_is_lazy_and_closes_session_at_the_end():
+    connector, session = _streaming_connector(5)
+    records = connector.stream_query("MATCH (n) RETURN n.id AS id", fetch_size=2)
+
+    assert connector.driver.session.call_count == 0
+    assert next(records) == {"id": 0}
+    assert session.pulled == 1 and not session.closed
+    assert [r["id"] for r in records] == [1, 2, 3, 4]
+    assert session.closed
+    assert connector.driver.session.call_args.kwargs["fetch_size"] == 2
+
+
+def test_stream_query_closes_session_when_abandoned():
+    connector, session = _streaming_connector(5)
+    records = connector.stream_query("q")
+    next(records)
+    records.close()
+    assert session.closed
+    assert session.pulled == 1
+
+
+def test_stream_dataframes_batches_records():
+    connector, _ = _streaming_connector(5)
+    frames = list(connector.stream_dataframes("q", batch_size=2))
+    assert [len(frame) for frame in frames] == [2, 2, 1]
+    assert frames[-1]["id"].tolist() == [4]
+
+
+class AsyncFakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __aiter__(self):
+        return self._records()
+
+    async def _records(self):
+        for row in self.rows:
+            yield MagicMock(data=lambda row=row: row)
+
+
+class AsyncFakeSession:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run(self, query, parameters):
+        if query == "boom":
+            raise ClientError("syntax")
+        return AsyncFakeResult(self.rows)
+
+
+def test_async_execute_query_collects_records_and_swallows_errors():
+    import asyncio
+    from src.db.neo4j_connector import AsyncNeo4jConnector
+
+    connector = AsyncNeo4jConnector(max_connection_pool_size=7)
+    connector.driver = MagicMock()
+    connector.driver.session.side_effect = lambda: AsyncFakeSession([{"id": 1}, {"id": 2}])
+
+    assert asyncio.run(connector.execute_query("MATCH (n) RETURN n.id AS id")) == [{"id": 1}, {"id": 2}]
+    assert asyncio.run(connector.execute_query("boom")) == []
@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def no_default_cache(monkeypatch):
+    """Query-shaping tests run uncached; cache tests pass an ``EnrichmentCache`` explicitly."""
+    monkeypatch.setattr("src.enrichment.cache.ENRICHER_CACHE_SIZE", 0)
@@ -0,0 +1,125 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from src.enrichment.async_enricher import AsyncEnricherOrchestrator
+from src.enrichment.enricher import EnricherOrchestrator
+from src.enrichment.queries import (
+    CAUSAL_PATHWAY_QUERY,
+    COMBINED_DIAGNOSIS_QUERY,
+    DDI_QUERY,
+    GRAPH_VERSION_QUERY,
+    INDICATIONS_QUERY,
+)
+
+ROWS = {
+    CAUSAL_PATHWAY_QUERY: [
+        {"input_dx": "heart failure", "disease": "Heart Failure", "phenotype": "fatigue"},
+        {"input_dx": "heart failure", "disease": "Heart Failure", "phenotype": "dyspnea"},
+    ],
+    INDICATIONS_QUERY: [
+        {"input_dx": "heart failure", "disease": "Heart Failure", "drug_name": "Digoxin"},
+    ],
+    DDI_QUERY: [
+        {"drug1": "Digoxin", "drug2": "Furosemide", "interaction": "Adverse interaction"},
+    ],
+}
+
+
+def _rows(query, params=None):
+    return ROWS.get(query, [])
+
+
+def test_async_enrich_matches_sync_enrich():
+    sync_connector = MagicMock()
+    sync_connector.execute_query.side_effect = _rows
+    async_connector = MagicMock()
+    async_connector.execute_query = AsyncMock(side_effect=_rows)
+
+    expected = EnricherOrchestrator(connector=sync_connector).enrich(["heart failure"], ["DB00390", "DB00695"])
+    ctx = asyncio.run(
+        AsyncEnricherOrchestrator(connector=async_connector).enrich(["heart failure"], ["DB00390", "DB00695"])
+    )
+    assert ctx == expected
+    assert async_connector.execute_query.await_count == 5
+
+
+def test_async_enrich_runs_aspects_concurrently():
+    in_flight = {"now": 0, "max": 0}
+
+    async def slow_query(query, params=None):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        return []
+
+    connector = MagicMock()
+    connector.execute_query = slow_query
+    asyncio.run(AsyncEnricherOrchestrator(connector=connector).enrich(["heart failure"], ["DB00390", "DB00695"]))
+    assert in_flight["max"] == 5
+
+
+def test_async_ddi_alerts_skips_query_for_single_drug():
+    connector = MagicMock()
+    connector.execute_query = AsyncMock(return_value=[])
+    assert asyncio.run(AsyncEnricherOrchestrator(connector=connector).ddi_alerts(["DB00390"])) == []
+    connector.execute_query.assert_not_awaited()
+
+
+def test_async_enrich_combined_query_makes_two_round_trips():
+    connector = MagicMock()
+    connector.execute_query = AsyncMock(side_effect=lambda query, params=None: [
+        {"input_dx": "heart failure", "aspect": "indications", "disease": "Heart Failure", "value": "Digoxin"},
+    ] if query == COMBINED_DIAGNOSIS_QUERY else _rows(query))
+
+    ctx = asyncio.run(
+        AsyncEnricherOrchestrator(connector=connector, combined_query=True).enrich(["heart failure"], ["DB00390", "DB00695"])
+    )
+    assert connector.execute_query.await_count == 2
+    assert ctx.indications[0].indicated_drugs == ["Digoxin"]
+    assert ctx.ddi_alerts[0].drug1 == "Digoxin"
+    assert ctx.causal_pathway == []
+
+
+def test_async_enrich_many_packs_rows_into_one_query_per_aspect():
+    connector = MagicMock()
+    connector.execute_query = AsyncMock(side_effect=_rows)
+    enricher = AsyncEnricherOrchestrator(connector=connector)
+
+    contexts = asyncio.run(enricher.enrich_many([(["heart failure"], []), (["Heart failure"], []), ([], [])]))
+    assert connector.execute_query.await_count == 4
+    # Reassembled in the queries' ORDER BY order
+    assert contexts[0].causal_pathway[0].phenotypes == ["dyspnea", "fatigue"]
+    # Same tokens, same rows
+    assert contexts[1] == contexts[0]
+    assert contexts[2].causal_pathway == []
+
+
+def test_concurrent_requests_check_the_graph_version_and_rebuild_the_indexes_once():
+    version_checks = []
+
+    async def query(query, params=None):
+        if query == GRAPH_VERSION_QUERY:
+            version_checks.append(query)
+            await asyncio.sleep(0.01)
+            return [{"version": "v2", "applied_at": None}]
+        return []
+
+    connector = MagicMock()
+    connector.execute_query = query
+    ddi_index = MagicMock(graph_version="v1@None")
+    ddi_index.refresh.side_effect = lambda: setattr(ddi_index, "graph_version", "v2@None")
+    ddi_index.rows.return_value = []
+    disease_index = MagicMock(graph_version="v1@None")
+    disease_index.refresh.side_effect = lambda: setattr(disease_index, "graph_version", "v2@None")
+    disease_index.resolve_specs.return_value = []
+    enricher = AsyncEnricherOrchestrator(connector=connector, ddi_index=ddi_index, disease_index=disease_index,
+                                         use_cache=False)
+
+    async def burst():
+        await asyncio.gather(*(enricher.enrich(["heart failure"], ["DB00390", "DB00695"]) for _ in range(10)))
+
+    asyncio.run(burst())
+    assert len(version_checks) == 1
+    assert ddi_index.refresh.call_count == 1
+    assert disease_index.refresh.call_count == 1
@@ -0,0 +1,163 @@
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.enrichment.cache import MISS, EnrichmentCache
+from src.enrichment.enricher import EnricherOrchestrator
+from src.enrichment.queries import (
+    CAUSAL_PATHWAY_QUERY,
+    COMBINED_DIAGNOSIS_QUERY,
+    DDI_QUERY,
+    GRAPH_VERSION_QUERY,
+    INDICATIONS_QUERY,
+)
+
+# --- EnrichmentCache ---
+
+def test_lru_evicts_least_recently_used():
+    cache = EnrichmentCache(max_entries=2)
+    cache.set("a", [1])
+    cache.set("b", [2])
+    cache.get("a")
+    cache.set("c", [3])
+    assert cache.get("b") is MISS
+    assert cache.get("a") == [1]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    cache = EnrichmentCache(ttl=10)
+    cache.set("a", [])
+    assert cache.get("a") == []
+    now[0] += 11
+    assert cache.get("a") is MISS
+
+
+def test_disk_tier_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache" / "enricher.sqlite")
+    EnrichmentCache(path=path).set("a", [{"disease": "Heart Failure"}])
+
+    other = EnrichmentCache(path=path)
+    assert other.get("a") == [{"disease": "Heart Failure"}]
+    assert other.get("a") == [{"disease": "Heart Failure"}]
+    stats = other.stats()
+    assert (stats["disk_hits"], stats["memory_hits"], stats["hit_rate"]) == (1, 1, 1.0)
+
+    other.clear()
+    assert EnrichmentCache(path=path).get("a") is MISS
+
+
+# --- EnricherOrchestrator caching ---
+
+PHENOTYPES = {"heart failure": ["dyspnea", "fatigue"], "diabetes": ["polyuria"]}
+ADVERSE = {("DB1", "DB2"): "bleeding", ("DB2", "DB3"): "hypotension"}
+
+
+class FakeGraph:
+    """Answers the enrichment queries from small tables, honouring the query parameters."""
+
+    def __init__(self):
+        self.version = "v1"
+        self.queries = []
+
+    def __call__(self, query, params=None, raise_errors=False):
+        if query == GRAPH_VERSION_QUERY:
+            return [{"version": self.version, "applied_at": "2026-01-01T00:00:00Z"}]
+        self.queries.append((query, params))
+        if query == DDI_QUERY:
+            ids = params["drug_ids"]
+            return [
+                {"id1": a, "id2": b, "drug1": a, "drug2": b, "interaction": "Adverse interaction", "ddi_type": text}
+                for (a, b), text in ADVERSE.items() if a in ids and b in ids
+            ]
+        rows = []
+        for spec in params["diagnosis_specs"]:
+            for phenotype in PHENOTYPES.get(spec["input_dx"].lower(), []):
+                row = {"input_dx": spec["input_dx"], "disease": spec["input_dx"].title()}
+                if query == COMBINED_DIAGNOSIS_QUERY:
+                    rows.append({**row, "aspect": "causal_pathway", "value": phenotype})
+                elif query == CAUSAL_PATHWAY_QUERY:
+                    rows.append({**row, "phenotype": phenotype})
+                elif query == INDICATIONS_QUERY:
+                    rows.append({**row, "drug_name": f"drug for {phenotype}"})
+        # Like the queries' ORDER BY input_dx, [aspect,] disease, value
+        return sorted(rows, key=lambda row: [str(value) for value in row.values()])
+
+
+@pytest.fixture
+def graph():
+    return graph_connector(FakeGraph())
+
+
+def graph_connector(fake):
+    connector = MagicMock()
+    connector.execute_query.side_effect = fake
+    connector.fake = fake
+    return connector
+
+
+def _enricher(connector, **kwargs):
+    return EnricherOrchestrator(connector=connector, concurrent=False, cache=EnrichmentCache(), **kwargs)
+
+
+@pytest.mark.parametrize("combined_query", [False, True])
+def test_cached_results_match_uncached(graph, combined_query):
+    args = (["Heart failure", "diabetes", "Heart failure"], ["DB3", "DB1", "DB2"])
+    expected = EnricherOrchestrator(
+        connector=graph, concurrent=False, combined_query=combined_query, use_cache=False,
+    ).enrich(*args)
+    enricher = _enricher(graph, combined_query=combined_query)
+
+    assert enricher.enrich(*args) == expected
+    graph.fake.queries.clear()
+    assert enricher.enrich(*args) == expected
+    assert graph.fake.queries == []
+
+
+def test_only_uncached_diagnoses_and_pairs_are_queried(graph):
+    enricher = _enricher(graph)
+    enricher.enrich(["heart failure"], ["DB1", "DB2"])
+    graph.fake.queries.clear()
+
+    ctx = enricher.enrich(["heart failure", "diabetes"], ["DB1", "DB2", "DB3"])
+    queried = {query: params for query, params in graph.fake.queries}
+    assert [spec["input_dx"] for spec in queried[CAUSAL_PATHWAY_QUERY]["diagnosis_specs"]] == ["diabetes"]
+    assert queried[DDI_QUERY]["drug_ids"] == ["DB1", "DB2", "DB3"]
+    assert [entry.disease for entry in ctx.causal_pathway] == ["Diabetes", "Heart Failure"]
+    assert {(alert.drug1, alert.drug2) for alert in ctx.ddi_alerts} == set(ADVERSE)
+    assert enricher.cache_stats()["memory_hits"] > 0
+
+
+def test_new_graph_version_and_invalidation_bypass_the_cache(graph, monkeypatch):
+    monkeypatch.setattr("src.enrichment.enricher.ENRICHER_CACHE_VERSION_CHECK", 0)
+    enricher = _enricher(graph)
+    enricher.causal_pathway(["diabetes"])
+    enricher.causal_pathway(["diabetes"])
+    assert len(graph.fake.queries) == 1
+
+    graph.fake.version = "v2"
+    enricher.causal_pathway(["diabetes"])
+    assert len(graph.fake.queries) == 2
+    assert enricher.cache_stats()["graph_version"].startswith("v2@")
+
+    enricher.invalidate_cache()
+    enricher.causal_pathway(["diabetes"])
+    assert len(graph.fake.queries) == 3
+
+
+def test_empty_answers_are_cached_but_failures_are_not(graph):
+    enricher = _enricher(graph)
+    assert enricher.causal_pathway(["fracture"]) == []
+    assert enricher.causal_pathway(["fracture"]) == []
+    assert len(graph.fake.queries) == 1
+
+    def failing(query, params=None, raise_errors=False):
+        raise RuntimeError("database unavailable")
+
+    graph.execute_query.side_effect = failing
+    assert enricher.causal_pathway(["diabetes"]) == []
+    graph.execute_query.side_effect = graph.fake
+    assert enricher.causal_pathway(["diabetes"])[0].phenotypes == ["polyuria"]
@@ -0,0 +1,102 @@
+import pytest
+
+from src.enrichment.ddi_index import DDIIndex
+from src.enrichment.enricher import EnricherOrchestrator
+from src.enrichment.queries import ADVERSE_DDI_EDGES_QUERY, DDI_QUERY, GRAPH_VERSION_QUERY
+
+
+def _edge(id1, id2, ddi_type, pattern=None):
+    return {"id1": id1, "id2": id2, "drug1": id1.lower(), "drug2": id2.lower(),
+            "interaction": "Adverse interaction", "ddi_type": ddi_type, "pattern": pattern}
+
+
+EDGES = [
+    _edge("DB2", "DB3", "hypotension"),
+    _edge("DB1", "DB2", "bleeding"),
+    _edge("DB1", "DB2", "bleeding", pattern="reverse"),  # the edge of the other direction
+    _edge("DB3", "DB9", "qt prolongation"),
+]
+
+
+class FakeGraph:
+    def __init__(self):
+        self.version = "v1"
+        self.edges = list(EDGES)
+        self.queries = []
+        self.down = False
+
+    def execute_query(self, query, parameters=None, raise_errors=False):
+        self.queries.append(query)
+        if self.down:
+            # Like Neo4jConnector.execute_query: errors are swallowed unless asked for
+            if raise_errors:
+                raise ConnectionError("Neo4j unavailable")
+            return []
+        if query == GRAPH_VERSION_QUERY:
+            return [{"version": self.version, "applied_at": None}]
+        if query == ADVERSE_DDI_EDGES_QUERY:
+            return self.edges
+        assert query != DDI_QUERY, "DDI pairs must be answered by the index"
+        return []
+
+
+@pytest.fixture
+def graph():
+    return FakeGraph()
+
+
+def test_rows_match_ddi_query_pairs(graph):
+    index = DDIIndex(connector=graph)
+    rows = index.rows(["DB3", "DB1", "DB2", "DB2", "DB404", None])
+    # Pair order like the cached DDI path, every edge of a pair
+    assert [(row["id1"], row["id2"], row["pattern"]) for row in rows] == [
+        ("DB1", "DB2", None), ("DB1", "DB2", "reverse"), ("DB2", "DB3", None),
+    ]
+    assert rows[0] == EDGES[1]
+    assert index.rows(["DB1"]) == [] and index.rows([]) == []
+    assert len(index) == 4
+    assert index.graph_version == "v1@None"
+
+
+def test_enricher_checks_pairs_in_process(graph):
+    index = DDIIndex(connector=graph)
+    enricher = EnricherOrchestrator(connector=graph, concurrent=False, ddi_index=index, use_cache=False)
+    alerts = enricher.ddi_alerts(["DB9", "DB3"])
+    assert [(alert.drug1, alert.drug2, alert.ddi_type) for alert in alerts] == [("db3", "db9", "qt prolongation")]
+    assert graph.queries.count(ADVERSE_DDI_EDGES_QUERY) == 1
+
+
+def test_index_is_rebuilt_when_the_graph_version_changes(graph, monkeypatch):
+    monkeypatch.setattr("src.enrichment.enricher.ENRICHER_CACHE_VERSION_CHECK", 0)
+    index = DDIIndex(connector=graph)
+    enricher = EnricherOrchestrator(connector=graph, concurrent=False, ddi_index=index, use_cache=False)
+    assert enricher.ddi_alerts(["DB1", "DB3"]) == []
+
+    graph.version = "v2"
+    graph.edges.append(_edge("DB1", "DB3", "serotonin syndrome"))
+    assert [alert.ddi_type for alert in enricher.ddi_alerts(["DB1", "DB3"])] == ["serotonin syndrome"]
+    assert index.graph_version == "v2@None"
+    assert graph.queries.count(ADVERSE_DDI_EDGES_QUERY) == 2
+
+
+def test_failed_read_is_an_error_not_an_empty_index(graph, monkeypatch):
+    monkeypatch.setattr("src.enrichment.enricher.ENRICHER_CACHE_VERSION_CHECK", 0)
+    graph.down = True
+    with pytest.raises(ConnectionError):
+        DDIIndex(connector=graph).refresh()
+
+    graph.down = False
+    index = DDIIndex(connector=graph)
+    enricher = EnricherOrchestrator(connector=graph, concurrent=False, ddi_index=index, use_cache=False)
+    assert [alert.ddi_type for alert in enricher.ddi_alerts(["DB1", "DB2"])] == ["bleeding", "bleeding"]
+
+    # The version read fails too, so the index looks stale and its rebuild must fail loudly
+    graph.down = True
+    with pytest.raises(ConnectionError):
+        enricher.ddi_alerts(["DB1", "DB2"])
+    assert index.graph_version == "v1@None"
+
+    graph.down = False
+    graph.version = "v2"
+    assert [alert.ddi_type for alert in enricher.ddi_alerts(["DB1", "DB2"])] == ["bleeding", "bleeding"]
+    assert index.graph_version == "v2@None"
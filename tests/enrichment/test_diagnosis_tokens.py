@@ -1,4 +1,4 @@
-from src.enrichment.diagnosis_tokens import build_diagnosis_specs, tokenize_diagnosis
+from src.enrichment.diagnosis_tokens import build_diagnosis_specs, fulltext_query, tokenize_diagnosis
 
 
 def test_tokenize_long_mimic_style_diagnosis():
@@ -18,3 +18,9 @@ def test_build_diagnosis_specs_preserves_input_dx():
     assert specs[0]["input_dx"] == "Heart Failure"
     assert "heart" in specs[0]["tokens"]
     assert "failure" in specs[0]["tokens"]
+
+
+def test_fulltext_query_prefixes_words_and_ors_tokens():
+    assert fulltext_query(["heart failure", "renal"]) == "(heart* AND failure*) OR (renal*)"
+    assert fulltext_query(["c++ (nos)"]) == "(c* AND nos*)"
+    assert fulltext_query(["--"]) == ""
@@ -0,0 +1,140 @@
+from unittest.mock import DEFAULT, MagicMock
+
+import pytest
+
+from src.enrichment.disease_index import DISEASE_NAMES_QUERY, DiseaseNameIndex
+from src.enrichment.enricher import EnricherOrchestrator
+from src.enrichment.queries import GRAPH_VERSION_QUERY, RESOLVED_ASPECT_QUERIES, RESOLVED_COMBINED_DIAGNOSIS_QUERY
+
+DISEASES = [
+    {"id": "5044", "name": "Heart Failure"},
+    {"id": "5045", "name": "Congestive Heart Failure"},
+    {"id": "7211", "name": "Type 2 Diabetes Mellitus"},
+    {"id": "9001", "name": "Diabetes Insipidus"},
+    {"id": "1234", "name": "Essential Hypertension"},
+    {"id": "4321", "name": None},
+]
+
+
+@pytest.fixture
+def connector():
+    """Answers the version query with ``connector.version``, every other query with ``return_value``."""
+    connector = MagicMock()
+    connector.version = "v1"
+    connector.execute_query.side_effect = lambda query, params=None, raise_errors=False: (
+        [{"version": connector.version, "applied_at": None}] if query == GRAPH_VERSION_QUERY else DEFAULT
+    )
+    connector.execute_query.return_value = DISEASES
+    return connector
+
+
+def _sent(connector, query=None):
+    queries = [c.args[0] for c in connector.execute_query.call_args_list]
+    return queries if query is None else [sent for sent in queries if sent == query]
+
+
+@pytest.fixture
+def index(connector):
+    return DiseaseNameIndex(connector=connector)
+
+
+@pytest.mark.parametrize("token", ["heart", "failure", "diabetes", "tension", "rt fa", "mellitus", "xyz", "ab", "e"])
+def test_lookup_matches_contains(index, token):
+    expected = {row["id"] for row in DISEASES if token in (row["name"] or "").lower()}
+    assert index.lookup(token) == expected
+
+
+def test_resolve_specs_adds_ids_and_drops_unmatched(index):
+    specs = index.resolve_specs(["Heart failure with reduced EF", "Fracture of femur", ""])
+    assert len(specs) == 1
+    assert specs[0]["input_dx"] == "Heart failure with reduced EF"
+    assert specs[0]["disease_ids"] == ["5044", "5045"]
+
+
+def test_index_builds_once_and_refreshes_on_demand(index, connector):
+    index.lookup("heart")
+    index.lookup("diabetes")
+    assert len(_sent(connector, DISEASE_NAMES_QUERY)) == 1
+    assert len(index) == 6
+    assert index.graph_version == "v1@None"
+
+    connector.execute_query.return_value = DISEASES + [{"id": "5046", "name": "Right Heart Failure"}]
+    assert index.refresh() == 7
+    assert index.lookup("right heart") == {"5046"}
+
+
+def test_failed_read_raises_and_keeps_the_previous_index(index, connector):
+    index.refresh()
+
+    def unavailable(query, params=None, raise_errors=False):
+        # Like Neo4jConnector.execute_query: errors are swallowed unless asked for
+        if raise_errors:
+            raise ConnectionError("Neo4j unavailable")
+        return []
+
+    connector.execute_query.side_effect = unavailable
+    with pytest.raises(ConnectionError):
+        index.refresh()
+    assert index.graph_version == "v1@None"
+    assert index.lookup("heart failure") == {"5044", "5045"}
+
+    with pytest.raises(ConnectionError):
+        DiseaseNameIndex(connector=connector).lookup("heart failure")
+
+
+def test_enricher_queries_resolved_ids(index, connector):
+    enricher = EnricherOrchestrator(connector=connector, concurrent=False, disease_index=index)
+    connector.execute_query.return_value = []
+    index.refresh()  # with no diseases nothing can match, so no aspect query is sent
+    connector.execute_query.reset_mock()
+    assert enricher.indications(["heart failure"]) == []
+    assert _sent(connector) == [GRAPH_VERSION_QUERY]
+
+    connector.execute_query.return_value = DISEASES
+    index.refresh()
+    connector.execute_query.return_value = [
+        {"input_dx": "heart failure", "disease": "Heart Failure", "drug_name": "Digoxin"},
+    ]
+    result = enricher.indications(["heart failure"])
+    query, params = connector.execute_query.call_args.args
+    assert query == RESOLVED_ASPECT_QUERIES["indications"]
+    assert params["diagnosis_specs"][0]["disease_ids"] == ["5044", "5045"]
+    assert result[0].indicated_drugs == ["Digoxin"]
+
+
+def test_combined_enricher_queries_resolved_ids(index, connector):
+    enricher = EnricherOrchestrator(connector=connector, concurrent=False, combined_query=True, disease_index=index)
+    index.refresh()
+    connector.execute_query.return_value = []
+    enricher.enrich(["diabetes"], [])
+    query, params = connector.execute_query.call_args.args
+    assert query == RESOLVED_COMBINED_DIAGNOSIS_QUERY
+    assert params["diagnosis_specs"][0]["disease_ids"] == ["7211", "9001"]
+
+
+def test_index_is_rebuilt_when_the_graph_version_changes(index, connector, monkeypatch):
+    monkeypatch.setattr("src.enrichment.enricher.ENRICHER_CACHE_VERSION_CHECK", 0)
+    enricher = EnricherOrchestrator(connector=connector, concurrent=False, disease_index=index)
+    index.refresh()
+    connector.execute_query.return_value = []
+    enricher.indications(["right heart failure"])
+    assert len(_sent(connector, DISEASE_NAMES_QUERY)) == 1
+
+    connector.version = "v2"
+    connector.execute_query.return_value = DISEASES + [{"id": "5046", "name": "Right Heart Failure"}]
+    enricher._check_graph_version()
+    assert len(_sent(connector, DISEASE_NAMES_QUERY)) == 2
+    assert index.graph_version == "v2@None"
+    assert index.lookup("right heart") == {"5046"}
+
+
+def test_index_of_given_rows_is_never_stale(monkeypatch):
+    monkeypatch.setattr("src.enrichment.enricher.ENRICHER_CACHE_VERSION_CHECK", 0)
+    connector = MagicMock()
+    connector.execute_query.return_value = [{"version": "v2", "applied_at": None}]
+    index = DiseaseNameIndex(rows=DISEASES)
+    enricher = EnricherOrchestrator(connector=connector, concurrent=False, disease_index=index)
+    assert index.refresh() == 6
+    enricher._check_graph_version()
+    assert index.graph_version is None
+    assert len(index) == 6
@@ -1,7 +1,21 @@
+import threading
 from unittest.mock import MagicMock
 import pytest
 
+from src.enrichment.cache import EnrichmentCache
 from src.enrichment.enricher import EnricherOrchestrator
+from src.enrichment.queries import (
+    CAUSAL_PATHWAY_QUERY,
+    COMORBID_DISEASES_QUERY,
+    INDICATIONS_QUERY,
+    CONTRAINDICATIONS_QUERY,
+    COMBINED_DIAGNOSIS_QUERY,
+    DDI_QUERY,
+    DDI_PAIRS_QUERY,
+    FULLTEXT_ASPECT_QUERIES,
+    FULLTEXT_COMBINED_DIAGNOSIS_QUERY,
+    GRAPH_VERSION_QUERY,
+)
 from src.enrichment.schema import (
     CausalPathwayEntry,
     ComorbidDiseaseEntry,
@@ -135,3 +149,256 @@ def test_enrich_to_dict_has_all_keys(enricher, mock_connector):
         "causal_pathway", "comorbid_diseases", "indications",
         "contraindications", "ddi_alerts"
     }
+
+
+# --- concurrency ---
+
+def _rows_for(query, params):
+    if "drug_ids" in params:
+        return [{"drug1": "Warfarin", "drug2": "Aspirin", "interaction": "bleeding risk"}]
+    return [{"input_dx": "heart failure", "disease": "Heart Failure", "phenotype": "fatigue",
+             "related": "Hypertension", "drug_name": "Furosemide"}]
+
+
+def test_enrich_concurrent_matches_sequential():
+    connector = MagicMock()
+    connector.execute_query.side_effect = _rows_for
+    concurrent = EnricherOrchestrator(connector=connector)
+    sequential = EnricherOrchestrator(connector=connector, concurrent=False)
+
+    diagnoses, drug_ids = ["heart failure"], ["DB00682", "DB00945"]
+    assert concurrent.enrich(diagnoses, drug_ids) == sequential.enrich(diagnoses, drug_ids)
+    concurrent.close()
+
+
+def test_enrich_runs_aspects_concurrently():
+    barrier = threading.Barrier(5, timeout=5)
+
+    def wait_for_all(query, params):
+        # Only passes once all five aspect queries are in flight together
+        barrier.wait()
+        return _rows_for(query, params)
+
+    connector = MagicMock()
+    connector.execute_query.side_effect = wait_for_all
+    enricher = EnricherOrchestrator(connector=connector)
+    ctx = enricher.enrich(["heart failure"], ["DB00682", "DB00945"])
+    enricher.close()
+
+    assert connector.execute_query.call_count == 5
+    assert ctx.ddi_alerts[0].interaction == "bleeding risk"
+    assert ctx.causal_pathway[0].phenotypes == ["fatigue"]
+
+
+def test_enrich_sequential_runs_on_calling_thread():
+    threads = set()
+
+    def record_thread(query, params):
+        threads.add(threading.get_ident())
+        return []
+
+    connector = MagicMock()
+    connector.execute_query.side_effect = record_thread
+    EnricherOrchestrator(connector=connector, concurrent=False).enrich(["heart failure"], ["DB00682", "DB00945"])
+    assert threads == {threading.get_ident()}
+
+
+# --- combined query ---
+
+ASPECT_ROWS = {
+    CAUSAL_PATHWAY_QUERY: ("causal_pathway", "phenotype", [("Heart Failure", "dyspnea"), ("Heart Failure", "fatigue")]),
+    COMORBID_DISEASES_QUERY: ("comorbid_diseases", "related", [("Heart Failure", "Hypertension")]),
+    INDICATIONS_QUERY: ("indications", "drug_name", [("Heart Failure", "Digoxin"), ("Heart Failure", "Furosemide")]),
+    CONTRAINDICATIONS_QUERY: ("contraindications", "drug_name", [("Heart Failure", "Dronedarone")]),
+}
+
+
+def _single_or_combined_rows(query, params):
+    if query == COMBINED_DIAGNOSIS_QUERY:
+        return [
+            {"input_dx": "heart failure", "aspect": aspect, "disease": disease, "value": value}
+            for aspect, _, pairs in sorted(ASPECT_ROWS.values())
+            for disease, value in pairs
+        ]
+    if query in ASPECT_ROWS:
+        _, column, pairs = ASPECT_ROWS[query]
+        return [{"input_dx": "heart failure", "disease": disease, column: value} for disease, value in pairs]
+    return _rows_for(query, params)
+
+
+@pytest.mark.parametrize("concurrent", [True, False])
+def test_enrich_combined_query_matches_per_aspect_queries(concurrent):
+    connector = MagicMock()
+    connector.execute_query.side_effect = _single_or_combined_rows
+    per_aspect = EnricherOrchestrator(connector=connector, concurrent=False)
+    combined = EnricherOrchestrator(connector=connector, concurrent=concurrent, combined_query=True)
+
+    diagnoses, drug_ids = ["heart failure"], ["DB00682", "DB00945"]
+    expected = per_aspect.enrich(diagnoses, drug_ids)
+    connector.execute_query.reset_mock()
+    assert combined.enrich(diagnoses, drug_ids) == expected
+    combined.close()
+
+    # One combined diagnosis query plus the DDI query
+    queries = [call.args[0] for call in connector.execute_query.call_args_list]
+    assert len(queries) == 2
+    assert set(queries) == {COMBINED_DIAGNOSIS_QUERY, DDI_QUERY}
+
+
+def test_enrich_combined_query_passes_per_aspect_limits(mock_connector):
+    mock_connector.execute_query.return_value = []
+    enricher = EnricherOrchestrator(
+        connector=mock_connector, concurrent=False, combined_query=True,
+        limit_phenotypes=3, limit_comorbid=4, limit_indications=5, limit_contraindications=6,
+    )
+    ctx = enricher.enrich(["heart failure"], [])
+
+    assert ctx == MedicalKnowledgeContext()
+    query, params = mock_connector.execute_query.call_args.args
+    assert query == COMBINED_DIAGNOSIS_QUERY
+    assert params["limit_causal_pathway"] == 3
+    assert params["limit_comorbid_diseases"] == 4
+    assert params["limit_indications"] == 5
+    assert params["limit_contraindications"] == 6
+
+
+# --- full-text matching ---
+
+def test_fulltext_mode_sends_lucene_queries(mock_connector):
+    mock_connector.execute_query.return_value = []
+    enricher = EnricherOrchestrator(connector=mock_connector, concurrent=False, fulltext=True)
+    enricher.indications(["Heart failure", "--"])
+
+    query, params = mock_connector.execute_query.call_args.args
+    assert query == FULLTEXT_ASPECT_QUERIES["indications"]
+    # "--" has no words to search for, so its spec is dropped
+    assert [spec["fulltext"] for spec in params["diagnosis_specs"]] == ["(heart*) OR (failure*)"]
+
+
+def test_fulltext_mode_combined_query(mock_connector):
+    mock_connector.execute_query.return_value = []
+    EnricherOrchestrator(
+        connector=mock_connector, concurrent=False, combined_query=True, fulltext=True,
+    ).enrich(["diabetes"], [])
+    assert mock_connector.execute_query.call_args.args[0] == FULLTEXT_COMBINED_DIAGNOSIS_QUERY
+
+
+# --- many rows per query ---
+
+GRAPH = {
+    "Heart Failure": {"causal_pathway": ["dyspnea", "fatigue", "edema"], "indications": ["Furosemide"]},
+    "Congestive Heart Failure": {"causal_pathway": ["orthopnea"], "contraindications": ["Dronedarone"]},
+    "Type 2 Diabetes Mellitus": {"comorbid_diseases": ["Obesity"], "indications": ["Metformin", "Insulin"]},
+}
+GRAPH_DDI = {("DB1", "DB2"): ["bleeding", "bruising"], ("DB2", "DB3"): ["hypotension"]}
+COLUMNS = {"causal_pathway": "phenotype", "comorbid_diseases": "related",
+           "indications": "drug_name", "contraindications": "drug_name"}
+QUERY_ASPECTS = {CAUSAL_PATHWAY_QUERY: "causal_pathway", COMORBID_DISEASES_QUERY: "comorbid_diseases",
+                 INDICATIONS_QUERY: "indications", CONTRAINDICATIONS_QUERY: "contraindications"}
+
+
+def _graph_rows(query, params=None, raise_errors=False):
+    """Answers the aspect, combined and DDI queries from GRAPH like Neo4j would, LIMIT per spec included."""
+    if query == GRAPH_VERSION_QUERY:
+        return []
+    if query in (DDI_QUERY, DDI_PAIRS_QUERY):
+        if query == DDI_QUERY:
+            ids = params["drug_ids"]
+            pairs = [(a, b) for a in ids for b in ids if a < b]
+        else:
+            pairs = [tuple(pair) for pair in params["pairs"]]
+        return [{"id1": a, "id2": b, "drug1": a, "drug2": b, "interaction": "Adverse interaction", "ddi_type": t}
+                for a, b in pairs for t in GRAPH_DDI.get((a, b), [])]
+
+    aspects = list(COLUMNS) if query == COMBINED_DIAGNOSIS_QUERY else [QUERY_ASPECTS[query]]
+    rows = []
+    for spec in params["diagnosis_specs"]:
+        for aspect in aspects:
+            limit = params.get("limit", params.get(f"limit_{aspect}"))
+            matched = [
+                {"input_dx": spec["input_dx"], "aspect": aspect, "disease": disease, "value": value}
+                for disease, values in GRAPH.items()
+                if any(token in disease.lower() for token in spec["tokens"])
+                for value in values.get(aspect, [])
+            ]
+            rows.extend(matched[:limit])
+    rows.sort(key=lambda row: (row["input_dx"], row["aspect"], row["disease"], row["value"]))
+    if query == COMBINED_DIAGNOSIS_QUERY:
+        return rows
+    column = COLUMNS[aspects[0]]
+    return [{"input_dx": row["input_dx"], "disease": row["disease"], column: row["value"]} for row in rows]
+
+
+BATCH = [
+    (["Heart failure", "diabetes"], ["DB3", "DB1", "DB2"]),
+    ([], ["DB1"]),
+    (["heart failure", "Heart failure"], ["DB2", "DB1", "DB2"]),
+    (["diabetes mellitus"], []),
+    (["fracture"], ["DB3", "DB2"]),
+]
+
+
+@pytest.mark.parametrize("combined_query", [False, True])
+@pytest.mark.parametrize("cached", [False, True])
+def test_enrich_many_matches_per_row_enrich(combined_query, cached):
+    connector = MagicMock()
+    connector.execute_query.side_effect = _graph_rows
+
+    def orchestrator():
+        return EnricherOrchestrator(
+            connector=connector, concurrent=False, combined_query=combined_query, limit_phenotypes=2,
+            cache=EnrichmentCache() if cached else None, use_cache=cached,
+        )
+
+    expected = [orchestrator().enrich(diagnoses, drug_ids) for diagnoses, drug_ids in BATCH]
+    connector.execute_query.reset_mock()
+    assert orchestrator().enrich_many(BATCH) == expected
+
+    calls = [call.args for call in connector.execute_query.call_args_list if call.args[0] != GRAPH_VERSION_QUERY]
+    assert len(calls) == (2 if combined_query else 5)
+    specs = calls[0][1]["diagnosis_specs"]
+    # Each distinct diagnosis once for the whole batch
+    assert [spec["input_dx"] for spec in specs] == ["Heart failure", "diabetes", "heart failure", "diabetes mellitus",
+                                                    "fracture"]
+
+
+def test_enrich_many_concurrent():
+    connector = MagicMock()
+    connector.execute_query.side_effect = _graph_rows
+    enricher = EnricherOrchestrator(connector=connector)
+    expected = [enricher.enrich(diagnoses, drug_ids) for diagnoses, drug_ids in BATCH]
+    assert enricher.enrich_many(BATCH) == expected
+    assert enricher.enrich_many([]) == []
+    enricher.close()
+
+
+@pytest.mark.parametrize("combined_query", [False, True])
+def test_prefetch_resolves_each_distinct_input_once(combined_query):
+    connector = MagicMock()
+    connector.execute_query.side_effect = _graph_rows
+    per_row = EnricherOrchestrator(
+        connector=connector, concurrent=False, combined_query=combined_query, cache=EnrichmentCache(),
+    )
+    expected = [per_row.enrich(*row) for row in BATCH]
+    enricher = EnricherOrchestrator(
+        connector=connector, concurrent=False, combined_query=combined_query, cache=EnrichmentCache(),
+    )
+    connector.execute_query.reset_mock()
+
+    diagnoses = [dx for row_diagnoses, _ in BATCH for dx in row_diagnoses]
+    pairs = [(a, b) for _, ids in BATCH for a in ids for b in ids if a != b]
+    counts = enricher.prefetch(diagnoses, pairs, chunk_size=2)
+    # "Heart failure" and "heart failure" normalize to one spec; pairs are unordered
+    assert counts == {"diagnoses": 5, "specs": 4, "drug_pairs": 3}
+    data_calls = [call.args for call in connector.execute_query.call_args_list if call.args[0] != GRAPH_VERSION_QUERY]
+    sent = [spec["input_dx"] for _, params in data_calls if "diagnosis_specs" in params for spec in params["diagnosis_specs"]]
+    assert len(sent) == 4 * (1 if combined_query else 4)
+
+    connector.execute_query.reset_mock()
+    assert [enricher.enrich(*row) for row in BATCH] == expected
+    assert all(call.args[0] == GRAPH_VERSION_QUERY for call in connector.execute_query.call_args_list)
+
+
+def test_prefetch_needs_a_cache(mock_connector):
+    with pytest.raises(ValueError):
+        EnricherOrchestrator(connector=mock_connector, use_cache=False).prefetch(["heart failure"], [])
@@ -0,0 +1,113 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from src.enrichment.sharding import ShardManifest, merge_parts, plan_shards, run_shards
+
+
+def _write_shard(frame, path):
+    """Writes one line per row; fails once for rows flagged with a marker file that does not exist yet."""
+    for marker in frame["fail_once"].dropna():
+        if not os.path.exists(marker):
+            open(marker, "w").close()
+            raise RuntimeError("transient failure")
+    with open(path, "w", encoding="utf-8") as out:
+        for value in frame["value"]:
+            out.write(json.dumps({"value": int(value)}) + "\n")
+
+
+def _die_once(frame, path):
+    """Like _write_shard, but the worker process dies instead of raising."""
+    for marker in frame["fail_once"].dropna():
+        if not os.path.exists(marker):
+            open(marker, "w").close()
+            os._exit(1)
+    _write_shard(frame, path)
+
+
+def _always_fail(frame, path):
+    raise RuntimeError("broken shard")
+
+
+@pytest.fixture
+def input_file(tmp_path):
+    path = tmp_path / "input.csv"
+    frame = pd.DataFrame({"value": range(23), "fail_once": [None] * 23})
+    frame.loc[12, "fail_once"] = str(tmp_path / "failed-once")
+    frame.to_csv(path, index=False)
+    return str(path)
+
+
+def test_plan_shards_covers_every_row():
+    assert plan_shards(23, 10) == [(0, 10), (10, 20), (20, 23)]
+    assert plan_shards(0, 10) == []
+
+
+def test_shards_run_in_workers_retry_and_merge_in_order(input_file, tmp_path):
+    frame = pd.read_csv(input_file)
+    finished = []
+    manifest = run_shards(
+        frame, input_file, str(tmp_path / "parts"), _write_shard, workers=2, shard_rows=5,
+        on_shard_done=lambda shard: finished.append(shard["shard"]),
+    )
+
+    assert sorted(finished) == [0, 1, 2, 3, 4]
+    assert manifest.pending() == []
+    assert [shard["attempts"] for shard in manifest.shards] == [1, 1, 2, 1, 1]
+
+    output = str(tmp_path / "out.jsonl")
+    assert merge_parts(manifest, output) == 23
+    with open(output, encoding="utf-8") as handle:
+        assert [json.loads(line)["value"] for line in handle] == list(range(23))
+
+
+def test_dead_worker_breaks_the_pool_and_its_shards_run_in_a_new_one(input_file, tmp_path):
+    frame = pd.read_csv(input_file)
+    manifest = run_shards(frame, input_file, str(tmp_path / "parts"), _die_once, workers=2, shard_rows=5)
+
+    assert manifest.pending() == []
+    assert manifest.shards[2]["attempts"] == 2
+    assert merge_parts(manifest, str(tmp_path / "out.jsonl")) == 23
+
+
+def test_failed_shards_are_recorded_and_rerun_alone(input_file, tmp_path):
+    frame = pd.read_csv(input_file)
+    parts = str(tmp_path / "parts")
+    run_shards(frame, input_file, parts, _write_shard, workers=2, shard_rows=10)
+    # Lose one part: only that shard is redone on the next run
+    os.remove(os.path.join(parts, "part-00001.jsonl"))
+    manifest = run_shards(frame, input_file, parts, _always_fail, workers=2, shard_rows=10, retries=1)
+
+    assert [shard["status"] for shard in manifest.shards] == ["done", "failed", "done"]
+    assert manifest.shards[1]["error"] == "broken shard"
+    with pytest.raises(RuntimeError):
+        merge_parts(manifest, str(tmp_path / "out.jsonl"))
+
+    manifest = run_shards(frame, input_file, parts, _write_shard, workers=2, shard_rows=10)
+    assert manifest.pending() == []
+    assert merge_parts(manifest, str(tmp_path / "out.jsonl")) == 23
+
+
+def test_manifest_of_another_shard_size_starts_over(input_file, tmp_path):
+    manifest = ShardManifest(str(tmp_path / "parts"))
+    assert manifest.start(input_file, 23, 10) is False
+    manifest.update(0, status="done")
+    assert ShardManifest(manifest.parts_dir).start(input_file, 23, 10) is True
+    assert ShardManifest(manifest.parts_dir).start(input_file, 23, 5) is False
+
+
+def test_chunked_rows_need_their_count_and_shard_alignment(input_file, tmp_path):
+    parts = str(tmp_path / "parts")
+    with pytest.raises(ValueError):
+        run_shards(pd.read_csv(input_file, chunksize=5), input_file, parts, _write_shard, workers=2, shard_rows=5)
+    with pytest.raises(ValueError):
+        run_shards(pd.read_csv(input_file, chunksize=7), input_file, parts, _write_shard, workers=2,
+                   shard_rows=5, total_rows=23, resume=False)
+
+    manifest = run_shards(pd.read_csv(input_file, chunksize=5), input_file, parts, _write_shard, workers=2,
+                          shard_rows=5, total_rows=23, resume=False)
+    assert merge_parts(manifest, str(tmp_path / "out.jsonl")) == 23
+    with open(tmp_path / "out.jsonl", encoding="utf-8") as handle:
+        assert [json.loads(line)["value"] for line in handle] == list(range(23))
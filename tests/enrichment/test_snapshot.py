@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import sqlite3
+
+import pytest
+
+from src.enrichment import enricher as enricher_module
+from src.enrichment.async_enricher import AsyncEnricherOrchestrator
+from src.enrichment.disease_index import DISEASE_NAMES_QUERY
+from src.enrichment.enricher import EnricherOrchestrator
+from src.enrichment.queries import ADVERSE_DDI_EDGES_QUERY, GRAPH_VERSION_QUERY, SNAPSHOT_ASPECT_QUERIES
+from src.enrichment.snapshot import EnrichmentSnapshot, build_snapshot
+
+DISEASES = {
+    "5044": "Heart Failure",
+    "5045": "Congestive Heart Failure",
+    "7211": "Type 2 Diabetes Mellitus",
+}
+VALUES = {
+    "causal_pathway": {"5044": ["fatigue", "dyspnea", "edema"], "5045": ["orthopnea"]},
+    "comorbid_diseases": {"7211": ["Obesity"]},
+    "indications": {"5044": ["Furosemide"], "7211": ["Metformin", "Insulin"]},
+    "contraindications": {},
+}
+DDI = [
+    {"id1": "DB1", "id2": "DB2", "drug1": "Warfarin", "drug2": "Aspirin",
+     "interaction": "Adverse interaction", "ddi_type": "bleeding", "pattern": None},
+]
+
+
+class FakeConnector:
+    """Answers the snapshot build queries from the tables above."""
+
+    def execute_query(self, query, parameters=None, raise_errors=False):
+        assert query == GRAPH_VERSION_QUERY
+        return [{"version": "v1", "applied_at": "2026-01-01T00:00:00Z"}]
+
+    def stream_query(self, query, parameters=None, fetch_size=1000):
+        if query == DISEASE_NAMES_QUERY:
+            return iter([{"id": id_, "name": name} for id_, name in DISEASES.items()])
+        if query == ADVERSE_DDI_EDGES_QUERY:
+            return iter(DDI)
+        aspect = next(aspect for aspect, q in SNAPSHOT_ASPECT_QUERIES.items() if q == query)
+        return iter([
+            {"id": id_, "values": sorted(values)[:parameters["limit"]]}
+            for id_, values in VALUES[aspect].items()
+        ])
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    path = str(tmp_path / "snapshot.sqlite")
+    summary = build_snapshot(path, connector=FakeConnector(), limits={"causal_pathway": 2})
+    assert summary["diseases"] == 3
+    assert summary["ddi_pairs"] == 1
+    assert summary["limits"]["causal_pathway"] == 2
+    return path
+
+
+@pytest.fixture
+def enricher(snapshot_path, monkeypatch):
+    # Serving from the snapshot must not need a Neo4j connector
+    monkeypatch.setattr(enricher_module, "get_connector", lambda: pytest.fail("connector requested"))
+    return EnricherOrchestrator(snapshot=EnrichmentSnapshot(snapshot_path), limit_phenotypes=2)
+
+
+def test_snapshot_answers_every_aspect(enricher):
+    ctx = enricher.enrich(["heart failure", "diabetes"], ["DB2", "DB1", "DB9"]).to_dict()
+    assert ctx["causal_pathway"] == [
+        {"disease": "Congestive Heart Failure", "phenotypes": ["orthopnea"]},
+        {"disease": "Heart Failure", "phenotypes": ["dyspnea"]},
+    ]
+    assert ctx["comorbid_diseases"] == [{"disease": "Type 2 Diabetes Mellitus", "related": ["Obesity"]}]
+    # Ordered by input diagnosis first, like the queries
+    assert [entry["disease"] for entry in ctx["indications"]] == ["Type 2 Diabetes Mellitus", "Heart Failure"]
+    assert ctx["contraindications"] == []
+    assert [(alert["drug1"], alert["drug2"]) for alert in ctx["ddi_alerts"]] == [("Warfarin", "Aspirin")]
+
+
+def test_single_aspects_match_enrich(enricher):
+    ctx = enricher.enrich(["diabetes mellitus"], [])
+    assert enricher.indications(["diabetes mellitus"]) == ctx.indications
+    assert ctx.indications[0].indicated_drugs == ["Insulin", "Metformin"]
+    assert enricher.ddi_alerts(["DB1"]) == []
+
+
+def test_async_orchestrator_serves_from_snapshot(snapshot_path):
+    enricher = AsyncEnricherOrchestrator(snapshot=EnrichmentSnapshot(snapshot_path), limit_phenotypes=2)
+    ctx = asyncio.run(enricher.enrich(["congestive"], []))
+    assert [entry.disease for entry in ctx.causal_pathway] == ["Congestive Heart Failure"]
+    asyncio.run(enricher.close())
+
+
+def test_larger_limits_than_the_snapshot_warn(snapshot_path, caplog):
+    with caplog.at_level(logging.WARNING):
+        EnricherOrchestrator(snapshot=EnrichmentSnapshot(snapshot_path), limit_phenotypes=10)
+    assert "keeps 2 causal_pathway values per disease" in caplog.text
+
+
+def test_snapshot_is_read_only_and_validated(snapshot_path, tmp_path):
+    snapshot = EnrichmentSnapshot(snapshot_path)
+    assert (len(snapshot), snapshot.graph_version) == (3, "v1@2026-01-01T00:00:00Z")
+
+    other = tmp_path / "other.sqlite"
+    sqlite3.connect(other).execute("CREATE TABLE t (x)")
+    with pytest.raises(ValueError):
+        EnrichmentSnapshot(str(other))
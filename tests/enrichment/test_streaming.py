@@ -0,0 +1,77 @@
+import gzip
+import json
+
+import pandas as pd
+import pytest
+
+from src.enrichment import streaming
+
+
+def test_list_columns_are_parsed_per_distinct_value(monkeypatch):
+    chunk = pd.DataFrame({"diagnose": ["['Heart Failure', 'Asthma']", "Asthma ", None, "['Heart Failure', 'Asthma']", ""]})
+    parsed_values = []
+    parse = streaming.parse_list_cell
+    monkeypatch.setattr(streaming, "parse_list_cell", lambda value: parsed_values.append(value) or parse(value))
+
+    rows = streaming.parse_list_column(chunk, "diagnose")
+    assert rows == [["Heart Failure", "Asthma"], ["Asthma"], [], ["Heart Failure", "Asthma"], []]
+    assert parsed_values == ["['Heart Failure', 'Asthma']", "Asthma ", ""]
+    assert streaming.parse_list_column(chunk, "drugbank_id") == [[]] * 5
+
+
+def test_chunk_records_are_plain_values():
+    frame = pd.DataFrame({"id": [1, 2], "age": pd.array([40, None], dtype="Int64"), "bmi": [21.5, 30.0],
+                          "note": ["ü", None]})
+    assert streaming.chunk_records(frame) == [
+        {"id": 1, "age": 40, "bmi": 21.5, "note": "ü"},
+        {"id": 2, "age": None, "bmi": 30.0, "note": None},
+    ]
+    assert type(streaming.chunk_records(frame)[0]["age"]) is int
+    assert streaming.encode_line({"note": "ü", "age": None}) == '{"note":"ü","age":null}\n'.encode("utf-8")
+
+
+def test_column_dtypes_are_fixed_over_the_whole_file(tmp_path):
+    csv_file = str(tmp_path / "rows.csv")
+    pd.DataFrame({
+        "age": [40, 41, 42, None],          # gap only in the second chunk
+        "bmi": [21.0, 22.0, 23.0, 24.5],    # fraction only in the second chunk
+        "code": [1, 2, 3, "A7"],             # string only in the second chunk
+        "empty": [None] * 4,
+    }).to_csv(csv_file, index=False)
+
+    total_rows, dtype = streaming.scan_csv(csv_file, chunk_rows=2)
+    assert total_rows == 4
+    assert dtype == {"age": "Int64", "bmi": "float64", "code": "object", "empty": "object"}
+
+    rows = [record for chunk in streaming.read_csv_chunks(csv_file, 2, dtype)
+            for record in streaming.chunk_records(chunk)]
+    assert [row["age"] for row in rows] == [40, 41, 42, None]
+    assert [row["bmi"] for row in rows] == [21.0, 22.0, 23.0, 24.5]
+    assert [row["code"] for row in rows] == ["1", "2", "3", "A7"]
+    assert [row["empty"] for row in rows] == [None] * 4
+
+
+def test_csv_streams_into_compressed_jsonl(tmp_path):
+    csv_file = str(tmp_path / "rows.csv")
+    pd.DataFrame({"id": range(25), "age": [None if i % 10 == 3 else i for i in range(25)]}).to_csv(csv_file, index=False)
+    total_rows, dtype = streaming.scan_csv(csv_file, chunk_rows=7)
+    assert total_rows == 25
+
+    output = str(tmp_path / "rows.jsonl.gz")
+    assert streaming.compression_for(output) == "gzip"
+    with streaming.open_jsonl(output, streaming.compression_for(output), buffer_size=64) as out:
+        for chunk in streaming.read_csv_chunks(csv_file, 10, dtype):
+            streaming.write_records(out, streaming.chunk_records(chunk))
+
+    with gzip.open(output, "rt", encoding="utf-8") as handle:
+        rows = [json.loads(line) for line in handle]
+    assert [row["age"] for row in rows] == [None if i % 10 == 3 else i for i in range(25)]
+
+
+def test_unknown_or_unavailable_compression(tmp_path, monkeypatch):
+    assert streaming.compression_for("out.jsonl") is None
+    with pytest.raises(ValueError):
+        streaming.open_jsonl(str(tmp_path / "out.jsonl.bz2"), "bzip2")
+    monkeypatch.setattr(streaming, "zstandard", None)
+    with pytest.raises(ImportError):
+        streaming.open_jsonl(str(tmp_path / "out.jsonl.zst"), "zstd")
@@ -0,0 +1,54 @@
+import pandas as pd
+
+from src.etl.bulk_export import export_import_csv
+
+
+def _write_kg_csv(path):
+    rows = [
+        ("indication", "indication", 1, "drug", "aspirin", "DrugBank", 10, "disease", "pain", "MONDO"),
+        ("indication", "indication", 1, "drug", "aspirin", "DrugBank", 10, "disease", "pain", "MONDO"),
+        ("protein_protein", "ppi", 7, "gene/protein", "TP53", "NCBI", 8, "gene/protein", "MDM2", "NCBI"),
+    ]
+    columns = ["relation", "display_relation", "x_id", "x_type", "x_name", "x_source",
+               "y_id", "y_type", "y_name", "y_source"]
+    pd.DataFrame(rows, columns=columns).to_csv(path, index=False)
+    return str(path)
+
+
+def _read(path):
+    return path.read_text(encoding="utf-8").splitlines()
+
+
+def test_export_splits_files_by_label_and_relation(tmp_path):
+    out = tmp_path / "import"
+    result = export_import_csv(_write_kg_csv(tmp_path / "kg.csv"), str(out), batch_size=2)
+
+    assert result["node_counts"] == {"Drug": 1, "Disease": 1, "Gene_protein": 2}
+    assert result["relationship_counts"] == {"INDICATION": 1, "PROTEIN_PROTEIN": 1}
+    assert _read(out / "nodes_Gene_protein_header.csv") == ["id:ID(Gene_protein),name,type,source"]
+    assert _read(out / "nodes_Drug_header.csv") == [
+        "id:ID(Drug),name,type,source,name_lower"
+    ]
+    assert _read(out / "nodes_Drug.csv") == ["1,aspirin,drug,DrugBank,aspirin"]
+    assert _read(out / "rels_INDICATION_Drug_Disease_header.csv") == [
+        ":START_ID(Drug),:END_ID(Disease),display_relation"
+    ]
+    assert _read(out / "rels_INDICATION_Drug_Disease.csv") == ["1,10,indication"]
+    script = (out / "import.sh").read_text(encoding="utf-8")
+    assert "--nodes=Gene_protein=nodes_Gene_protein_header.csv,nodes_Gene_protein.csv" in script
+
+
+def test_export_includes_adverse_flame_ddi(tmp_path):
+    ddi_csv = tmp_path / "ddi.csv"
+    pd.DataFrame([
+        {"drug1": "1", "drug2": "DB2", "description": "bleeding", "type": 29, "pattern": "p"},
+        {"drug1": "1", "drug2": "DB3", "description": "fine", "type": 1, "pattern": "p"},
+    ]).to_csv(ddi_csv, index=False)
+    out = tmp_path / "import"
+    result = export_import_csv(_write_kg_csv(tmp_path / "kg.csv"), str(out), ddi_csv=str(ddi_csv))
+
+    assert result["ddi_rows_exported"] == 1
+    assert _read(out / "nodes_Drug.csv") == ["1,aspirin,drug,DrugBank,aspirin", "DB2,,,flame_ddi,"]
+    assert _read(out / "rels_DRUG_DRUG_Drug_Drug_flame_ddi.csv") == [
+        "1,DB2,Adverse interaction,bleeding,flame_ddi,adverse,29,p"
+    ]
@@ -0,0 +1,71 @@
+import pandas as pd
+import pytest
+
+from src.etl.delta_loader import DeltaLoader, diff_frames
+from src.etl.primekg_loader import PrimeKGLoader
+
+COLUMNS = ["relation", "display_relation", "x_id", "x_type", "x_name", "x_source",
+           "y_id", "y_type", "y_name", "y_source"]
+
+
+def _write(path, rows):
+    pd.DataFrame(rows, columns=COLUMNS).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def mock_db(mock_db):
+    mock_db.execute_write_query.side_effect = None
+    mock_db.execute_write_query.return_value = {"success": True, "nodes_created": 0, "relationships_created": 0}
+    return mock_db
+
+
+@pytest.fixture
+def delta(mock_db):
+    loader = PrimeKGLoader(batch_size=2)
+    loader.db = mock_db
+    return DeltaLoader(loader, partitions=3)
+
+
+def test_diff_frames_classifies_inserts_deletes_updates():
+    old = pd.DataFrame({"type": ["drug", "drug", "drug"], "id": ["1", "2", "3"], "name": ["a", "b", "c"]})
+    new = pd.DataFrame({"type": ["drug", "drug", "drug"], "id": ["2", "3", "4"], "name": ["b", "C", "d"]})
+    inserts, deletes, updates = diff_frames(old, new, ["type", "id"], ["name"], keep="first")
+    assert inserts["id"].tolist() == ["4"]
+    assert deletes["id"].tolist() == ["1"]
+    assert updates["id"].tolist() == ["3"]
+    assert updates["name"].tolist() == ["C"]
+
+
+def test_diff_load_applies_only_changes(delta, mock_db, tmp_path):
+    old = _write(tmp_path / "old.csv", [
+        ("indication", "indication", 1, "drug", "aspirin", "DB", 10, "disease", "pain", "M"),
+        ("indication", "indication", 2, "drug", "ibuprofen", "DB", 10, "disease", "pain", "M"),
+    ])
+    new = _write(tmp_path / "new.csv", [
+        ("indication", "indication", 1, "drug", "aspirin", "DB", 10, "disease", "Pain", "M"),
+        ("indication", "indication", 3, "drug", "naproxen", "DB", 10, "disease", "Pain", "M"),
+    ])
+
+    counts = delta.diff_load(old, new, version="2.0")
+
+    assert counts == {
+        "nodes_inserted": 1, "nodes_updated": 1, "nodes_deleted": 1,
+        "relationships_inserted": 1, "relationships_updated": 0, "relationships_deleted": 1,
+    }
+    calls = [(c.args[0], c.args[1] if len(c.args) > 1 else {}) for c in mock_db.execute_write_query.call_args_list]
+    upserted = sorted(r["id"] for q, p in calls if "MERGE (n:" in q for r in p["rows"])
+    assert upserted == ["10", "3"]
+    rel_deletes = [r for q, p in calls if "DELETE r" in q for r in p["rows"]]
+    assert rel_deletes == [{"source_id": "2", "target_id": "10"}]
+    node_deletes = [r for q, p in calls if "DETACH DELETE" in q for r in p["rows"]]
+    assert node_deletes == [{"id": "2"}]
+    release = [p for q, p in calls if "PrimeKGRelease" in q]
+    assert release[0]["version"] == "2.0"
+
+
+def test_diff_load_dry_run_writes_nothing(delta, mock_db, tmp_path):
+    rows = [("indication", "indication", 1, "drug", "aspirin", "DB", 10, "disease", "pain", "M")]
+    counts = delta.diff_load(_write(tmp_path / "a.csv", rows), _write(tmp_path / "b.csv", rows), "1", dry_run=True)
+    assert sum(counts.values()) == 0
+    mock_db.execute_write_query.assert_not_called()
@@ -0,0 +1,448 @@
+import json
+import threading
+import time
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.etl.primekg_loader import NodeKeySet, PrimeKGLoader
+
+
+@pytest.fixture
+def loader(mock_db):
+    loader = PrimeKGLoader(batch_size=2)
+    loader.db = mock_db
+    return loader
+
+
+def _node(node_id, node_type):
+    return {"id": node_id, "name": f"n{node_id}", "type": node_type, "source": "src"}
+
+
+# --- _load_nodes_batch ---
+
+def test_load_nodes_batch_one_query_per_label(loader, mock_db):
+    loaded = loader._load_nodes_batch([_node("1", "disease"), _node("2", "gene/protein")])
+    assert loaded == 2
+    assert mock_db.execute_write_query.call_count == 2
+    queries = [c.args[0] for c in mock_db.execute_write_query.call_args_list]
+    assert any("MERGE (n:Disease" in q for q in queries)
+    assert any("MERGE (n:Gene_protein" in q for q in queries)
+    assert all("UNWIND $rows" in q for q in queries)
+
+
+def test_load_nodes_batch_adds_normalized_names_to_disease_and_drug(loader, mock_db):
+    loader._load_nodes_batch([
+        {"id": "1", "name": "Type 2 Diabetes Mellitus", "type": "disease", "source": "MONDO"},
+        {"id": "2", "name": float("nan"), "type": "drug", "source": "DrugBank"},
+        _node("3", "gene/protein"),
+    ])
+    calls = {c.args[0]: c.args[1]["rows"] for c in mock_db.execute_write_query.call_args_list}
+    disease_query = next(q for q in calls if "MERGE (n:Disease" in q)
+    gene_query = next(q for q in calls if "MERGE (n:Gene_protein" in q)
+
+    assert "n.name_lower = row.name_lower" in disease_query
+    assert "name_lower" not in gene_query
+    assert calls[disease_query][0]["name_lower"] == "type 2 diabetes mellitus"
+    drug_row = next(rows for q, rows in calls.items() if "MERGE (n:Drug" in q)[0]
+    assert drug_row["name_lower"] is None
+    assert "name_lower" not in calls[gene_query][0]
+
+
+def test_load_nodes_batch_respects_batch_size(loader, mock_db):
+    loader._load_nodes_batch([_node(str(i), "drug") for i in range(5)])
+    sizes = [len(c.args[1]["rows"]) for c in mock_db.execute_write_query.call_args_list]
+    assert sizes == [2, 2, 1]
+
+
+def test_load_nodes_batch_tracks_created_and_updated(loader, mock_db):
+    mock_db.execute_write_query.side_effect = lambda query, params=None: {
+        "success": True,
+        "nodes_created": 1,
+    }
+    loader._load_nodes_batch([_node("1", "drug"), _node("2", "drug")])
+    assert loader.node_label_stats["Drug"] == {"created": 1, "updated": 1}
+
+
+def test_load_nodes_batch_failed_write_not_counted(loader, mock_db):
+    mock_db.execute_write_query.side_effect = None
+    mock_db.execute_write_query.return_value = {"success": False, "error": "boom"}
+    assert loader._load_nodes_batch([_node("1", "drug")]) == 0
+
+
+def test_failed_write_logs_the_first_id_of_the_failed_batch(loader, mock_db, caplog):
+    succeed = mock_db.execute_write_query.side_effect
+    mock_db.execute_write_query.side_effect = lambda query, params=None: (
+        {"success": False, "error": "boom"} if params["rows"][0]["id"] == "3" else succeed(query, params))
+    nodes = [_node(str(i), "drug") for i in range(1, 7)]
+
+    assert loader._write_rows("MERGE", nodes)["failed_batch"] == 1
+    assert loader._load_nodes_batch(nodes) == 2
+    assert "Failed to create 4 Drug nodes (failed batch starts at id 3)" in caplog.text
+
+
+# --- NodeKeySet / _extract_chunk_nodes ---
+
+def test_node_key_set_reports_only_new_keys():
+    seen = NodeKeySet()
+    first = seen.add_new(np.array([5, 1, 9], dtype=np.uint64))
+    second = seen.add_new(np.array([9, 2, 5, 7], dtype=np.uint64))
+    assert first.tolist() == [True, True, True]
+    assert second.tolist() == [False, True, False, True]
+    assert len(seen) == 5
+
+
+def test_extract_chunk_nodes_dedups_within_and_across_chunks(loader):
+    seen = NodeKeySet()
+    chunk = pd.DataFrame({
+        "x_id": [1, 1, 2], "x_type": ["drug"] * 3, "x_name": ["a", "a", "b"], "x_source": ["DB"] * 3,
+        "y_id": [1, 10, 10], "y_type": ["disease"] * 3, "y_name": ["d1", "d10", "d10"], "y_source": ["M"] * 3,
+    })
+    nodes = loader._extract_chunk_nodes(chunk, seen)
+    assert [(n["type"], n["id"]) for n in nodes] == [
+        ("drug", "1"), ("drug", "2"), ("disease", "1"), ("disease", "10"),
+    ]
+    assert nodes[0] == {"id": "1", "name": "a", "type": "drug", "source": "DB"}
+    assert loader._extract_chunk_nodes(chunk, seen) == []
+
+
+# --- _load_relationships_batch ---
+
+def _edges(rows):
+    return pd.DataFrame(
+        rows,
+        columns=["x_id", "x_type", "relation", "display_relation", "y_id", "y_type"],
+    )
+
+
+def test_load_relationships_batch_partitions_by_type_triple(loader, mock_db):
+    mock_db.execute_write_query.side_effect = lambda query, params=None: {
+        "success": True,
+        "relationships_created": len(params["rows"]),
+    }
+    chunk = _edges([
+        (1, "drug", "indication", "indication", 10, "disease"),
+        (2, "drug", "contraindication", "contraindication", 10, "disease"),
+        (3, "drug", "indication", "indication", 11, "disease"),
+    ])
+    created = loader._load_relationships_batch(chunk)
+    assert created == 3
+    calls = mock_db.execute_write_query.call_args_list
+    assert len(calls) == 2
+    indication = next(c for c in calls if ":INDICATION]" in c.args[0])
+    assert [r["source_id"] for r in indication.args[1]["rows"]] == ["1", "3"]
+    assert loader.relation_type_stats["INDICATION"]["rows"] == 2
+    assert loader.relation_type_stats["CONTRAINDICATION"]["created"] == 1
+
+
+def test_relationship_query_text_is_stable_per_partition(loader, mock_db):
+    chunk = _edges([(i, "drug", "drug_drug", "synergistic interaction", i + 1, "drug") for i in range(4)])
+    loader._load_relationships_batch(chunk)
+    queries = {c.args[0] for c in mock_db.execute_write_query.call_args_list}
+    assert len(queries) == 1
+    assert mock_db.execute_write_query.call_count == 2
+
+
+# --- parallel relationship writes ---
+
+def test_parallel_cells_never_share_a_node_while_running(mock_db):
+    loader = PrimeKGLoader(batch_size=50, workers=3)
+    loader.db = mock_db
+    lock = threading.Lock()
+    in_use = set()
+    in_flight = {"now": 0, "max": 0}
+
+    def write(partitions):
+        rows = [row for _, records in partitions for row in records]
+        nodes = {row["source_id"] for row in rows} | {row["target_id"] for row in rows}
+        with lock:
+            assert not nodes & in_use
+            in_use.update(nodes)
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        time.sleep(0.005)
+        with lock:
+            in_use.difference_update(nodes)
+            in_flight["now"] -= 1
+        return len(rows)
+
+    loader._write_relationship_partitions = write
+    chunk = _edges([(i, "gene/protein", "ppi", "ppi", (i * 7) % 40, "gene/protein") for i in range(300)])
+    assert loader._load_relationships_batch(chunk) == 300
+    assert in_flight["max"] > 1
+
+
+def test_parallel_chunks_hold_about_batch_size_rows_per_cell():
+    assert PrimeKGLoader(batch_size=1000)._relationship_chunk_rows() == 1000
+    # 8 buckets -> 36 cells
+    assert PrimeKGLoader(batch_size=1000, workers=4)._relationship_chunk_rows() == 36000
+
+
+def test_parallel_relationship_load_writes_every_edge(mock_db):
+    mock_db.execute_write_query.side_effect = lambda query, params=None: {
+        "success": True,
+        "relationships_created": len(params["rows"]),
+    }
+    loader = PrimeKGLoader(batch_size=50, workers=4)
+    loader.db = mock_db
+    chunk = _edges([(i, "gene/protein", "ppi", "ppi", (i * 7) % 40, "gene/protein") for i in range(200)])
+
+    assert loader._load_relationships_batch(chunk) == 200
+    written = [(r["source_id"], r["target_id"]) for c in mock_db.execute_write_query.call_args_list
+               for r in c.args[1]["rows"]]
+    assert sorted(written) == sorted((str(i), str((i * 7) % 40)) for i in range(200))
+
+
+def test_transient_write_failure_is_retried(loader, mock_db, monkeypatch):
+    monkeypatch.setattr("src.etl.primekg_loader.time.sleep", lambda seconds: None)
+    results = iter([
+        {"success": False, "error": "DeadlockDetected", "transient": True},
+        {"success": True, "relationships_created": 1},
+    ])
+    mock_db.execute_write_query.side_effect = lambda query, params=None: next(results)
+    chunk = _edges([(1, "drug", "indication", "indication", 10, "disease")])
+    assert loader._load_relationships_batch(chunk) == 1
+    assert mock_db.execute_write_query.call_count == 2
+
+
+# --- load_single_pass ---
+
+def _write_kg_csv(path, n_rows):
+    rows = [
+        {
+            "relation": "indication",
+            "display_relation": "indication",
+            "x_id": i, "x_type": "drug", "x_name": f"drug{i}", "x_source": "DrugBank",
+            "y_id": 100 + i % 3, "y_type": "disease", "y_name": f"dis{i % 3}", "y_source": "MONDO",
+        }
+        for i in range(n_rows)
+    ]
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return str(path)
+
+
+def test_single_pass_writes_nodes_before_relationships(loader, mock_db, tmp_path, monkeypatch):
+    edges_file = _write_kg_csv(tmp_path / "kg.csv", 5)
+    reads = []
+    real_read_csv = pd.read_csv
+    monkeypatch.setattr(
+        "src.etl.primekg_loader.pd.read_csv",
+        lambda *a, **kw: reads.append(a) or real_read_csv(*a, **kw),
+    )
+
+    result = loader.load_single_pass(edges_file)
+
+    assert len(reads) == 1
+    assert result["total_rows_processed"] == 5
+    assert result["nodes_loaded"] == 8
+    written = set()
+    rel_calls = 0
+    for call in mock_db.execute_write_query.call_args_list:
+        query, params = call.args[0], (call.args[1] if len(call.args) > 1 else {})
+        if "MATCH (source" in query:
+            rel_calls += 1
+            for row in params["rows"]:
+                assert row["source_id"] in written and row["target_id"] in written
+        elif "MERGE (n:" in query:
+            written.update(row["id"] for row in params["rows"])
+    assert rel_calls > 0
+
+
+def test_single_pass_respects_max_rows(mock_db, tmp_path):
+    loader = PrimeKGLoader(batch_size=2, max_rows=3)
+    loader.db = mock_db
+    edges_file = _write_kg_csv(tmp_path / "kg.csv", 10)
+    result = loader.load_single_pass(edges_file)
+    assert result["total_rows_processed"] == 3
+
+
+# --- checkpoint / resume ---
+
+def _node_ids_written(mock_db):
+    return [row["id"] for c in mock_db.execute_write_query.call_args_list
+            if "MERGE (n:" in c.args[0] for row in c.args[1]["rows"]]
+
+
+def _release_writes(mock_db):
+    return [c.args[1] for c in mock_db.execute_write_query.call_args_list if "PrimeKGRelease" in c.args[0]]
+
+
+@pytest.mark.parametrize("single_pass", [False, True])
+def test_release_is_recorded_only_after_a_complete_load(mock_db, tmp_path, single_pass):
+    edges_file = _write_kg_csv(tmp_path / "kg.csv", 5)
+    limited = PrimeKGLoader(batch_size=2)
+    limited.db = mock_db
+    result = limited.load_primekg_data(edges_file, max_rows=3, single_pass=single_pass, release="2.0")
+    assert result["release_recorded"] is False
+    assert not _release_writes(mock_db)
+
+    complete = PrimeKGLoader(batch_size=2)
+    complete.db = mock_db
+    result = complete.load_primekg_data(edges_file, single_pass=single_pass, release="2.0")
+    assert result["release_recorded"] is True
+    assert [params["version"] for params in _release_writes(mock_db)] == ["2.0"]
+
+
+@pytest.mark.parametrize("single_pass", [False, True])
+def test_resume_skips_committed_rows(mock_db, tmp_path, single_pass):
+    edges_file = _write_kg_csv(tmp_path / "kg.csv", 6)
+
+    crashing = PrimeKGLoader(batch_size=2)
+    crashing.db = mock_db
+    calls = {"n": 0}
+    real_batch = crashing._load_relationships_batch
+
+    def crash_on_second_chunk(chunk):
+        calls["n"] += 1
+        if calls["n"] == 2:
+            raise RuntimeError("connection lost")
+        return real_batch(chunk)
+
+    crashing._load_relationships_batch = crash_on_second_chunk
+    with pytest.raises(RuntimeError):
+        crashing.load_primekg_data(edges_file, single_pass=single_pass)
+
+    mock_db.execute_write_query.reset_mock()
+    resumed = PrimeKGLoader(batch_size=2)
+    resumed.db = mock_db
+    result = resumed.load_primekg_data(edges_file, single_pass=single_pass, resume=True)
+
+    resumed_nodes = _node_ids_written(mock_db)
+    rel_sources = [row["source_id"] for c in mock_db.execute_write_query.call_args_list
+                   if "MATCH (source" in c.args[0] for row in c.args[1]["rows"]]
+    assert sorted(rel_sources) == ["2", "3", "4", "5"]
+    # Nodes of the fully committed first chunk are never written again
+    assert not set(resumed_nodes) & {"0", "1", "100", "101"}
+    assert result["total_rows_processed"] == 6
+    assert result["nodes_loaded"] == 9
+
+
+@pytest.mark.parametrize("single_pass", [False, True])
+def test_failed_batch_is_not_checkpointed_and_resume_rewrites_it(mock_db, tmp_path, single_pass):
+    edges_file = _write_kg_csv(tmp_path / "kg.csv", 6)
+    succeed = mock_db.execute_write_query.side_effect
+
+    def fail_drug_2(query, params=None):
+        if "MERGE (n:Drug" in query and any(row["id"] == "2" for row in params["rows"]):
+            return {"success": False, "error": "ConstraintValidationFailed"}
+        return succeed(query, params)
+
+    mock_db.execute_write_query.side_effect = fail_drug_2
+    failing = PrimeKGLoader(batch_size=2)
+    failing.db = mock_db
+    result = failing.load_primekg_data(edges_file, single_pass=single_pass)
+    assert result["failed_writes"] == 1
+    assert result["release_recorded"] is False
+    assert not _release_writes(mock_db)
+    # The load stops at the failed chunk: nothing after it is written
+    assert "4" not in _node_ids_written(mock_db)
+
+    mock_db.execute_write_query.side_effect = succeed
+    mock_db.execute_write_query.reset_mock()
+    resumed = PrimeKGLoader(batch_size=2)
+    resumed.db = mock_db
+    result = resumed.load_primekg_data(edges_file, single_pass=single_pass, resume=True)
+
+    assert result["failed_writes"] == 0
+    assert result["release_recorded"] is True
+    assert {"2", "3", "102"} <= set(_node_ids_written(mock_db))
+    assert not set(_node_ids_written(mock_db)) & {"0", "1", "100", "101"}
+    rel_sources = [row["source_id"] for c in mock_db.execute_write_query.call_args_list
+                   if "MATCH (source" in c.args[0] for row in c.args[1]["rows"]]
+    expected = ["2", "3", "4", "5"] if single_pass else ["0", "1", "2", "3", "4", "5"]
+    assert sorted(rel_sources) == expected
+
+
+@pytest.mark.parametrize("single_pass", [False, True])
+@pytest.mark.parametrize("max_rows, completed", [(6, True), (4, False)])
+def test_phase_completes_at_end_of_file_even_when_max_rows_matches_it(mock_db, tmp_path, single_pass,
+                                                                       max_rows, completed):
+    edges_file = _write_kg_csv(tmp_path / "kg.csv", 6)
+    loader = PrimeKGLoader(batch_size=2)
+    loader.db = mock_db
+    loader.load_primekg_data(edges_file, max_rows=max_rows, single_pass=single_pass)
+
+    phases = ["single_pass"] if single_pass else ["nodes", "relationships"]
+    assert [loader.checkpoint.phase(phase).get("completed", False) for phase in phases] == [completed] * len(phases)
+
+    mock_db.execute_write_query.reset_mock()
+    resumed = PrimeKGLoader(batch_size=2)
+    resumed.db = mock_db
+    resumed.load_primekg_data(edges_file, single_pass=single_pass, resume=True)
+    # A completed load writes nothing on resume; a limited one continues with the rest of the file
+    assert bool(_node_ids_written(mock_db)) is not completed
+
+
+def test_resume_ignores_checkpoint_of_changed_file(mock_db, tmp_path):
+    edges_file = _write_kg_csv(tmp_path / "kg.csv", 4)
+    loader = PrimeKGLoader(batch_size=2)
+    loader.db = mock_db
+    loader.load_primekg_data(edges_file, single_pass=True)
+
+    _write_kg_csv(tmp_path / "kg.csv", 5)
+    mock_db.execute_write_query.reset_mock()
+    again = PrimeKGLoader(batch_size=2)
+    again.db = mock_db
+    result = again.load_primekg_data(edges_file, single_pass=True, resume=True)
+    assert result["total_rows_processed"] == 5
+    assert len(_node_ids_written(mock_db)) == 8
+
+
+def test_single_pass_from_parquet_cache_matches_csv(mock_db, tmp_path):
+    pytest.importorskip("pyarrow")
+    from src.utils.columnar import convert_csv_to_parquet
+
+    edges_file = _write_kg_csv(tmp_path / "kg.csv", 7)
+    from_csv = PrimeKGLoader(batch_size=3)
+    from_csv.db = mock_db
+    from_csv.load_single_pass(edges_file)
+    csv_calls = [c.args for c in mock_db.execute_write_query.call_args_list]
+
+    convert_csv_to_parquet(edges_file, chunk_size=4)
+    mock_db.execute_write_query.reset_mock()
+    from_cache = PrimeKGLoader(batch_size=3)
+    from_cache.db = mock_db
+    from_cache.load_single_pass(edges_file)
+    assert [c.args for c in mock_db.execute_write_query.call_args_list] == csv_calls
+
+
+# --- run report ---
+
+@pytest.mark.parametrize("single_pass", [False, True])
+def test_load_writes_run_report(mock_db, tmp_path, single_pass):
+    edges_file = _write_kg_csv(tmp_path / "kg.csv", 5)
+    loader = PrimeKGLoader(batch_size=2)
+    loader.db = mock_db
+    report_file = tmp_path / "reports" / "run.json"
+    result = loader.load_primekg_data(edges_file, single_pass=single_pass, report_file=str(report_file))
+
+    with open(report_file, encoding="utf-8") as handle:
+        report = json.load(handle)
+    writes = [c for c in mock_db.execute_write_query.call_args_list if "UNWIND $rows" in c.args[0]]
+    assert result["report_file"] == str(report_file)
+    assert report["mode"] == ("single_pass" if single_pass else "two_pass")
+    assert report["rows"] == 5
+    assert report["transactions"] == len(writes)
+    assert report["neo4j_counters"]["nodes_created"] == sum(len(c.args[1]["rows"]) for c in writes)
+    assert {"parse", "dedup", "write"} <= set(report["phase_seconds"])
+    assert report["transaction_latency_ms"]["p50"] <= report["transaction_latency_ms"]["p99"]
+    assert report["failed_transactions"] == 0
+
+
+def test_transient_failure_resubmits_only_uncommitted_batches(mock_db, monkeypatch):
+    monkeypatch.setattr("src.etl.primekg_loader.time.sleep", lambda seconds: None)
+    loader = PrimeKGLoader(batch_size=1, commit_size=1)
+    loader.db = mock_db
+    results = iter([
+        {"success": True, "relationships_created": 1},
+        {"success": False, "error": "LockClient timeout", "transient": True},
+        {"success": True, "relationships_created": 1},
+        {"success": True, "relationships_created": 1},
+    ])
+    mock_db.execute_write_query.side_effect = lambda query, params=None: next(results)
+    chunk = _edges([(i, "drug", "indication", "indication", 10, "disease") for i in range(3)])
+
+    assert loader._load_relationships_batch(chunk) == 3
+    sources = [c.args[1]["rows"][0]["source_id"] for c in mock_db.execute_write_query.call_args_list]
+    assert sources == ["0", "1", "1", "2"]
+    assert mock_db.execute_write_batches.call_args.kwargs["commit_size"] == 1
@@ -0,0 +1,80 @@
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from src.utils import columnar
+from src.utils.helpers import analyze_csv_structure, get_edge_types
+
+
+def _write_kg_csv(path, n_rows):
+    pd.DataFrame({
+        "relation": ["indication", "contraindication"] * (n_rows // 2) + ["indication"] * (n_rows % 2),
+        "display_relation": "x",
+        "x_id": range(n_rows),
+        "x_type": "drug",
+        "x_name": [f"drug{i}" for i in range(n_rows)],
+        "x_source": "DrugBank",
+        "y_id": [100 + i % 3 for i in range(n_rows)],
+        "y_type": "disease",
+        "y_name": [f"dis{i % 3}" for i in range(n_rows)],
+        "y_source": "MONDO",
+        "x_index": [None if i == 9 else i for i in range(n_rows)],
+        "score": [0.5 * i for i in range(n_rows)],
+        "note": [f"n{i}" for i in range(n_rows)],
+    }).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def cached_csv(tmp_path):
+    csv_file = _write_kg_csv(tmp_path / "kg.csv", 25)
+    columnar.convert_csv_to_parquet(csv_file, chunk_size=7)
+    return csv_file
+
+
+def test_cache_is_used_only_when_newer_than_csv(cached_csv):
+    assert columnar.fresh_cache(cached_csv) == columnar.cache_path(cached_csv)
+    parquet_mtime = os.path.getmtime(columnar.cache_path(cached_csv))
+    os.utime(cached_csv, (parquet_mtime + 10, parquet_mtime + 10))
+    assert columnar.fresh_cache(cached_csv) is None
+
+
+def test_batches_match_csv_with_projection_and_skip(cached_csv):
+    batches = list(columnar.iter_edge_batches(cached_csv, 10, columns=["x_id", "relation"], skip_rows=8))
+    assert [len(b) for b in batches] == [10, 7]
+    frame = pd.concat(batches, ignore_index=True)
+    assert set(frame.columns) == {"x_id", "relation"}
+    assert frame["x_id"].tolist() == [str(i) for i in range(8, 25)]
+    assert isinstance(batches[0]["relation"].dtype, pd.CategoricalDtype)
+
+
+def test_schema_and_distinct_values_from_metadata(cached_csv):
+    schema = columnar.read_schema(cached_csv)
+    assert schema["total_rows"] == 25
+    assert schema["column_dtypes"]["x_id"] == "string"
+    assert "dictionary" in schema["column_dtypes"]["relation"]
+    assert schema["column_dtypes"]["x_index"] == "int64"
+    assert schema["column_dtypes"]["score"] == "double"
+    assert schema["column_dtypes"]["note"] in ("string", "large_string")
+    assert set(columnar.distinct_values(cached_csv, "relation")) == {"indication", "contraindication"}
+
+
+def test_helpers_read_from_cache(cached_csv):
+    assert set(get_edge_types(cached_csv)) == {"indication", "contraindication"}
+    structure = analyze_csv_structure(cached_csv)
+    assert structure["total_rows"] == 25
+    assert len(structure["sample_data"]) == 5
+
+
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_batches_report_file_offsets(cached_csv, use_cache):
+    if not use_cache:
+        os.remove(columnar.cache_path(cached_csv))
+    source = columnar.cache_path(cached_csv) if use_cache else cached_csv
+    progress = [b.attrs["progress"] for b in columnar.iter_edge_batches(cached_csv, 10)]
+    positions = [position for position, _ in progress]
+    assert positions == sorted(positions)
+    assert progress[-1] == (os.path.getsize(source), os.path.getsize(source))
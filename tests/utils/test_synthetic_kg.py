@@ -0,0 +1,49 @@
+import filecmp
+
+import pandas as pd
+
+from src.etl.primekg_loader import PrimeKGLoader
+from src.utils.synthetic_kg import COLUMNS, RELATIONS, write_synthetic_primekg
+
+
+def _read(path):
+    return pd.read_csv(path, dtype={"x_id": str, "y_id": str})
+
+
+def test_same_seed_gives_same_file(tmp_path):
+    write_synthetic_primekg(str(tmp_path / "a.csv"), 4000, seed=3)
+    write_synthetic_primekg(str(tmp_path / "b.csv"), 4000, seed=3)
+    write_synthetic_primekg(str(tmp_path / "c.csv"), 4000, seed=4)
+    assert filecmp.cmp(tmp_path / "a.csv", tmp_path / "b.csv", shallow=False)
+    assert not filecmp.cmp(tmp_path / "a.csv", tmp_path / "c.csv", shallow=False)
+
+
+def test_shape_matches_primekg(tmp_path):
+    summary = write_synthetic_primekg(str(tmp_path / "kg.csv"), 20000, seed=0)
+    edges = _read(tmp_path / "kg.csv")
+
+    assert list(edges.columns) == COLUMNS
+    assert len(edges) == summary["rows"] == 20000
+    # Rows are grouped by relation, largest relations first
+    runs = edges["relation"].ne(edges["relation"].shift()).sum()
+    assert runs == edges["relation"].nunique()
+    assert edges["relation"].iloc[0] == RELATIONS[0][0]
+    # No duplicate edges, and every edge appears in both directions
+    key = ["relation", "x_type", "x_id", "y_type", "y_id"]
+    assert not edges.duplicated(subset=key).any()
+    reverse = edges.rename(columns={"x_type": "y_type", "x_id": "y_id", "y_type": "x_type", "y_id": "x_id"})
+    assert len(edges[key].merge(reverse[key])) == len(edges)
+    # Degrees are heavy-tailed
+    degree = edges.groupby(["x_type", "x_id"]).size()
+    assert degree.max() > 10 * degree.median()
+
+
+def test_generated_file_loads_every_node(tmp_path, mock_db):
+    edges_file = str(tmp_path / "kg.csv")
+    write_synthetic_primekg(edges_file, 2000, seed=1)
+    loader = PrimeKGLoader(batch_size=500)
+    loader.db = mock_db
+    result = loader.load_primekg_data(edges_file, single_pass=True)
+
+    edges = _read(edges_file)
+    assert result["nodes_loaded"] == len(edges[["x_type", "x_id"]].drop_duplicates())